@@ -14,7 +14,9 @@ from app.models import (
     refresh_token,
     return_request,
     sale,
+    sales_daily_rollup,
     expense,
+    stock_balance,
     stock_transfer,
     stock_threshold,
     store,
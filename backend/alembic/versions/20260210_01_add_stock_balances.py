@@ -0,0 +1,49 @@
+"""add stock balances table
+
+Revision ID: 20260210_01
+Revises: 20260208_01
+Create Date: 2026-02-10 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260210_01"
+down_revision: Union[str, None] = "20260208_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_balances",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("store_id", "product_id", name="uq_stock_balances_store_product"),
+    )
+    op.create_index(op.f("ix_stock_balances_id"), "stock_balances", ["id"], unique=False)
+    op.create_index(op.f("ix_stock_balances_store_id"), "stock_balances", ["store_id"], unique=False)
+    op.create_index(op.f("ix_stock_balances_product_id"), "stock_balances", ["product_id"], unique=False)
+
+    # Backfill from existing inventory so balances are correct from the first request.
+    op.execute(
+        """
+        INSERT INTO stock_balances (store_id, product_id, quantity, updated_at)
+        SELECT store_id, product_id, SUM(quantity_in_stock), CURRENT_TIMESTAMP
+        FROM inventory
+        GROUP BY store_id, product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_stock_balances_product_id"), table_name="stock_balances")
+    op.drop_index(op.f("ix_stock_balances_store_id"), table_name="stock_balances")
+    op.drop_index(op.f("ix_stock_balances_id"), table_name="stock_balances")
+    op.drop_table("stock_balances")
@@ -0,0 +1,67 @@
+"""add sales daily rollup table
+
+Revision ID: 20260211_01
+Revises: 20260210_01
+Create Date: 2026-02-11 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260211_01"
+down_revision: Union[str, None] = "20260210_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_daily_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("total_sales", sa.Float(), nullable=False),
+        sa.Column("total_cost", sa.Float(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "store_id", "product_id", "day", name="uq_sales_daily_rollup_store_product_day"
+        ),
+    )
+    op.create_index(op.f("ix_sales_daily_rollup_id"), "sales_daily_rollup", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_sales_daily_rollup_store_id"), "sales_daily_rollup", ["store_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_sales_daily_rollup_product_id"), "sales_daily_rollup", ["product_id"], unique=False
+    )
+    op.create_index(op.f("ix_sales_daily_rollup_day"), "sales_daily_rollup", ["day"], unique=False)
+    op.create_index(
+        "ix_sales_daily_rollup_store_day", "sales_daily_rollup", ["store_id", "day"], unique=False
+    )
+
+    # Backfill from existing sales.
+    op.execute(
+        """
+        INSERT INTO sales_daily_rollup
+            (store_id, product_id, day, quantity, total_sales, total_cost, orders, updated_at)
+        SELECT store_id, product_id, DATE(created_at), SUM(quantity), SUM(total_price),
+               SUM(total_cost), COUNT(id), CURRENT_TIMESTAMP
+        FROM sales
+        GROUP BY store_id, product_id, DATE(created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sales_daily_rollup_store_day", table_name="sales_daily_rollup")
+    op.drop_index(op.f("ix_sales_daily_rollup_day"), table_name="sales_daily_rollup")
+    op.drop_index(op.f("ix_sales_daily_rollup_product_id"), table_name="sales_daily_rollup")
+    op.drop_index(op.f("ix_sales_daily_rollup_store_id"), table_name="sales_daily_rollup")
+    op.drop_index(op.f("ix_sales_daily_rollup_id"), table_name="sales_daily_rollup")
+    op.drop_table("sales_daily_rollup")
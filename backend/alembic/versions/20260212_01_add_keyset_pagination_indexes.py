@@ -0,0 +1,42 @@
+"""add keyset pagination indexes
+
+Revision ID: 20260212_01
+Revises: 20260211_01
+Create Date: 2026-02-12 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20260212_01"
+down_revision: Union[str, None] = "20260211_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, scope column) pairs; each gets an index on (scope, created_at, id).
+PAGINATION_INDEXES = (
+    ("inventory", "store_id"),
+    ("inventory", "created_by"),
+    ("supply_requests", "store_id"),
+    ("supply_requests", "requested_by"),
+    ("notifications", "user_id"),
+    ("users", "store_id"),
+    ("stores", "merchant_id"),
+    ("sales", "store_id"),
+    ("stock_transfers", "from_store_id"),
+    ("stock_transfers", "to_store_id"),
+    ("returns", "store_id"),
+    ("purchase_orders", "store_id"),
+)
+
+
+def upgrade() -> None:
+    for table, column in PAGINATION_INDEXES:
+        op.create_index(f"ix_{table}_{column}_created_id", table, [column, "created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    for table, column in reversed(PAGINATION_INDEXES):
+        op.drop_index(f"ix_{table}_{column}_created_id", table_name=table)
@@ -0,0 +1,28 @@
+"""add refresh token expiry index
+
+Revision ID: 20260213_01
+Revises: 20260212_01
+Create Date: 2026-02-13 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20260213_01"
+down_revision: Union[str, None] = "20260212_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_refresh_tokens_expires_at_revoked",
+        "refresh_tokens",
+        ["expires_at", "revoked"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_expires_at_revoked", table_name="refresh_tokens")
@@ -0,0 +1,44 @@
+"""add outbox messages
+
+Revision ID: 20260215_01
+Revises: 20260214_01
+Create Date: 2026-02-15 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260215_01"
+down_revision: Union[str, None] = "20260214_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_outbox_messages_id"), "outbox_messages", ["id"], unique=False)
+    op.create_index(
+        "ix_outbox_messages_status_available_at",
+        "outbox_messages",
+        ["status", "available_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_messages_status_available_at", table_name="outbox_messages")
+    op.drop_index(op.f("ix_outbox_messages_id"), table_name="outbox_messages")
+    op.drop_table("outbox_messages")
@@ -0,0 +1,28 @@
+"""add notification unread index
+
+Revision ID: 20260216_01
+Revises: 20260215_01
+Create Date: 2026-02-16 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20260216_01"
+down_revision: Union[str, None] = "20260215_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notifications_user_id_is_read_created",
+        "notifications",
+        ["user_id", "is_read", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_id_is_read_created", table_name="notifications")
@@ -0,0 +1,40 @@
+"""add notification counters
+
+Revision ID: 20260217_01
+Revises: 20260216_01
+Create Date: 2026-02-17 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260217_01"
+down_revision: Union[str, None] = "20260216_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_counters",
+        sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # Backfill from existing notifications so the first unread-count poll is a lookup.
+    op.execute(
+        """
+        INSERT INTO notification_counters (user_id, unread_count, updated_at)
+        SELECT user_id, COUNT(*), CURRENT_TIMESTAMP
+        FROM notifications
+        WHERE is_read = false
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notification_counters")
@@ -0,0 +1,81 @@
+"""partition inventory events by month
+
+Revision ID: 20260218_01
+Revises: 20260217_01
+Create Date: 2026-02-18 09:00:00
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260218_01"
+down_revision: Union[str, None] = "20260217_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+SINGLE_COLUMN_INDEXES = ["id", "inventory_id", "product_id", "store_id", "actor_id"]
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    for column in SINGLE_COLUMN_INDEXES:
+        op.create_index(op.f(f"ix_inventory_events_{column}"), "inventory_events", [column], unique=False)
+
+
+def _rebuild(partitioned: bool) -> None:
+    """Copy inventory_events into a new (partitioned or plain) table and swap it in."""
+    partition_clause = " PARTITION BY RANGE (created_at)" if partitioned else ""
+    primary_key = "id, created_at" if partitioned else "id"
+    op.execute(f"CREATE TABLE inventory_events_new (LIKE inventory_events INCLUDING DEFAULTS){partition_clause}")
+    op.execute(f"ALTER TABLE inventory_events_new ADD CONSTRAINT inventory_events_new_pkey PRIMARY KEY ({primary_key})")
+    # The id sequence belongs to the old table's column; keep it alive.
+    op.execute("ALTER SEQUENCE inventory_events_id_seq OWNED BY inventory_events_new.id")
+
+    if partitioned:
+        today = date.today()
+        oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM inventory_events")).scalar()
+        month = date((oldest or today).year, (oldest or today).month, 1)
+        last = date(today.year, today.month, 1)
+        for _ in range(MONTHS_AHEAD):
+            last = _next_month(last)
+        while month <= last:
+            op.execute(
+                f"CREATE TABLE inventory_events_p{month:%Y_%m} PARTITION OF inventory_events_new "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+            month = _next_month(month)
+        op.execute("CREATE TABLE inventory_events_default PARTITION OF inventory_events_new DEFAULT")
+
+    op.execute("INSERT INTO inventory_events_new SELECT * FROM inventory_events")
+    op.execute("DROP TABLE inventory_events")
+    op.execute("ALTER TABLE inventory_events_new RENAME TO inventory_events")
+    op.execute("ALTER TABLE inventory_events RENAME CONSTRAINT inventory_events_new_pkey TO inventory_events_pkey")
+    _create_indexes()
+
+
+def upgrade() -> None:
+    # PostgreSQL: rebuild as a table range-partitioned by month. The primary
+    # key must include the partition column, so it becomes (id, created_at).
+    if op.get_bind().dialect.name == "postgresql":
+        _rebuild(partitioned=True)
+    # Product history reads filter on (product_id, store_id) and walk
+    # (created_at, id) newest first.
+    op.create_index(
+        "ix_inventory_events_product_store_created",
+        "inventory_events",
+        ["product_id", "store_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_events_product_store_created", table_name="inventory_events")
+    if op.get_bind().dialect.name == "postgresql":
+        _rebuild(partitioned=False)
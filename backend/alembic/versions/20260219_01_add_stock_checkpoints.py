@@ -0,0 +1,38 @@
+"""add stock checkpoints
+
+Revision ID: 20260219_01
+Revises: 20260218_01
+Create Date: 2026-02-19 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260219_01"
+down_revision: Union[str, None] = "20260218_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("store_id", "product_id", "day", name="uq_stock_checkpoints_store_product_day"),
+    )
+    op.create_index(op.f("ix_stock_checkpoints_id"), "stock_checkpoints", ["id"], unique=False)
+    op.create_index(op.f("ix_stock_checkpoints_store_id"), "stock_checkpoints", ["store_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_stock_checkpoints_store_id"), table_name="stock_checkpoints")
+    op.drop_index(op.f("ix_stock_checkpoints_id"), table_name="stock_checkpoints")
+    op.drop_table("stock_checkpoints")
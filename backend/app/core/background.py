@@ -0,0 +1,93 @@
+"""
+Periodic maintenance jobs run inside each application process.
+
+Jobs are plain sync callables; they run in the threadpool so they never
+block the event loop. Every worker runs its own copy, so jobs must be safe
+to run concurrently (idempotent deletes and the like).
+
+Services build jobs from two helpers: `purge_in_batches` for retention
+sweeps and `run_in_own_session` to give a job a session of its own.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Optional, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+
+logger = logging.getLogger("myduka.background")
+
+T = TypeVar("T")
+
+
+def utc_now_naive() -> datetime:
+    """Current UTC time without tzinfo, matching the naive UTC timestamp columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def purge_in_batches(db: Session, model, condition, batch_size: int) -> int:
+    """
+    Delete `model` rows matching `condition`, `batch_size` at a time; return the count.
+
+    Each batch is committed on its own so no transaction holds many row
+    locks. Ids grow with insertion time, so walking the primary key finds
+    the oldest rows first and each batch stops scanning early.
+    """
+    deleted = 0
+    while True:
+        ids = db.execute(select(model.id).where(condition).order_by(model.id).limit(batch_size)).scalars().all()
+        if not ids:
+            return deleted
+        db.execute(delete(model).where(model.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return deleted
+
+
+def run_in_own_session(func: Callable[..., T], *args, **kwargs) -> T:
+    """Call `func(db, *args, **kwargs)` on a new session and close it afterwards."""
+    db = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+class PeriodicTask:
+    """Run `func` every `interval_seconds` until stopped; failures are logged and retried next tick."""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], object]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                result = await run_in_threadpool(self.func)
+                # Frequent pollers mostly find nothing to do; keep those ticks quiet.
+                level = logging.INFO if result else logging.DEBUG
+                logger.log(level, "Background task %s finished result=%s", self.name, result)
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,127 @@
+"""
+Pluggable key/value caches with TTL expiry
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .config import settings
+
+
+class CacheBackend(ABC):
+    """Interface shared by the in-process and Redis caches."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryCache(CacheBackend):
+    """Thread-safe per-process cache with TTL expiry and LRU eviction."""
+
+    def __init__(self, max_entries: int, default_ttl: int):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared by all workers through a Redis-compatible client.
+
+    Values are stored as JSON under `<namespace>:<key>`; Redis handles expiry
+    and (with a maxmemory policy) eviction.
+    """
+
+    def __init__(self, client, namespace: str, default_ttl: int):
+        self.client = client
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self._key(key))
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.client.set(self._key(key), json.dumps(value), ex=self.default_ttl if ttl is None else ttl)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*(self._key(key) for key in keys))
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = list(self.client.scan_iter(match=f"{self._key(prefix)}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self) -> None:
+        self.delete_prefix("")
+
+
+def build_cache(namespace: str, max_entries: int, default_ttl: int) -> CacheBackend:
+    """Create a cache for `namespace` using the backend selected by CACHE_BACKEND."""
+    if settings.cache_backend == "redis":
+        from .redis import get_redis
+
+        return RedisCache(get_redis(), namespace=f"myduka:{namespace}", default_ttl=default_ttl)
+    return InMemoryCache(max_entries=max_entries, default_ttl=default_ttl)
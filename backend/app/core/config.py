@@ -16,6 +16,12 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./myduka.db"
     database_driver: str = "sqlite"  # sqlite or postgresql
+    # Enable the AsyncSession engine (aiosqlite / asyncpg) for async code paths.
+    database_async: bool = False
+    # Transactions that hit a lock timeout, deadlock or serialization failure
+    # are retried this many times in total, with jittered exponential backoff.
+    db_retry_attempts: int = 3
+    db_retry_backoff_seconds: float = 0.05
 
     # JWT Settings
     secret_key: str = "your-secret-key-change-this-in-production"
@@ -24,6 +30,51 @@ class Settings(BaseSettings):
     refresh_token_expire_days: int = 7
     invite_token_expire_hours: int = 48
     reset_token_expire_hours: int = 2
+    # Background sweep of expired refresh tokens and ones revoked longer ago
+    # than the grace period (interval 0 disables it).
+    refresh_token_sweep_interval_seconds: int = 3600
+    refresh_token_sweep_batch_size: int = 1000
+    revoked_refresh_token_grace_hours: int = 24
+
+    # Stored responses for Idempotency-Key retries: kept this long, then
+    # deleted by a background sweep (interval 0 disables it).
+    idempotency_key_ttl_hours: int = 24
+    idempotency_key_sweep_interval_seconds: int = 3600
+    idempotency_key_sweep_batch_size: int = 1000
+
+    # Read notifications older than this many days are deleted by a background
+    # sweep in batches (interval 0 disables it); unread ones are kept.
+    notification_retention_days: int = 90
+    notification_retention_sweep_interval_seconds: int = 3600
+    notification_retention_batch_size: int = 1000
+
+    # inventory_events on PostgreSQL is partitioned by month; a daily job
+    # creates partitions this many months ahead (interval 0 disables it).
+    # `manage.py archive-inventory-events` moves months older than the
+    # retention period to gzip files in INVENTORY_EVENT_ARCHIVE_DIR.
+    inventory_event_partition_months_ahead: int = 3
+    inventory_event_partition_interval_seconds: int = 86400
+    inventory_event_retention_months: int = 12
+    inventory_event_archive_dir: str = "archive"
+    inventory_event_archive_batch_size: int = 1000
+    # Daily stock checkpoints for /api/inventory/stock-at are built from new
+    # events on this interval (0 disables it).
+    stock_checkpoint_interval_seconds: int = 3600
+
+    # Password hashing: bcrypt cost factor, hashing threads (0 = one per CPU)
+    # and how many hash/verify jobs may be pending before requests get a 503.
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 0
+    password_hash_max_pending: int = 64
+
+    # Failed-login throttling: "memory" (per process, at most RATE_LIMIT_MAX_KEYS
+    # keys) or "redis" (shared through REDIS_URL).
+    rate_limit_backend: str = "memory"
+    rate_limit_max_keys: int = 100_000
+    login_max_failures_per_email: int = 5
+    login_max_failures_per_ip: int = 20
+    login_failure_window_seconds: int = 300
+    login_lockout_seconds: int = 300
 
     # Email Settings (optional - for later implementation)
     smtp_server: str = "smtp.gmail.com"
@@ -31,6 +82,18 @@ class Settings(BaseSettings):
     email_from: str = "noreply@myduka.com"
     email_password: Optional[str] = None
     sendgrid_api_key: Optional[str] = None
+    email_transport: str = "auto"  # auto, sendgrid or local (offline stand-in)
+
+    # Outbox of notifications and emails: workers poll every interval (0
+    # disables them), retry failures with exponential backoff capped at
+    # OUTBOX_BACKOFF_MAX_SECONDS and dead-letter after OUTBOX_MAX_ATTEMPTS.
+    # More than one worker needs PostgreSQL (SKIP LOCKED).
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_workers: int = 1
+    outbox_batch_size: int = 100
+    outbox_max_attempts: int = 8
+    outbox_backoff_seconds: float = 2.0
+    outbox_backoff_max_seconds: float = 600.0
 
     # Frontend integration
     frontend_base_url: str = "http://localhost:3001"
@@ -39,6 +102,38 @@ class Settings(BaseSettings):
     items_per_page: int = 10
     low_stock_default_threshold: int = 20
     seed_demo_users: bool = True
+
+    # Caching
+    cache_backend: str = "memory"  # memory or redis
+    redis_url: Optional[str] = None  # fake:// selects the in-process fake
+    dashboard_cache_ttl_seconds: int = 30
+    dashboard_cache_max_entries: int = 1024
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_entries: int = 4096
+    notification_recipient_cache_ttl_seconds: int = 300
+    notification_recipient_cache_max_entries: int = 4096
+
+    # Live notification stream (SSE): "memory" delivers within one process,
+    # "redis" fans events out to every worker through REDIS_URL. A client more
+    # than NOTIFICATION_STREAM_QUEUE_SIZE events behind is disconnected and
+    # catches up via Last-Event-ID (at most NOTIFICATION_STREAM_REPLAY_LIMIT).
+    pubsub_backend: str = "memory"  # memory or redis
+    notification_stream_heartbeat_seconds: float = 15.0
+    notification_stream_queue_size: int = 100
+    notification_stream_replay_limit: int = 100
+    notification_stream_retry_ms: int = 3000
+
+    # SQL instrumentation: statements slower than this are logged (0 disables);
+    # requests running more statements than the budget are logged, or fail
+    # when SQL_STATEMENT_BUDGET_RAISE is set (used by the test suite).
+    slow_query_threshold_ms: float = 200.0
+    sql_statement_budget: int = 0
+    sql_statement_budget_raise: bool = False
+    server_timing_enabled: bool = False
+
+    # Metrics: comma-separated latency histogram bucket bounds in seconds.
+    metrics_latency_buckets_raw: str = "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+
     # Comma-separated list to allow configuring multiple origins via env.
     cors_origins_raw: str = "http://localhost:3000,http://localhost:3001,http://localhost:5173"
 
@@ -53,5 +148,20 @@ class Settings(BaseSettings):
             if origin.strip()
         ]
 
+    @property
+    def metrics_latency_buckets(self) -> tuple[float, ...]:
+        # Parse and sort histogram bucket bounds from the raw string.
+        return tuple(
+            sorted(float(bound) for bound in self.metrics_latency_buckets_raw.split(",") if bound.strip())
+        )
+
+    @property
+    def async_database_url(self) -> str:
+        # Map the sync driver URL onto its async counterpart.
+        scheme, sep, rest = self.database_url.partition("://")
+        base = scheme.split("+", 1)[0]
+        async_driver = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}.get(base, scheme)
+        return f"{async_driver}{sep}{rest}"
+
 
 settings = Settings()
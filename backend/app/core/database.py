@@ -1,25 +1,42 @@
 """
 Database configuration and session management
 """
+import logging
+import random
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from typing import AsyncGenerator
+from typing import TYPE_CHECKING, AsyncGenerator, Callable, Generator, Optional, TypeVar
 from .config import settings
+from .metrics import InstrumentedQueuePool, instrument_pool
+from .query_stats import instrument_engine
 
-# Create database engine
+T = TypeVar("T")
+logger = logging.getLogger("myduka.sql")
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# Create database engine; in-memory SQLite keeps its single-connection pool.
+pool_options = {} if ":memory:" in settings.database_url else {"poolclass": InstrumentedQueuePool}
 if settings.database_driver == "sqlite":
     engine = create_engine(
         settings.database_url,
         connect_args={"check_same_thread": False},
         echo=settings.debug,
         pool_pre_ping=True,
+        **pool_options,
     )
 else:
     engine = create_engine(
         settings.database_url,
         echo=settings.debug,
         pool_pre_ping=True,
+        **pool_options,
     )
+instrument_pool(engine)
+instrument_engine(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -31,14 +48,84 @@ SessionLocal = sessionmaker(
 # Base class for all models
 Base = declarative_base()
 
+# Async engine/session factory, created on first use so aiosqlite/asyncpg
+# are only required when DATABASE_ASYNC is enabled.
+_async_engine: Optional["AsyncEngine"] = None
+_async_session_factory = None
+
+
+def get_async_engine() -> "AsyncEngine":
+    """Return the shared async engine (asyncpg for PostgreSQL, aiosqlite for SQLite)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        _async_engine = create_async_engine(
+            settings.async_database_url,
+            echo=settings.debug,
+            pool_pre_ping=True,
+        )
+        instrument_engine(_async_engine.sync_engine)
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_engine
+
 
-async def get_db() -> AsyncGenerator[Session, None]:
+def get_db() -> Generator[Session, None, None]:
     """
     Dependency function to get database session
     Usage: In your route: db: Session = Depends(get_db)
+
+    Routes using this session are plain `def` handlers so FastAPI runs them
+    in its worker threadpool instead of blocking the event loop.
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# PostgreSQL serialization failure and deadlock; SQLite reports lock timeouts by message.
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+def is_retryable_error(exc: DBAPIError) -> bool:
+    """Return True for transient conflicts worth retrying the whole transaction for."""
+    original = exc.orig
+    code = getattr(original, "sqlstate", None) or getattr(original, "pgcode", None)
+    return code in RETRYABLE_SQLSTATES or "database is locked" in str(original)
+
+
+def run_with_retries(db: Session, work: Callable[[], T], attempts: Optional[int] = None) -> T:
+    """
+    Run `work` (which must end with its own commit), retrying on transient conflicts.
+
+    The session is rolled back before each retry, so `work` must redo every
+    change it makes; anything else (including HTTP errors) propagates at once.
+    """
+    attempts = attempts or settings.db_retry_attempts
+    for attempt in range(1, attempts + 1):
+        try:
+            return work()
+        except DBAPIError as exc:
+            if attempt == attempts or not is_retryable_error(exc):
+                raise
+            db.rollback()
+            delay = random.uniform(0, settings.db_retry_backoff_seconds * 2 ** (attempt - 1))
+            logger.warning("Retrying transaction after conflict attempt=%s delay=%.3fs: %s", attempt, delay, exc.orig)
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    """
+    Dependency function to get an async database session
+    Usage: In an `async def` route: db: AsyncSession = Depends(get_async_db)
+    """
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
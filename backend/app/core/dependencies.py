@@ -8,23 +8,27 @@ from .security import verify_token
 from typing import Optional
 
 
-async def get_current_user(
+def get_current_user(
     request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get the current authenticated user from JWT token in Authorization header
-    
+
+    Returns a `UserPrincipal` snapshot rather than a session-bound `User`; it
+    is cached per user and token for PRINCIPAL_CACHE_TTL_SECONDS, so repeat
+    requests do not query the users table.
+
     Usage in routes:
     @router.get("/protected")
-    async def protected_route(current_user = Depends(get_current_user)):
+    def protected_route(current_user = Depends(get_current_user)):
         ...
     """
-    # Local import avoids circular dependency during app startup.
-    from app.models.user import User
-    
-    # Extract token from Authorization header
-    auth_header = request.headers.get("authorization")
+    return authenticate_token(db, bearer_token(request.headers.get("authorization")))
+
+
+def bearer_token(auth_header: Optional[str]) -> str:
+    """Extract the token from an `Authorization: Bearer <token>` header value."""
     if not auth_header:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,25 +47,38 @@ async def get_current_user(
             detail="Invalid authorization header format",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+    return token
+
+
+def authenticate_token(db: Session, token: str):
+    """Resolve an access token to an active `UserPrincipal` (cached; see `get_current_user`)."""
+    # Local import avoids circular dependency during app startup.
+    from app.services.principal_cache_service import cache_principal, get_cached_principal, load_principal
+
     payload = verify_token(token)
     user_id: int = payload.get("sub")
+
+    # Only active users are cached; deactivation invalidates the entry.
+    principal = get_cached_principal(user_id, token)
+    if principal is not None:
+        return principal
+
+    principal = load_principal(db, user_id)
     
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is deactivated"
         )
     
-    return user
+    cache_principal(token, principal)
+    return principal
 
 
 def check_permission(required_role: str):
@@ -70,7 +87,7 @@ def check_permission(required_role: str):
     
     Usage in routes:
     @router.post("/admin-only")
-    async def admin_route(current_user = Depends(check_permission("admin"))):
+    def admin_route(current_user = Depends(check_permission("admin"))):
         ...
     """
     async def verify_role(current_user = Depends(get_current_user)):
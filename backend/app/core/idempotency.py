@@ -0,0 +1,174 @@
+"""
+Idempotency-Key support for write requests.
+
+Clients on flaky connections send `Idempotency-Key: <unique value>` with
+POST/PUT/PATCH/DELETE requests and reuse it when retrying. The first request
+runs normally and its response is stored; a retry with the same key and the
+same method, path and body gets that response back (marked with
+`Idempotent-Replayed: true`) without the handler running again.
+
+- Keys are scoped to the authenticated user; requests without a valid
+  bearer token pass straight through and fail authentication as usual.
+- Reusing a key for a different request is a 422; retrying while the first
+  request is still running is a 409.
+- 5xx, 409 and 429 responses are not stored, so those can be retried.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.requests import ClientDisconnect
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import idempotency_service
+
+from .security import verify_token
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Transient outcomes the client should be able to retry with the same key.
+UNSTORED_STATUSES = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+
+
+def _json_error(status_code: int, detail: str) -> Response:
+    return Response(
+        content=json.dumps({"detail": detail}),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def _request_user_id(headers: Headers):
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verify_token(token.strip()).get("sub")
+    except HTTPException:
+        return None
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _request_hash(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{scope['method']} {scope['path']}?{scope['query_string'].decode('latin-1')}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """A `receive` that hands the app the already-read body, then defers to the client."""
+    pending = True
+
+    async def replay() -> Message:
+        nonlocal pending
+        if pending:
+            pending = False
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware, so the request body it hashes is read once and
+    replayed to the app (BaseHTTPMiddleware on older Starlette releases
+    leaves the handler waiting for a body that was already consumed).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            error = _json_error(
+                status.HTTP_400_BAD_REQUEST,
+                f"{IDEMPOTENCY_KEY_HEADER} must be 1-{MAX_KEY_LENGTH} characters",
+            )
+            await error(scope, receive, send)
+            return
+        user_id = _request_user_id(headers)
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        request_hash = _request_hash(scope, body)
+        stored = await run_in_threadpool(idempotency_service.claim_key_in_session, user_id, key, request_hash)
+        if stored is not None:
+            await self._stored_response(stored, request_hash)(scope, receive, send)
+            return
+
+        # Hold the response back until it is stored, so a retry after the
+        # client sees it always gets the replay.
+        start: Optional[Message] = None
+        chunks = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+        except BaseException:
+            await run_in_threadpool(idempotency_service.release_key_in_session, user_id, key)
+            raise
+
+        status_code = start["status"]
+        content = b"".join(chunks)
+        if status_code >= 500 or status_code in UNSTORED_STATUSES:
+            await run_in_threadpool(idempotency_service.release_key_in_session, user_id, key)
+        else:
+            await run_in_threadpool(
+                idempotency_service.store_response_in_session,
+                user_id,
+                key,
+                status_code,
+                Headers(raw=start["headers"]).get("content-type"),
+                content,
+            )
+        await send(start)
+        await send({"type": "http.response.body", "body": content, "more_body": False})
+
+    @staticmethod
+    def _stored_response(stored, request_hash: str) -> Response:
+        if stored.request_hash != request_hash:
+            return _json_error(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request",
+            )
+        if stored.in_progress:
+            return _json_error(
+                status.HTTP_409_CONFLICT,
+                f"A request with this {IDEMPOTENCY_KEY_HEADER} is still being processed",
+            )
+        response = Response(content=stored.body, status_code=stored.status_code, media_type=stored.content_type)
+        response.headers[REPLAYED_HEADER] = "true"
+        return response
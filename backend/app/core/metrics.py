@@ -0,0 +1,122 @@
+"""
+Prometheus metrics for HTTP traffic and the database connection pool.
+
+With several uvicorn/gunicorn workers, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory before the workers start: every worker then writes its
+samples there and `/metrics` aggregates them (see gunicorn.conf.py).
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from .config import settings
+
+# Requests that matched no route share one label value to bound cardinality.
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "myduka_http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "myduka_http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ["method", "route"],
+    buckets=settings.metrics_latency_buckets,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "myduka_http_requests_in_flight",
+    "HTTP requests currently being served.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "myduka_db_pool_checked_out",
+    "Database connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "myduka_db_pool_overflow",
+    "Database connections open beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "myduka_db_pool_wait_seconds",
+    "Time spent obtaining a database connection from the pool.",
+    buckets=settings.metrics_latency_buckets,
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "myduka_password_hash_queue_depth",
+    "bcrypt hash/verify jobs queued or running on the password hashing pool.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "myduka_password_hash_duration_seconds",
+    "Time from submitting a bcrypt job to its result, including queue wait.",
+    ["operation"],
+    buckets=settings.metrics_latency_buckets,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "myduka_password_hash_rejected_total",
+    "bcrypt jobs refused because the password hashing queue was full.",
+)
+
+
+def route_label(scope) -> str:
+    """Return the matched route template (e.g. /api/inventory/{inventory_id})."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def instrument_pool(engine) -> None:
+    """Track checked-out connections and overflow from pool events."""
+    pool = engine.pool
+
+    def _refresh_overflow() -> None:
+        overflow = getattr(pool, "overflow", None)
+        if overflow is not None:
+            DB_POOL_OVERFLOW.set(max(0, overflow()))
+
+    def _on_checkout(*_args) -> None:
+        DB_POOL_CHECKED_OUT.inc()
+        _refresh_overflow()
+
+    def _on_checkin(*_args) -> None:
+        # Fires before the connection is handed back, so count it ourselves.
+        DB_POOL_CHECKED_OUT.dec()
+        _refresh_overflow()
+
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the exposition payload and content type, aggregating workers if needed."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,55 @@
+"""
+Keyset (cursor) pagination for newest-first list endpoints
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor for the next page; absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(query: Query, model, response: Response, cursor: Optional[str], limit: int) -> list:
+    """
+    Return one page of `query` ordered by (created_at, id) descending.
+
+    Rows after `cursor` are selected with a keyset predicate instead of
+    OFFSET, so every page costs the same index range scan. When more rows
+    remain, the cursor for the next page is set on the response header.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            )
+        )
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
@@ -0,0 +1,156 @@
+"""
+Publish/subscribe hub for pushing events to connected clients.
+
+Subscribers are asyncio queues owned by long-lived responses (e.g. the
+notification SSE stream), keyed by a topic such as a user id. `publish` is
+thread-safe, so sync handlers and background jobs running in the threadpool
+can call it.
+
+- `LocalHub` delivers within this process only.
+- `RedisHub` sends every event through a Redis channel; a listener thread in
+  each worker hands it to that worker's local subscribers, so events reach
+  users connected to any worker.
+
+A subscriber that falls more than its queue size behind is marked
+`overflowed` and should disconnect; clients reconnect and catch up from the
+database.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Optional
+
+from .config import settings
+
+logger = logging.getLogger("myduka.pubsub")
+
+
+class Subscription:
+    """One subscriber's queue; read with `await subscription.get(timeout)`."""
+
+    def __init__(self, topic: str, loop: asyncio.AbstractEventLoop, max_queued: int):
+        self.topic = topic
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.overflowed = False
+
+    def _offer(self, event: Any) -> None:
+        # Runs on the subscriber's event loop.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float) -> Optional[Any]:
+        """Return the next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalHub:
+    """In-process hub; events reach subscribers of this worker only."""
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Register a subscriber on the running event loop."""
+        subscription = Subscription(topic, asyncio.get_running_loop(), self.max_queued)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        with self._lock:
+            if topic is not None:
+                return len(self._subscribers.get(topic, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _deliver_local(self, topic: str, event: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down; it will never read again.
+                self.unsubscribe(subscription)
+
+    def publish(self, topic: str, event: Any) -> None:
+        """Send a JSON-serializable `event` to every subscriber of `topic`."""
+        self._deliver_local(topic, event)
+
+    def close(self) -> None:
+        pass
+
+
+class RedisHub(LocalHub):
+    """Hub that fans events out to every worker through one Redis pub/sub channel."""
+
+    def __init__(self, client, channel: str, max_queued: int = 100):
+        super().__init__(max_queued=max_queued)
+        self.client = client
+        self.channel = channel
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def subscribe(self, topic: str) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(topic)
+
+    def publish(self, topic: str, event: Any) -> None:
+        self.client.publish(self.channel, json.dumps({"topic": topic, "event": event}))
+
+    def _ensure_listener(self) -> None:
+        with self._start_lock:
+            if self._listener is None:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._listener = threading.Thread(
+                    target=self._listen, args=(pubsub,), name=f"pubsub-{self.channel}", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self, pubsub) -> None:
+        try:
+            while not self._stopping.is_set():
+                try:
+                    message = pubsub.get_message(timeout=1.0)
+                except Exception:
+                    logger.exception("Redis pub/sub listener error on %s", self.channel)
+                    self._stopping.wait(1.0)
+                    continue
+                if message is None or message.get("type") != "message":
+                    continue
+                envelope = json.loads(message["data"])
+                self._deliver_local(envelope["topic"], envelope["event"])
+        finally:
+            pubsub.close()
+
+    def close(self) -> None:
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+
+
+def build_hub(namespace: str, max_queued: int) -> LocalHub:
+    """Create a hub for `namespace` using the backend selected by PUBSUB_BACKEND."""
+    if settings.pubsub_backend == "redis":
+        from .redis import get_redis
+
+        return RedisHub(get_redis(), channel=f"myduka:{namespace}", max_queued=max_queued)
+    return LocalHub(max_queued=max_queued)
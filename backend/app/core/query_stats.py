@@ -0,0 +1,93 @@
+"""
+Per-request SQL statement counts, database time and slow-query logging.
+
+`request_logging_middleware` opens a `QueryStats` for each request in a
+context variable; engine events add every statement executed while handling
+that request (sync handlers run in the threadpool with a copy of the request
+context, so they update the same object).
+"""
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import settings
+
+logger = logging.getLogger("myduka.sql")
+
+
+class StatementBudgetExceeded(RuntimeError):
+    """Raised when a request runs more statements than SQL_STATEMENT_BUDGET allows."""
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_request_stats() -> QueryStats:
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def check_statement_budget(stats: QueryStats, method: str, path: str) -> None:
+    """Log, or raise when SQL_STATEMENT_BUDGET_RAISE is set, if the budget is exceeded."""
+    budget = settings.sql_statement_budget
+    if not budget or stats.count <= budget:
+        return
+    message = f"{method} {path} ran {stats.count} SQL statements (budget {budget})"
+    if settings.sql_statement_budget_raise:
+        raise StatementBudgetExceeded(message)
+    logger.warning(message)
+
+
+def server_timing_header(stats: QueryStats, total_ms: float) -> str:
+    return f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries", total;dur={total_ms:.2f}'
+
+
+def instrument_engine(engine) -> None:
+    """Attach statement counting and slow-query logging to a sync engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration_ms += elapsed_ms
+        threshold = settings.slow_query_threshold_ms
+        if threshold and elapsed_ms >= threshold:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "duration_ms": round(elapsed_ms, 2),
+                        "statement": " ".join(statement.split())[:1000],
+                    }
+                )
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # Keep the start-time stack balanced when a statement fails.
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
@@ -0,0 +1,175 @@
+"""
+Failure-counting rate limiters with lockouts
+
+Each key keeps a sliding-window counter approximated from two fixed windows
+(the current count plus the previous one weighted by how much of it still
+overlaps), so memory per key is constant and entries expire on their own.
+Once the estimate reaches the limit the key is locked for a fixed period.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from .config import settings
+
+
+def _sliding_estimate(previous: int, current: int, now: float, window_seconds: int) -> float:
+    overlap = 1 - (now % window_seconds) / window_seconds
+    return previous * overlap + current
+
+
+class RateLimiter(ABC):
+    """
+    Interface shared by the in-process and Redis limiters.
+
+    A key is locked for `lockout_seconds` once `limit` failures fall within a
+    sliding `window_seconds` window.
+    """
+
+    def __init__(self, limit: int, window_seconds: int, lockout_seconds: int):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.lockout_seconds = lockout_seconds
+
+    @abstractmethod
+    def locked_for(self, key: str) -> int:
+        """Return the seconds left on `key`'s lockout, or 0 when it is not locked."""
+
+    @abstractmethod
+    def hit(self, key: str) -> bool:
+        """Count one failure for `key`; lock it and return True once the limit is reached."""
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Per-process limiter holding at most `max_keys` keys (least recently used are dropped)."""
+
+    def __init__(self, limit: int, window_seconds: int, lockout_seconds: int, max_keys: int):
+        super().__init__(limit, window_seconds, lockout_seconds)
+        self.max_keys = max_keys
+        # key -> (window index, count in that window, count in the window before)
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+        self._locked_until: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bounded_set(entries: OrderedDict, key: str, value, max_keys: int) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max_keys:
+            entries.popitem(last=False)
+
+    def locked_for(self, key: str) -> int:
+        now = time.time()
+        with self._lock:
+            locked_until = self._locked_until.get(key)
+            if locked_until is None:
+                return 0
+            if locked_until <= now:
+                del self._locked_until[key]
+                return 0
+            return max(1, int(locked_until - now))
+
+    def hit(self, key: str) -> bool:
+        now = time.time()
+        window = int(now // self.window_seconds)
+        with self._lock:
+            stored_window, current, previous = self._counters.get(key, (window, 0, 0))
+            if stored_window == window - 1:
+                current, previous = 0, current
+            elif stored_window != window:
+                current, previous = 0, 0
+            current += 1
+            if _sliding_estimate(previous, current, now, self.window_seconds) >= self.limit:
+                self._counters.pop(key, None)
+                self._bounded_set(self._locked_until, key, now + self.lockout_seconds, self.max_keys)
+                return True
+            self._bounded_set(self._counters, key, (window, current, previous), self.max_keys)
+            return False
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+            self._locked_until.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._locked_until.clear()
+
+    def __len__(self) -> int:
+        return len(self._counters) + len(self._locked_until)
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Limiter shared by all workers through a Redis-compatible client.
+
+    Window counters live under `<namespace>:<key>:<window index>` and lockouts
+    under `<namespace>:lock:<key>`; every key carries a TTL.
+    """
+
+    def __init__(self, client, namespace: str, limit: int, window_seconds: int, lockout_seconds: int):
+        super().__init__(limit, window_seconds, lockout_seconds)
+        self.client = client
+        self.namespace = namespace
+
+    def _window_key(self, key: str, window: int) -> str:
+        return f"{self.namespace}:{key}:{window}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:lock:{key}"
+
+    def locked_for(self, key: str) -> int:
+        remaining = self.client.ttl(self._lock_key(key))
+        return max(0, remaining)
+
+    def hit(self, key: str) -> bool:
+        now = time.time()
+        window = int(now // self.window_seconds)
+        current_key = self._window_key(key, window)
+        current = self.client.incr(current_key)
+        if current == 1:
+            self.client.expire(current_key, 2 * self.window_seconds)
+        previous = int(self.client.get(self._window_key(key, window - 1)) or 0)
+        if _sliding_estimate(previous, current, now, self.window_seconds) >= self.limit:
+            self.client.set(self._lock_key(key), "1", ex=self.lockout_seconds)
+            self.client.delete(current_key, self._window_key(key, window - 1))
+            return True
+        return False
+
+    def reset(self, key: str) -> None:
+        window = int(time.time() // self.window_seconds)
+        self.client.delete(
+            self._lock_key(key),
+            self._window_key(key, window),
+            self._window_key(key, window - 1),
+        )
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.namespace}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def build_rate_limiter(namespace: str, limit: int, window_seconds: int, lockout_seconds: int) -> RateLimiter:
+    """Create a limiter for `namespace` using the backend selected by RATE_LIMIT_BACKEND."""
+    if settings.rate_limit_backend == "redis":
+        from .redis import get_redis
+
+        return RedisRateLimiter(
+            get_redis(),
+            namespace=f"myduka:ratelimit:{namespace}",
+            limit=limit,
+            window_seconds=window_seconds,
+            lockout_seconds=lockout_seconds,
+        )
+    return InMemoryRateLimiter(limit, window_seconds, lockout_seconds, max_keys=settings.rate_limit_max_keys)
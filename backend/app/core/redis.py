@@ -0,0 +1,155 @@
+"""
+Redis client factory and an in-process fake for tests and local development
+"""
+import fnmatch
+import queue
+import threading
+import time
+from typing import Optional
+
+from .config import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Return the shared Redis client configured by REDIS_URL.
+
+    `REDIS_URL=fake://` selects the in-process `FakeRedis`, which lets the
+    Redis-backed code paths run without a server.
+    """
+    global _client
+    if _client is None:
+        if not settings.redis_url:
+            raise RuntimeError("REDIS_URL must be set to use a Redis-backed component.")
+        if settings.redis_url.startswith("fake://"):
+            _client = FakeRedis()
+        else:
+            import redis
+
+            _client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _client
+
+
+class FakeRedis:
+    """
+    Minimal thread-safe stand-in for the subset of the redis-py API we use.
+
+    Values are stored as strings, like a `decode_responses=True` client.
+    """
+
+    def __init__(self):
+        self._data: dict[str, str] = {}
+        self._expires: dict[str, float] = {}
+        self._channels: dict[str, set["FakePubSub"]] = {}
+        self._lock = threading.RLock()
+
+    def _purge(self, key: str) -> None:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            self._purge(name)
+            return self._data.get(name)
+
+    def set(self, name: str, value, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False):
+        with self._lock:
+            self._purge(name)
+            if nx and name in self._data:
+                return None
+            self._data[name] = str(value)
+            self._expires.pop(name, None)
+            if ex is not None:
+                self._expires[name] = time.monotonic() + ex
+            elif px is not None:
+                self._expires[name] = time.monotonic() + px / 1000
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            removed = 0
+            for name in names:
+                self._purge(name)
+                if self._data.pop(name, None) is not None:
+                    removed += 1
+                self._expires.pop(name, None)
+            return removed
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            self._purge(name)
+            value = int(self._data.get(name, 0)) + amount
+            self._data[name] = str(value)
+            return value
+
+    def expire(self, name: str, time_seconds: int) -> bool:
+        with self._lock:
+            self._purge(name)
+            if name not in self._data:
+                return False
+            self._expires[name] = time.monotonic() + time_seconds
+            return True
+
+    def ttl(self, name: str) -> int:
+        with self._lock:
+            self._purge(name)
+            if name not in self._data:
+                return -2
+            deadline = self._expires.get(name)
+            if deadline is None:
+                return -1
+            return max(0, int(round(deadline - time.monotonic())))
+
+    def scan_iter(self, match: Optional[str] = None):
+        with self._lock:
+            for key in list(self._data):
+                self._purge(key)
+            keys = [key for key in self._data if match is None or fnmatch.fnmatchcase(key, match)]
+        yield from keys
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            return True
+
+    def publish(self, channel: str, message: str) -> int:
+        with self._lock:
+            receivers = list(self._channels.get(channel, ()))
+        for pubsub in receivers:
+            pubsub._messages.put({"type": "message", "channel": channel, "data": message})
+        return len(receivers)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "FakePubSub":
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    """Pub/sub connection of a `FakeRedis`; only `message` events are produced."""
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._messages: queue.Queue = queue.Queue()
+        self._channels: set[str] = set()
+
+    def subscribe(self, *channels: str) -> None:
+        with self._redis._lock:
+            for channel in channels:
+                self._redis._channels.setdefault(channel, set()).add(self)
+                self._channels.add(channel)
+
+    def get_message(self, timeout: float = 0.0) -> Optional[dict]:
+        try:
+            return self._messages.get(timeout=timeout) if timeout else self._messages.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        with self._redis._lock:
+            for channel in self._channels:
+                self._redis._channels.get(channel, set()).discard(self)
+            self._channels.clear()
@@ -1,6 +1,11 @@
 """
 Security utilities for JWT token handling and password hashing
 """
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import uuid4
@@ -10,21 +15,99 @@ from fastapi import HTTPException, status
 from jose import JWTError, jwt
 
 from .config import settings
+from .metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_REJECTED
+
+# bcrypt is CPU-bound, so it runs on its own small pool instead of competing
+# with request handlers for the shared threadpool. Once PASSWORD_HASH_MAX_PENDING
+# jobs are queued or running, new ones are refused with a 503.
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_lock = threading.Lock()
+_password_pending = 0
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    with _password_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers or os.cpu_count() or 1,
+                thread_name_prefix="bcrypt",
+            )
+        return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Stop the hashing pool; the next hash/verify starts one sized from current settings."""
+    global _password_executor
+    with _password_lock:
+        executor, _password_executor = _password_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _submit_bcrypt(operation: str, func, *args) -> Future:
+    global _password_pending
+    executor = _get_password_executor()
+    with _password_lock:
+        if _password_pending >= settings.password_hash_max_pending:
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _password_pending += 1
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+    submitted_at = time.perf_counter()
+
+    def _done(_future: Future) -> None:
+        global _password_pending
+        PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - submitted_at)
+        with _password_lock:
+            _password_pending -= 1
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+
+    future = executor.submit(func, *args)
+    future.add_done_callback(_done)
+    return future
+
+
+def _hashpw(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode("utf-8")
+    """Hash a password using bcrypt with BCRYPT_ROUNDS."""
+    return _submit_bcrypt("hash", _hashpw, password).result()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    password_bytes = plain_password.encode("utf-8")
-    hashed_bytes = hashed_password.encode("utf-8")
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    return _submit_bcrypt("verify", _checkpw, plain_password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without holding an event-loop or threadpool thread while bcrypt runs."""
+    return await asyncio.wrap_future(_submit_bcrypt("hash", _hashpw, password))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without holding an event-loop or threadpool thread while bcrypt runs."""
+    return await asyncio.wrap_future(_submit_bcrypt("verify", _checkpw, plain_password, hashed_password))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Return True when the hash was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.bcrypt_rounds
 
 
 def _encode_token(data: dict, expires_at: datetime, token_type: str) -> str:
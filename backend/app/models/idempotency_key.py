@@ -0,0 +1,31 @@
+"""
+SQLAlchemy model for stored responses to requests sent with an Idempotency-Key.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+
+from app.core.database import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    # Keys are scoped per user; the unique index is the replay lookup.
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    # NULL until the first request finishes; the row is then a claim in progress.
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,7 +1,7 @@
 """
 SQLAlchemy models for Inventory entity
 """
-from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey, String, Enum
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey, String, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -23,6 +23,11 @@ class Inventory(Base):
     Inventory model tracking product stock and movements
     """
     __tablename__ = "inventory"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_inventory_store_id_created_id", "store_id", "created_at", "id"),
+        Index("ix_inventory_created_by_created_id", "created_by", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
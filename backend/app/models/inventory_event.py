@@ -3,7 +3,7 @@ Model for inventory timeline events.
 """
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
 
 from app.core.database import Base
 
@@ -13,7 +13,17 @@ def utc_now():
 
 
 class InventoryEvent(Base):
+    """
+    Append-only log of stock and payment changes.
+
+    On PostgreSQL the table is partitioned by month of `created_at` (see
+    `app.services.inventory_event_partition_service`).
+    """
     __tablename__ = "inventory_events"
+    # Product history walks (product, store, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_inventory_events_product_store_created", "product_id", "store_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     inventory_id = Column(Integer, index=True, nullable=True)
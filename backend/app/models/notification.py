@@ -3,7 +3,7 @@ Model for in-app notifications.
 """
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text
 
 from app.core.database import Base
 
@@ -14,6 +14,12 @@ def utc_now():
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Keyset pagination walks (scope, created_at, id) newest first; unread
+    # counts, unread-only listings and mark-all-read seek on (user, is_read).
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_id", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_id_is_read_created", "user_id", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, index=True, nullable=False)
@@ -0,0 +1,30 @@
+"""
+Model for per-user unread notification counts.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer
+
+from app.core.database import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class NotificationCounter(Base):
+    """
+    Number of unread notifications for one user.
+
+    Maintained by `app.services.notification_counter_service` in the same
+    transaction as the notification changes it counts, so the unread badge is
+    a primary-key lookup instead of a COUNT over the user's notifications.
+    """
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+
+    def __repr__(self):
+        return f"<NotificationCounter(user_id={self.user_id}, unread_count={self.unread_count})>"
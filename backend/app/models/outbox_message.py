@@ -0,0 +1,35 @@
+"""
+Model for the transactional outbox of notifications and emails.
+"""
+from datetime import datetime, timezone
+import enum
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+
+from app.core.database import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    DEAD = "dead"
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+    # Workers poll for pending messages that are due, oldest first.
+    __table_args__ = (
+        Index("ix_outbox_messages_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String(20), default=OutboxStatus.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, default=utc_now, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
@@ -4,7 +4,7 @@ SQLAlchemy models for Purchase Orders.
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -23,6 +23,10 @@ class PurchaseOrderStatus(str, enum.Enum):
 
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_purchase_orders_store_id_created_id", "store_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False, index=True)
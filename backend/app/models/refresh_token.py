@@ -3,7 +3,7 @@ SQLAlchemy model for persisted refresh tokens used for rotation and logout.
 """
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -15,6 +15,10 @@ def utc_now():
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    # The background sweeper scans for expired and revoked tokens.
+    __table_args__ = (
+        Index("ix_refresh_tokens_expires_at_revoked", "expires_at", "revoked"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
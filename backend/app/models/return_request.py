@@ -4,7 +4,7 @@ SQLAlchemy model for product returns.
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -28,6 +28,10 @@ class ReturnStatus(str, enum.Enum):
 
 class ReturnRequest(Base):
     __tablename__ = "returns"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_returns_store_id_created_id", "store_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False, index=True)
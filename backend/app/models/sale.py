@@ -3,7 +3,7 @@ SQLAlchemy model for sales entries.
 """
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -15,6 +15,10 @@ def utc_now():
 
 class Sale(Base):
     __tablename__ = "sales"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_sales_store_id_created_id", "store_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False, index=True)
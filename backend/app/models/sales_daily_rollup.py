@@ -0,0 +1,44 @@
+"""
+Model for pre-aggregated daily sales per store and product.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, UniqueConstraint
+
+from app.core.database import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class SalesDailyRollup(Base):
+    """
+    One row per store, product and day summarising the `sales` table.
+
+    Updated incrementally when a sale is recorded and rebuildable from
+    `sales` via `app.services.rollup_service.rebuild_sales_rollup`.
+    """
+    __tablename__ = "sales_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint("store_id", "product_id", "day", name="uq_sales_daily_rollup_store_product_day"),
+        Index("ix_sales_daily_rollup_store_day", "store_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, nullable=False, index=True)
+    product_id = Column(Integer, nullable=False, index=True)
+    day = Column(Date, nullable=False, index=True)
+
+    quantity = Column(Integer, nullable=False, default=0)
+    total_sales = Column(Float, nullable=False, default=0.0)
+    total_cost = Column(Float, nullable=False, default=0.0)
+    orders = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<SalesDailyRollup(store_id={self.store_id}, product_id={self.product_id}, "
+            f"day={self.day})>"
+        )
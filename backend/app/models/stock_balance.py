@@ -0,0 +1,37 @@
+"""
+Model for per-store, per-product on-hand stock totals.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, UniqueConstraint
+
+from app.core.database import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class StockBalance(Base):
+    """
+    Running total of `Inventory.quantity_in_stock` for one store and product.
+
+    Maintained by `app.services.stock_service` in the same transaction as the
+    inventory rows it summarises, so stock checks are a single indexed lookup.
+    """
+    __tablename__ = "stock_balances"
+    __table_args__ = (
+        UniqueConstraint("store_id", "product_id", name="uq_stock_balances_store_product"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, nullable=False, index=True)
+    product_id = Column(Integer, nullable=False, index=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<StockBalance(store_id={self.store_id}, product_id={self.product_id}, "
+            f"quantity={self.quantity})>"
+        )
@@ -0,0 +1,40 @@
+"""
+Model for daily stock snapshots rebuilt from inventory events.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Date, DateTime, Integer, UniqueConstraint
+
+from app.core.database import Base
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class StockCheckpoint(Base):
+    """
+    Stock of one product in one store at the end of `day` (UTC).
+
+    Written by `app.services.stock_replay_service` only for days on which
+    the stock changed, so the latest checkpoint on or before a day holds
+    that day's closing stock.
+    """
+    __tablename__ = "stock_checkpoints"
+    # Point-in-time reads seek the newest (store, product) checkpoint before a day.
+    __table_args__ = (
+        UniqueConstraint("store_id", "product_id", "day", name="uq_stock_checkpoints_store_product_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, nullable=False, index=True)
+    product_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<StockCheckpoint(store_id={self.store_id}, product_id={self.product_id}, "
+            f"day={self.day}, quantity={self.quantity})>"
+        )
@@ -4,7 +4,7 @@ SQLAlchemy model for stock transfers between stores.
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -23,6 +23,11 @@ class TransferStatus(str, enum.Enum):
 
 class StockTransfer(Base):
     __tablename__ = "stock_transfers"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_stock_transfers_from_store_id_created_id", "from_store_id", "created_at", "id"),
+        Index("ix_stock_transfers_to_store_id_created_id", "to_store_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     from_store_id = Column(Integer, ForeignKey("stores.id"), nullable=False, index=True)
@@ -1,7 +1,7 @@
 """
 SQLAlchemy models for Store entity
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
@@ -16,6 +16,10 @@ class Store(Base):
     Store model representing individual store locations
     """
     __tablename__ = "stores"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_stores_merchant_id_created_id", "merchant_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     merchant_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -1,7 +1,7 @@
 """
 SQLAlchemy models for Supply Request entity
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -24,6 +24,11 @@ class SupplyRequest(Base):
     Supply Request model for clerks to request additional products
     """
     __tablename__ = "supply_requests"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_supply_requests_store_id_created_id", "store_id", "created_at", "id"),
+        Index("ix_supply_requests_requested_by_created_id", "requested_by", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
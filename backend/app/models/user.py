@@ -1,7 +1,7 @@
 """
 SQLAlchemy models for User entity
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -25,6 +25,10 @@ class User(Base):
     Roles: superuser (merchant), admin (store admin), clerk (data entry)
     """
     __tablename__ = "users"
+    # Keyset pagination walks (scope, created_at, id) newest first.
+    __table_args__ = (
+        Index("ix_users_store_id_created_id", "store_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
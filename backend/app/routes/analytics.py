@@ -1,20 +1,22 @@
 """
 Analytics and reporting routes.
 """
-import csv
-from io import StringIO
-from typing import List
+from datetime import datetime
+from typing import Iterator, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy import case, func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, select, true
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission
 from app.models.expense import Expense
 from app.models.inventory import Inventory
+from app.models.inventory_event import InventoryEvent
 from app.models.product import Product
 from app.models.sale import Sale
+from app.models.sales_daily_rollup import SalesDailyRollup
 from app.models.store import Store
 from app.schemas.analytics import (
     ExpenseCategoryItem,
@@ -24,6 +26,7 @@ from app.schemas.analytics import (
     SalesTrendPoint,
     StorePerformanceItem,
 )
+from app.services.export_service import iter_csv, stream_query_csv
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -32,31 +35,33 @@ def _sum_or_zero(value) -> float:
     return 0.0 if value is None else float(value)
 
 
-@router.get("/store-performance", response_model=List[StorePerformanceItem])
-async def store_performance(
-    current_user=Depends(check_permission("admin")),
-    db: Session = Depends(get_db),
-    limit: int = 10,
-):
+def _store_performance_rows(current_user, db: Session, limit: int):
     query = (
         db.query(
             Store.id,
             Store.name,
-            func.sum(Sale.total_price).label("total_sales"),
-            func.sum(Sale.total_price - Sale.total_cost).label("total_profit"),
-            func.count(Sale.id).label("orders"),
+            func.sum(SalesDailyRollup.total_sales).label("total_sales"),
+            func.sum(SalesDailyRollup.total_sales - SalesDailyRollup.total_cost).label("total_profit"),
+            func.sum(SalesDailyRollup.orders).label("orders"),
         )
-        .outerjoin(Sale, Sale.store_id == Store.id)
+        .outerjoin(SalesDailyRollup, SalesDailyRollup.store_id == Store.id)
         .group_by(Store.id)
-        .order_by(func.sum(Sale.total_price).desc())
+        .order_by(func.sum(SalesDailyRollup.total_sales).desc())
     )
     if current_user.role == "admin" and current_user.store_id is not None:
         query = query.filter(Store.id == current_user.store_id)
     if current_user.role == "superuser":
         query = query.filter(Store.merchant_id == current_user.id)
+    return query.limit(limit).all()
+
 
-    query = query.limit(limit)
-    rows = query.all()
+@router.get("/store-performance", response_model=List[StorePerformanceItem])
+def store_performance(
+    current_user=Depends(check_permission("admin")),
+    db: Session = Depends(get_db),
+    limit: int = 10,
+):
+    rows = _store_performance_rows(current_user, db, limit)
     return [
         StorePerformanceItem(
             store_id=row.id,
@@ -69,31 +74,35 @@ async def store_performance(
     ]
 
 
-@router.get("/top-products", response_model=List[ProductPerformanceItem])
-async def top_products(
-    current_user=Depends(check_permission("admin")),
-    db: Session = Depends(get_db),
-    limit: int = 10,
-):
+def _top_product_rows(current_user, db: Session, limit: int):
     query = (
         db.query(
             Product.id,
             Product.name,
-            func.sum(Sale.quantity).label("quantity_sold"),
-            func.sum(Sale.total_price).label("total_sales"),
-            func.sum(Sale.total_price - Sale.total_cost).label("total_profit"),
+            func.sum(SalesDailyRollup.quantity).label("quantity_sold"),
+            func.sum(SalesDailyRollup.total_sales).label("total_sales"),
+            func.sum(SalesDailyRollup.total_sales - SalesDailyRollup.total_cost).label("total_profit"),
         )
-        .join(Sale, Sale.product_id == Product.id)
+        .join(SalesDailyRollup, SalesDailyRollup.product_id == Product.id)
         .group_by(Product.id)
-        .order_by(func.sum(Sale.total_price).desc())
+        .order_by(func.sum(SalesDailyRollup.total_sales).desc())
     )
     if current_user.role == "admin" and current_user.store_id is not None:
-        query = query.filter(Sale.store_id == current_user.store_id)
+        query = query.filter(SalesDailyRollup.store_id == current_user.store_id)
     if current_user.role == "superuser":
-        query = query.join(Store, Store.id == Sale.store_id).filter(Store.merchant_id == current_user.id)
+        query = query.join(Store, Store.id == SalesDailyRollup.store_id).filter(
+            Store.merchant_id == current_user.id
+        )
+    return query.limit(limit).all()
 
-    query = query.limit(limit)
-    rows = query.all()
+
+@router.get("/top-products", response_model=List[ProductPerformanceItem])
+def top_products(
+    current_user=Depends(check_permission("admin")),
+    db: Session = Depends(get_db),
+    limit: int = 10,
+):
+    rows = _top_product_rows(current_user, db, limit)
     return [
         ProductPerformanceItem(
             product_id=row.id,
@@ -106,31 +115,35 @@ async def top_products(
     ]
 
 
-@router.get("/slow-movers", response_model=List[ProductPerformanceItem])
-async def slow_movers(
-    current_user=Depends(check_permission("admin")),
-    db: Session = Depends(get_db),
-    limit: int = 10,
-):
+def _slow_mover_rows(current_user, db: Session, limit: int):
     query = (
         db.query(
             Product.id,
             Product.name,
-            func.sum(Sale.quantity).label("quantity_sold"),
-            func.sum(Sale.total_price).label("total_sales"),
-            func.sum(Sale.total_price - Sale.total_cost).label("total_profit"),
+            func.sum(SalesDailyRollup.quantity).label("quantity_sold"),
+            func.sum(SalesDailyRollup.total_sales).label("total_sales"),
+            func.sum(SalesDailyRollup.total_sales - SalesDailyRollup.total_cost).label("total_profit"),
         )
-        .join(Sale, Sale.product_id == Product.id)
+        .join(SalesDailyRollup, SalesDailyRollup.product_id == Product.id)
         .group_by(Product.id)
-        .order_by(func.sum(Sale.quantity).asc())
+        .order_by(func.sum(SalesDailyRollup.quantity).asc())
     )
     if current_user.role == "admin" and current_user.store_id is not None:
-        query = query.filter(Sale.store_id == current_user.store_id)
+        query = query.filter(SalesDailyRollup.store_id == current_user.store_id)
     if current_user.role == "superuser":
-        query = query.join(Store, Store.id == Sale.store_id).filter(Store.merchant_id == current_user.id)
+        query = query.join(Store, Store.id == SalesDailyRollup.store_id).filter(
+            Store.merchant_id == current_user.id
+        )
+    return query.limit(limit).all()
+
 
-    query = query.limit(limit)
-    rows = query.all()
+@router.get("/slow-movers", response_model=List[ProductPerformanceItem])
+def slow_movers(
+    current_user=Depends(check_permission("admin")),
+    db: Session = Depends(get_db),
+    limit: int = 10,
+):
+    rows = _slow_mover_rows(current_user, db, limit)
     return [
         ProductPerformanceItem(
             product_id=row.id,
@@ -144,7 +157,7 @@ async def slow_movers(
 
 
 @router.get("/payment-trend", response_model=List[PaymentTrendPoint])
-async def payment_trend(
+def payment_trend(
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
     days: int = Query(30, ge=1, le=365),
@@ -182,17 +195,17 @@ async def payment_trend(
 
 
 @router.get("/financial-summary", response_model=FinancialSummaryResponse)
-async def financial_summary(
+def financial_summary(
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
 ):
-    sales_query = db.query(func.sum(Sale.total_price), func.sum(Sale.total_cost))
+    sales_query = db.query(func.sum(SalesDailyRollup.total_sales), func.sum(SalesDailyRollup.total_cost))
     expense_query = db.query(func.sum(Expense.amount))
     if current_user.role == "admin" and current_user.store_id is not None:
-        sales_query = sales_query.filter(Sale.store_id == current_user.store_id)
+        sales_query = sales_query.filter(SalesDailyRollup.store_id == current_user.store_id)
         expense_query = expense_query.filter(Expense.store_id == current_user.store_id)
     if current_user.role == "superuser":
-        sales_query = sales_query.join(Store, Store.id == Sale.store_id).filter(
+        sales_query = sales_query.join(Store, Store.id == SalesDailyRollup.store_id).filter(
             Store.merchant_id == current_user.id
         )
         expense_query = expense_query.join(Store, Store.id == Expense.store_id).filter(
@@ -218,7 +231,7 @@ async def financial_summary(
 
 
 @router.get("/expenses-by-category", response_model=List[ExpenseCategoryItem])
-async def expenses_by_category(
+def expenses_by_category(
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
 ):
@@ -233,21 +246,23 @@ async def expenses_by_category(
 
 
 @router.get("/sales-trend", response_model=List[SalesTrendPoint])
-async def sales_trend(
+def sales_trend(
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
     days: int = Query(30, ge=1, le=365),
 ):
-    date_col = func.date(Sale.created_at)
+    date_col = SalesDailyRollup.day
     query = db.query(
         date_col.label("date"),
-        func.sum(Sale.total_price).label("total_sales"),
-        func.sum(Sale.total_price - Sale.total_cost).label("total_profit"),
+        func.sum(SalesDailyRollup.total_sales).label("total_sales"),
+        func.sum(SalesDailyRollup.total_sales - SalesDailyRollup.total_cost).label("total_profit"),
     )
     if current_user.role == "admin" and current_user.store_id is not None:
-        query = query.filter(Sale.store_id == current_user.store_id)
+        query = query.filter(SalesDailyRollup.store_id == current_user.store_id)
     if current_user.role == "superuser":
-        query = query.join(Store, Store.id == Sale.store_id).filter(Store.merchant_id == current_user.id)
+        query = query.join(Store, Store.id == SalesDailyRollup.store_id).filter(
+            Store.merchant_id == current_user.id
+        )
     rows = query.group_by(date_col).order_by(date_col.desc()).limit(days).all()
     return [
         SalesTrendPoint(
@@ -259,40 +274,178 @@ async def sales_trend(
     ]
 
 
-def _csv_response(filename: str, headers: list[str], rows: list[list]) -> Response:
-    buffer = StringIO()
-    writer = csv.writer(buffer)
-    writer.writerow(headers)
-    writer.writerows(rows)
-    return Response(
-        content=buffer.getvalue(),
+def _csv_response(filename: str, chunks: Iterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
+def _export_store_filter(current_user, store_column):
+    """Restrict an export to the caller's store (admin) or merchant stores (superuser)."""
+    if current_user.role == "admin" and current_user.store_id is not None:
+        return store_column == current_user.store_id
+    if current_user.role == "superuser":
+        return store_column.in_(select(Store.id).where(Store.merchant_id == current_user.id))
+    return true()
+
+
+def _format_export_row(row) -> list:
+    return [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+
 @router.get("/store-performance/export")
-async def export_store_performance(
+def export_store_performance(
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
     limit: int = 100,
 ):
-    items = await store_performance(current_user=current_user, db=db, limit=limit)
-    rows = [[item.store_id, item.store_name, item.total_sales, item.total_profit, item.orders] for item in items]
-    return _csv_response("store-performance.csv", ["Store ID", "Store", "Sales", "Profit", "Orders"], rows)
+    rows = [
+        [row.id, row.name, _sum_or_zero(row.total_sales), _sum_or_zero(row.total_profit), int(row.orders or 0)]
+        for row in _store_performance_rows(current_user, db, limit)
+    ]
+    return _csv_response("store-performance.csv", iter_csv(["Store ID", "Store", "Sales", "Profit", "Orders"], rows))
 
 
 @router.get("/top-products/export")
-async def export_top_products(
+def export_top_products(
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
     limit: int = 100,
 ):
-    items = await top_products(current_user=current_user, db=db, limit=limit)
     rows = [
-        [item.product_id, item.product_name, item.quantity_sold, item.total_sales, item.total_profit]
-        for item in items
+        [
+            row.id,
+            row.name,
+            int(row.quantity_sold or 0),
+            _sum_or_zero(row.total_sales),
+            _sum_or_zero(row.total_profit),
+        ]
+        for row in _top_product_rows(current_user, db, limit)
     ]
     return _csv_response(
-        "top-products.csv", ["Product ID", "Product", "Qty Sold", "Sales", "Profit"], rows
+        "top-products.csv", iter_csv(["Product ID", "Product", "Qty Sold", "Sales", "Profit"], rows)
+    )
+
+
+@router.get("/sales/export")
+def export_sales(current_user=Depends(check_permission("admin"))):
+    """Stream the full sales history for the caller's stores."""
+    statement = (
+        select(
+            Sale.id,
+            Sale.created_at,
+            Sale.store_id,
+            Store.name,
+            Sale.product_id,
+            Product.name,
+            Sale.quantity,
+            Sale.unit_price,
+            Sale.unit_cost,
+            Sale.total_price,
+            Sale.total_cost,
+            Sale.created_by,
+        )
+        .join(Store, Store.id == Sale.store_id)
+        .join(Product, Product.id == Sale.product_id)
+        .where(_export_store_filter(current_user, Sale.store_id))
+        .order_by(Sale.id)
+    )
+    headers = [
+        "Sale ID",
+        "Date",
+        "Store ID",
+        "Store",
+        "Product ID",
+        "Product",
+        "Quantity",
+        "Unit Price",
+        "Unit Cost",
+        "Total Price",
+        "Total Cost",
+        "Recorded By",
+    ]
+    return _csv_response("sales.csv", stream_query_csv(statement, headers, _format_export_row))
+
+
+@router.get("/inventory/export")
+def export_inventory(current_user=Depends(check_permission("admin"))):
+    """Stream every inventory record for the caller's stores."""
+    statement = (
+        select(
+            Inventory.id,
+            Inventory.store_id,
+            Store.name,
+            Inventory.product_id,
+            Product.name,
+            Inventory.quantity_received,
+            Inventory.quantity_in_stock,
+            Inventory.quantity_spoilt,
+            Inventory.buying_price,
+            Inventory.selling_price,
+            Inventory.payment_status,
+            Inventory.created_by,
+            Inventory.created_at,
+            Inventory.updated_at,
+        )
+        .join(Store, Store.id == Inventory.store_id)
+        .join(Product, Product.id == Inventory.product_id)
+        .where(_export_store_filter(current_user, Inventory.store_id))
+        .order_by(Inventory.id)
     )
+    headers = [
+        "Inventory ID",
+        "Store ID",
+        "Store",
+        "Product ID",
+        "Product",
+        "Received",
+        "In Stock",
+        "Spoilt",
+        "Buying Price",
+        "Selling Price",
+        "Payment Status",
+        "Recorded By",
+        "Created At",
+        "Updated At",
+    ]
+    return _csv_response("inventory.csv", stream_query_csv(statement, headers, _format_export_row))
+
+
+@router.get("/inventory-events/export")
+def export_inventory_events(current_user=Depends(check_permission("admin"))):
+    """Stream the inventory event log for the caller's stores."""
+    statement = (
+        select(
+            InventoryEvent.id,
+            InventoryEvent.created_at,
+            InventoryEvent.store_id,
+            InventoryEvent.product_id,
+            InventoryEvent.inventory_id,
+            InventoryEvent.actor_id,
+            InventoryEvent.event_type,
+            InventoryEvent.old_quantity_in_stock,
+            InventoryEvent.new_quantity_in_stock,
+            InventoryEvent.old_payment_status,
+            InventoryEvent.new_payment_status,
+            InventoryEvent.details,
+        )
+        .where(_export_store_filter(current_user, InventoryEvent.store_id))
+        .order_by(InventoryEvent.id)
+    )
+    headers = [
+        "Event ID",
+        "Date",
+        "Store ID",
+        "Product ID",
+        "Inventory ID",
+        "Actor ID",
+        "Event",
+        "Old Stock",
+        "New Stock",
+        "Old Payment Status",
+        "New Payment Status",
+        "Details",
+    ]
+    return _csv_response("inventory-events.csv", stream_query_csv(statement, headers, _format_export_row))
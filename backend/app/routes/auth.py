@@ -1,10 +1,10 @@
 """Authentication routes for user login and registration."""
-from collections import defaultdict
 from datetime import datetime, timezone
 import logging
-import time
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -15,7 +15,9 @@ from app.core.security import (
     create_refresh_token,
     create_password_reset_token,
     hash_password,
-    verify_password,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
     verify_token,
 )
 from app.models.refresh_token import RefreshToken
@@ -31,26 +33,17 @@ from app.schemas.user import (
     UserCreate,
     UserResponse,
 )
-from app.services.email_service import build_password_reset_link, send_password_reset_email
+from app.services.email_service import build_password_reset_link, queue_password_reset_email
+from app.services.login_throttle_service import login_retry_after, record_login_failure, reset_login_failures
+from app.services.notification_service import invalidate_notification_recipients
+from app.services.principal_cache_service import invalidate_principal
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 logger = logging.getLogger(__name__)
 
-MAX_LOGIN_ATTEMPTS = 5
-LOGIN_WINDOW_SECONDS = 300
-LOGIN_LOCK_SECONDS = 300
-FAILED_LOGIN_ATTEMPTS = defaultdict(list)
-LOCKED_UNTIL = {}
-
-
-def _cleanup_expired_refresh_tokens(db: Session) -> None:
-    now_utc_naive = datetime.now(timezone.utc).replace(tzinfo=None)
-    db.query(RefreshToken).filter(RefreshToken.expires_at < now_utc_naive).delete()
-    db.commit()
-
 
 def _store_refresh_token(db: Session, refresh_token: str, user_id: int) -> None:
-    _cleanup_expired_refresh_tokens(db)
+    # Expired and revoked rows are deleted by the background sweeper, not here.
     payload = verify_token(refresh_token, expected_type="refresh")
     exp = payload.get("exp")
     jti = payload.get("jti")
@@ -81,7 +74,7 @@ def _issue_token_response(db: Session, user: User) -> TokenResponse:
 
 
 @router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Self registration endpoint (creates merchant account)."""
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -102,7 +95,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/admin-invite/register", response_model=TokenResponse)
-async def register_admin_from_invite(
+def register_admin_from_invite(
     payload: AdminInviteRegisterRequest,
     db: Session = Depends(get_db),
 ):
@@ -136,57 +129,77 @@ async def register_admin_from_invite(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    invalidate_notification_recipients(new_user.store_id)
 
     logger.info("Admin registered from invite user_id=%s email=%s", new_user.id, new_user.email)
     return _issue_token_response(db, new_user)
 
 
+def _find_login_user(db: Session, email: str):
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        return None, None, False
+    hashed_password, is_active = user.hashed_password, user.is_active
+    # Hand the connection back to the pool while bcrypt runs; `user` reloads afterwards.
+    db.rollback()
+    return user, hashed_password, is_active
+
+
+def _complete_login(db: Session, user: User, new_hashed_password: Optional[str]) -> TokenResponse:
+    if new_hashed_password is not None:
+        # Upgrade the stored hash to the current BCRYPT_ROUNDS; saved with the refresh token.
+        user.hashed_password = new_hashed_password
+    logger.info("Successful login user_id=%s role=%s", user.id, user.role)
+    return _issue_token_response(db, user)
+
+
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
-    """Login with email and password."""
-    now = time.time()
-    locked_until = LOCKED_UNTIL.get(credentials.email, 0)
-    if locked_until > now:
-        retry_after = int(locked_until - now)
+async def login(credentials: LoginRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Login with email and password.
+
+    Database work runs in the threadpool and bcrypt on the password hashing
+    pool, so a login burst waits on the hashing queue without pinning threads.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_retry_after(credentials.email, client_ip)
+    if retry_after:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Too many failed login attempts. Try again in {retry_after}s",
+            headers={"Retry-After": str(retry_after)},
         )
 
-    FAILED_LOGIN_ATTEMPTS[credentials.email] = [
-        ts for ts in FAILED_LOGIN_ATTEMPTS[credentials.email] if now - ts <= LOGIN_WINDOW_SECONDS
-    ]
-
-    user = db.query(User).filter(User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.hashed_password):
-        FAILED_LOGIN_ATTEMPTS[credentials.email].append(now)
-        if len(FAILED_LOGIN_ATTEMPTS[credentials.email]) >= MAX_LOGIN_ATTEMPTS:
-            LOCKED_UNTIL[credentials.email] = now + LOGIN_LOCK_SECONDS
+    user, hashed_password, is_active = await run_in_threadpool(_find_login_user, db, credentials.email)
+    if not user or not await verify_password_async(credentials.password, hashed_password):
+        record_login_failure(credentials.email, client_ip)
         logger.warning("Failed login attempt for email=%s", credentials.email)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
-    if not user.is_active:
+    if not is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account is deactivated")
 
-    FAILED_LOGIN_ATTEMPTS.pop(credentials.email, None)
-    LOCKED_UNTIL.pop(credentials.email, None)
-    logger.info("Successful login user_id=%s role=%s", user.id, user.role)
-    return _issue_token_response(db, user)
+    reset_login_failures(credentials.email)
+    new_hashed_password = None
+    if password_needs_rehash(hashed_password):
+        new_hashed_password = await hash_password_async(credentials.password)
+    return await run_in_threadpool(_complete_login, db, user, new_hashed_password)
 
 
 @router.post("/forgot-password")
-async def forgot_password(payload: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password(payload: ForgotPasswordRequest, db: Session = Depends(get_db)):
     """Request a password reset link."""
     user = db.query(User).filter(User.email == payload.email).first()
     if user and user.is_active:
         token = create_password_reset_token({"sub": user.id, "email": user.email})
         reset_link = build_password_reset_link(token, settings.reset_token_expire_hours)
-        send_password_reset_email(user.email, reset_link, settings.reset_token_expire_hours)
+        queue_password_reset_email(db, user.email, reset_link, settings.reset_token_expire_hours)
+        db.commit()
     return {"message": "If the email exists, a reset link has been sent."}
 
 
 @router.post("/reset-password")
-async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
+def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
     """Reset password using a valid reset token."""
     decoded = verify_token(payload.token, expected_type="password_reset")
     user_id = decoded.get("sub")
@@ -198,16 +211,17 @@ async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(ge
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account is deactivated")
     user.hashed_password = hash_password(payload.new_password)
     db.commit()
+    invalidate_principal(user.id)
     return {"message": "Password reset successfully"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: User = Depends(get_current_user)):
     return UserResponse.model_validate(current_user)
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_access_token(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+def refresh_access_token(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
     decoded = verify_token(payload.refresh_token, expected_type="refresh")
     token_jti = decoded.get("jti")
     user_id = decoded.get("sub")
@@ -231,13 +245,13 @@ async def refresh_access_token(payload: RefreshTokenRequest, db: Session = Depen
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
 
-    db.commit()
+    # The revocation is committed together with the new token.
     logger.info("Refresh token rotated user_id=%s", user_id)
     return _issue_token_response(db, user)
 
 
 @router.post("/logout")
-async def logout(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+def logout(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
     decoded = verify_token(payload.refresh_token, expected_type="refresh")
     token_jti = decoded.get("jti")
 
@@ -1,7 +1,7 @@
 """Dashboard reporting endpoints for admin, clerk, and merchant views."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import case, distinct, func
-from sqlalchemy.orm import Session
+from sqlalchemy import case, distinct, func, select, true
+from sqlalchemy.orm import Session, contains_eager
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, get_current_user
@@ -31,6 +31,7 @@ from app.schemas.reports import (
     MerchantStoreItem,
     SupplyRequestResponse,
 )
+from app.services.dashboard_cache_service import cached_dashboard, dashboard_scope
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
@@ -43,6 +44,7 @@ def _get_clerk_inventory(current_user: User, db: Session):
     records = (
         db.query(Inventory)
         .join(Product, Product.id == Inventory.product_id)
+        .options(contains_eager(Inventory.product))
         .filter(Inventory.created_by == current_user.id)
         .order_by(Inventory.created_at.desc())
         .all()
@@ -74,11 +76,7 @@ def _get_clerk_inventory(current_user: User, db: Session):
     return stats, products
 
 
-@router.get("/admin/dashboard", response_model=AdminDashboardResponse)
-async def admin_dashboard(
-    current_user: User = Depends(check_permission("admin")),
-    db: Session = Depends(get_db),
-):
+def _build_admin_dashboard(current_user: User, db: Session) -> AdminDashboardResponse:
     inventory_query = db.query(Inventory)
     request_query = db.query(SupplyRequest)
     clerk_query = db.query(User).filter(User.role == "clerk")
@@ -111,6 +109,7 @@ async def admin_dashboard(
     raw_requests = (
         request_query.join(Product, Product.id == SupplyRequest.product_id)
         .join(User, User.id == SupplyRequest.requested_by)
+        .options(contains_eager(SupplyRequest.product), contains_eager(SupplyRequest.requested_by_user))
         .order_by(SupplyRequest.created_at.desc())
         .limit(40)
         .all()
@@ -130,6 +129,7 @@ async def admin_dashboard(
 
     raw_inventory = (
         inventory_query.join(Product, Product.id == Inventory.product_id)
+        .options(contains_eager(Inventory.product))
         .order_by(Inventory.updated_at.desc())
         .limit(80)
         .all()
@@ -202,26 +202,30 @@ async def admin_dashboard(
     )
 
 
-@router.get("/clerk/dashboard", response_model=ClerkDashboardResponse)
-async def clerk_dashboard(
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/dashboard", response_model=AdminDashboardResponse)
+def admin_dashboard(
+    current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
 ):
-    if current_user.role != "clerk":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only clerks can access clerk dashboard")
-    stats, products = _get_clerk_inventory(current_user, db)
-    return ClerkDashboardResponse(stats=stats, products=products)
+    return cached_dashboard("admin", dashboard_scope(current_user), lambda: _build_admin_dashboard(current_user, db))
 
 
-@router.get("/clerk/overview", response_model=ClerkOverviewResponse)
-async def clerk_overview(
-    lite: bool = False,
+@router.get("/clerk/dashboard", response_model=ClerkDashboardResponse)
+def clerk_dashboard(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     if current_user.role != "clerk":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only clerks can access clerk dashboard")
 
+    def build() -> ClerkDashboardResponse:
+        stats, products = _get_clerk_inventory(current_user, db)
+        return ClerkDashboardResponse(stats=stats, products=products)
+
+    return cached_dashboard("clerk", dashboard_scope(current_user), build)
+
+
+def _build_clerk_overview(current_user: User, db: Session, lite: bool) -> ClerkOverviewResponse:
     stats, inventory = _get_clerk_inventory(current_user, db)
 
     if lite:
@@ -269,34 +273,57 @@ async def clerk_overview(
     )
 
 
-@router.get("/merchant/dashboard", response_model=MerchantDashboardResponse)
-async def merchant_dashboard(
-    current_user: User = Depends(check_permission("superuser")),
+@router.get("/clerk/overview", response_model=ClerkOverviewResponse)
+def clerk_overview(
+    lite: bool = False,
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    store_ids = [
-        row.id
-        for row in db.query(Store.id).filter(Store.merchant_id == current_user.id).all()
-    ]
-    active_stores = db.query(Store).filter(
-        Store.is_active.is_(True), Store.merchant_id == current_user.id
-    ).count()
-    active_admins = (
-        db.query(User)
-        .filter(User.role == "admin", User.is_active.is_(True), User.store_id.in_(store_ids))
-        .count()
-        if store_ids
-        else 0
+    if current_user.role != "clerk":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only clerks can access clerk dashboard")
+    view = "clerk_overview_lite" if lite else "clerk_overview"
+    return cached_dashboard(view, dashboard_scope(current_user), lambda: _build_clerk_overview(current_user, db, lite))
+
+
+def _build_merchant_dashboard(current_user: User, db: Session) -> MerchantDashboardResponse:
+    # One round trip for stats, payment summary and per-store totals: the
+    # product count CTE is outer-joined to per-store conditional aggregates so
+    # a merchant without stores still gets a (single) row back.
+    stock_value = Inventory.quantity_in_stock * Inventory.selling_price
+    stock_cost = Inventory.buying_price * Inventory.quantity_in_stock
+    product_count = (
+        select(func.count(Product.id).label("total_products"))
+        .where(Product.is_active.is_(True), Product.merchant_id == current_user.id)
+        .cte("product_count")
     )
-    total_products = db.query(Product).filter(
-        Product.is_active.is_(True), Product.merchant_id == current_user.id
-    ).count()
-    estimated_revenue = _sum_or_zero(
-        db.query(func.sum(Inventory.quantity_in_stock * Inventory.selling_price))
-        .join(Store, Store.id == Inventory.store_id)
-        .filter(Store.merchant_id == current_user.id)
-        .scalar()
+    store_totals = (
+        select(
+            Store.id.label("id"),
+            Store.name.label("name"),
+            Store.location.label("location"),
+            Store.is_active.label("is_active"),
+            Store.created_at.label("created_at"),
+            func.sum(stock_value).label("sales_total"),
+            func.sum(case((Inventory.payment_status == "paid", stock_cost), else_=0)).label("paid_total"),
+            func.sum(case((Inventory.payment_status == "unpaid", stock_cost), else_=0)).label("unpaid_total"),
+        )
+        .outerjoin(Inventory, Inventory.store_id == Store.id)
+        .where(Store.merchant_id == current_user.id)
+        .group_by(Store.id)
+        .cte("store_totals")
     )
+    summary_rows = db.execute(
+        select(product_count.c.total_products, *store_totals.c)
+        .select_from(product_count.outerjoin(store_totals, true()))
+        .order_by(store_totals.c.created_at.desc())
+    ).all()
+    total_products = int(summary_rows[0].total_products or 0) if summary_rows else 0
+    store_rows = [row for row in summary_rows if row.id is not None]
+
+    active_stores = sum(1 for row in store_rows if row.is_active)
+    estimated_revenue = sum(_sum_or_zero(row.sales_total) for row in store_rows)
+    paid_amount = sum(_sum_or_zero(row.paid_total) for row in store_rows)
+    unpaid_amount = sum(_sum_or_zero(row.unpaid_total) for row in store_rows)
 
     performance_rows = (
         db.query(
@@ -317,72 +344,18 @@ async def merchant_dashboard(
         for row in performance_rows
     ]
 
-    paid_amount = _sum_or_zero(
-        db.query(
-            func.sum(
-                case(
-                    (Inventory.payment_status == "paid", Inventory.buying_price * Inventory.quantity_in_stock),
-                    else_=0,
-                )
-            )
-        )
-        .join(Store, Store.id == Inventory.store_id)
-        .filter(Store.merchant_id == current_user.id)
-        .scalar()
-    )
-    unpaid_amount = _sum_or_zero(
-        db.query(
-            func.sum(
-                case(
-                    (Inventory.payment_status == "unpaid", Inventory.buying_price * Inventory.quantity_in_stock),
-                    else_=0,
-                )
-            )
-        )
-        .join(Store, Store.id == Inventory.store_id)
-        .filter(Store.merchant_id == current_user.id)
-        .scalar()
-    )
-
     total_payment = paid_amount + unpaid_amount
     paid_percentage = (paid_amount / total_payment * 100.0) if total_payment else 0.0
     unpaid_percentage = (unpaid_amount / total_payment * 100.0) if total_payment else 0.0
 
-    store_rows = (
-        db.query(
-            Store.id,
-            Store.name,
-            Store.location,
-            Store.is_active,
-            func.sum(Inventory.quantity_in_stock * Inventory.selling_price).label("sales_total"),
-            func.sum(
-                case(
-                    (Inventory.payment_status == "paid", Inventory.buying_price * Inventory.quantity_in_stock),
-                    else_=0,
-                )
-            ).label("paid_total"),
-            func.sum(
-                case(
-                    (Inventory.payment_status == "unpaid", Inventory.buying_price * Inventory.quantity_in_stock),
-                    else_=0,
-                )
-            ).label("unpaid_total"),
-        )
-        .outerjoin(Inventory, Inventory.store_id == Store.id)
-        .filter(Store.merchant_id == current_user.id)
-        .group_by(Store.id)
-        .order_by(Store.created_at.desc())
-        .all()
-    )
-
     admins = (
         db.query(User)
-        .filter(User.role == "admin", User.store_id.in_(store_ids))
+        .join(Store, Store.id == User.store_id)
+        .filter(User.role == "admin", Store.merchant_id == current_user.id)
         .order_by(User.created_at.desc())
         .all()
-        if store_ids
-        else []
     )
+    active_admins = sum(1 for admin in admins if admin.is_active)
     admin_by_store = {admin.store_id: admin for admin in admins if admin.store_id is not None}
     store_name_by_id = {row.id: row.name for row in store_rows}
 
@@ -432,3 +405,11 @@ async def merchant_dashboard(
         stores=stores,
         admins=admin_items,
     )
+
+
+@router.get("/merchant/dashboard", response_model=MerchantDashboardResponse)
+def merchant_dashboard(
+    current_user: User = Depends(check_permission("superuser")),
+    db: Session = Depends(get_db),
+):
+    return cached_dashboard("merchant", dashboard_scope(current_user), lambda: _build_merchant_dashboard(current_user, db))
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/api/expenses", tags=["expenses"])
 
 
 @router.post("/", response_model=ExpenseResponse)
-async def create_expense(
+def create_expense(
     payload: ExpenseCreate,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -53,7 +53,7 @@ def expense_incurred_at():
 
 
 @router.get("/", response_model=List[ExpenseResponse])
-async def list_expenses(
+def list_expenses(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
     store_id: Optional[int] = None,
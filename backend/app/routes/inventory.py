@@ -1,29 +1,34 @@
 """Inventory management routes for recording stock."""
+from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.inventory import Inventory, PaymentStatus
 from app.models.inventory_event import InventoryEvent
 from app.models.product import Product
 from app.models.store import Store
 from app.models.user import User
 from app.schemas.notifications import InventoryEventResponse
-from app.schemas.reports import InventoryCreate, InventoryResponse, InventoryUpdate
+from app.schemas.reports import InventoryCreate, InventoryResponse, InventoryUpdate, StockAtResponse
+from app.services.dashboard_cache_service import invalidate_dashboards
 from app.services.notification_service import (
     create_inventory_event,
-    notify_low_stock_if_needed,
+    notify_inventory_alerts,
     notify_unpaid_inventory,
 )
+from app.services.stock_replay_service import stock_at
+from app.services.stock_service import adjust_stock_balance
 
 router = APIRouter(prefix="/api/inventory", tags=["inventory"])
 
 
 @router.post("/", response_model=InventoryResponse, status_code=status.HTTP_201_CREATED)
-async def record_inventory(
+def record_inventory(
     inventory_data: InventoryCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -44,6 +49,7 @@ async def record_inventory(
 
     enforce_store_scope(current_user, store.id)
 
+    adjust_stock_balance(db, inventory_data.store_id, inventory_data.product_id, inventory_data.quantity_in_stock)
     new_inventory = Inventory(
         product_id=inventory_data.product_id,
         store_id=inventory_data.store_id,
@@ -72,25 +78,24 @@ async def record_inventory(
         new_payment_status=new_inventory.payment_status,
         details=new_inventory.remarks,
     )
-    if new_inventory.payment_status == PaymentStatus.UNPAID.value:
-        notify_unpaid_inventory(
-            db,
-            store_id=new_inventory.store_id,
-            product_id=new_inventory.product_id,
-            quantity_in_stock=new_inventory.quantity_in_stock,
-        )
-    notify_low_stock_if_needed(db, inventory=new_inventory)
+    notify_inventory_alerts(
+        db,
+        inventory=new_inventory,
+        unpaid=new_inventory.payment_status == PaymentStatus.UNPAID.value,
+    )
     db.commit()
     db.refresh(new_inventory)
+    invalidate_dashboards(db, store_ids=[new_inventory.store_id], user_ids=[new_inventory.created_by])
     return InventoryResponse.model_validate(new_inventory)
 
 
 @router.get("/", response_model=List[InventoryResponse])
-async def list_inventory(
+def list_inventory(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 20,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     store_id: int | None = None,
     payment_status: str | None = None,
 ):
@@ -115,12 +120,29 @@ async def list_inventory(
     if payment_status is not None:
         query = query.filter(Inventory.payment_status == payment_status)
 
-    records = query.order_by(Inventory.created_at.desc()).offset(skip).limit(limit).all()
+    records = paginate(query, Inventory, response, cursor, limit)
     return [InventoryResponse.model_validate(record) for record in records]
 
 
+@router.get("/stock-at", response_model=StockAtResponse)
+def stock_at_time(
+    store_id: int,
+    product_id: int,
+    at: datetime,
+    current_user: User = Depends(check_permission("admin")),
+    db: Session = Depends(get_db),
+):
+    """Stock of a product in a store at a point in time, replayed from inventory events."""
+    enforce_store_scope(current_user, store_id)
+    if current_user.role == "superuser":
+        store = db.query(Store).filter(Store.id == store_id).first()
+        if not store or store.merchant_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Store not in your account")
+    return StockAtResponse.model_validate(stock_at(db, store_id, product_id, at))
+
+
 @router.get("/{inventory_id}", response_model=InventoryResponse)
-async def get_inventory(
+def get_inventory(
     inventory_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -139,7 +161,7 @@ async def get_inventory(
 
 
 @router.put("/{inventory_id}", response_model=InventoryResponse)
-async def update_inventory(
+def update_inventory(
     inventory_id: int,
     inventory_data: InventoryUpdate,
     current_user: User = Depends(get_current_user),
@@ -175,6 +197,7 @@ async def update_inventory(
         )
 
     if inventory_data.quantity_in_stock is not None:
+        adjust_stock_balance(db, record.store_id, record.product_id, inventory_data.quantity_in_stock - old_stock)
         record.quantity_in_stock = inventory_data.quantity_in_stock
     if inventory_data.quantity_spoilt is not None:
         record.quantity_spoilt = inventory_data.quantity_spoilt
@@ -196,21 +219,20 @@ async def update_inventory(
         new_payment_status=record.payment_status,
         details=record.remarks,
     )
-    if record.payment_status == PaymentStatus.UNPAID.value and old_payment_status != PaymentStatus.UNPAID.value:
-        notify_unpaid_inventory(
-            db,
-            store_id=record.store_id,
-            product_id=record.product_id,
-            quantity_in_stock=record.quantity_in_stock,
-        )
-    notify_low_stock_if_needed(db, inventory=record)
+    notify_inventory_alerts(
+        db,
+        inventory=record,
+        unpaid=record.payment_status == PaymentStatus.UNPAID.value
+        and old_payment_status != PaymentStatus.UNPAID.value,
+    )
     db.commit()
     db.refresh(record)
+    invalidate_dashboards(db, store_ids=[record.store_id], user_ids=[record.created_by])
     return InventoryResponse.model_validate(record)
 
 
 @router.patch("/{inventory_id}/payment-status", response_model=InventoryResponse)
-async def update_payment_status(
+def update_payment_status(
     inventory_id: int,
     payload: dict,
     current_user: User = Depends(check_permission("admin")),
@@ -252,11 +274,12 @@ async def update_payment_status(
         )
     db.commit()
     db.refresh(record)
+    invalidate_dashboards(db, store_ids=[record.store_id], user_ids=[record.created_by])
     return InventoryResponse.model_validate(record)
 
 
 @router.delete("/{inventory_id}")
-async def delete_inventory(
+def delete_inventory(
     inventory_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -285,20 +308,25 @@ async def delete_inventory(
         new_payment_status=None,
         details=record.remarks,
     )
+    adjust_stock_balance(db, record.store_id, record.product_id, -record.quantity_in_stock)
+    store_id, created_by = record.store_id, record.created_by
     db.delete(record)
     db.commit()
+    invalidate_dashboards(db, store_ids=[store_id], user_ids=[created_by])
     return {"message": "Inventory record deleted successfully"}
 
 
 @router.get("/history/product/{product_id}", response_model=List[InventoryEventResponse])
-async def inventory_history_by_product(
+def inventory_history_by_product(
     product_id: int,
+    response: Response,
     store_id: int | None = None,
-    limit: int = 100,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """List timeline events for stock/payment changes by product."""
+    """List timeline events for stock/payment changes by product, newest first (cursor paginated)."""
     query = db.query(InventoryEvent).filter(InventoryEvent.product_id == product_id)
     if store_id is not None:
         enforce_store_scope(current_user, store_id)
@@ -312,12 +340,12 @@ async def inventory_history_by_product(
     elif current_user.role == "clerk":
         query = query.filter(InventoryEvent.actor_id == current_user.id)
 
-    rows = query.order_by(InventoryEvent.created_at.desc()).limit(limit).all()
+    rows = paginate(query, InventoryEvent, response, cursor, limit)
     return [InventoryEventResponse.model_validate(row) for row in rows]
 
 
 @router.get("/store/{store_id}/paid", response_model=List[InventoryResponse])
-async def get_paid_inventory(
+def get_paid_inventory(
     store_id: int,
     current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -336,7 +364,7 @@ async def get_paid_inventory(
 
 
 @router.get("/store/{store_id}/unpaid", response_model=List[InventoryResponse])
-async def get_unpaid_inventory(
+def get_unpaid_inventory(
     store_id: int,
     current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
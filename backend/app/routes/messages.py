@@ -17,7 +17,7 @@ def _recipient_name(user: User) -> str:
 
 
 @router.get("/recipients", response_model=list[MessageRecipientResponse])
-async def list_message_recipients(
+def list_message_recipients(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -67,7 +67,7 @@ async def list_message_recipients(
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def send_message(
+def send_message(
     payload: MessageCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
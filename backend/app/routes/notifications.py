@@ -2,50 +2,84 @@
 Notification center routes.
 """
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.database import SessionLocal, get_db
+from app.core.dependencies import authenticate_token, bearer_token, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.notification import Notification
 from app.models.user import User
 from app.schemas.notifications import NotificationResponse, NotificationUnreadCount
+from app.services.notification_counter_service import decrement_unread, get_unread_counts, reset_unread
+from app.services.notification_stream_service import notification_events, parse_last_event_id, stage_unread_count
 
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 
 
 @router.get("/", response_model=List[NotificationResponse])
-async def list_notifications(
+def list_notifications(
+    response: Response,
     unread_only: bool = False,
-    skip: int = 0,
-    limit: int = 20,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
     if unread_only:
         query = query.filter(Notification.is_read.is_(False))
-    rows = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+    rows = paginate(query, Notification, response, cursor, limit)
     return [NotificationResponse.model_validate(row) for row in rows]
 
 
+def _authenticate_stream(token: str):
+    # A private session, closed before streaming starts: a stream must not
+    # hold a pooled connection for as long as the client stays connected.
+    db = SessionLocal()
+    try:
+        return authenticate_token(db, token)
+    finally:
+        db.close()
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    access_token: Optional[str] = Query(None, description="For EventSource clients that cannot send headers"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events feed of new notifications and unread-count changes.
+
+    Reconnecting clients send `Last-Event-ID` (browsers do this
+    automatically) and receive the notifications they missed first.
+    """
+    token = bearer_token(request.headers.get("authorization")) if access_token is None else access_token
+    current_user = await run_in_threadpool(_authenticate_stream, token)
+    return StreamingResponse(
+        notification_events(current_user.id, parse_last_event_id(last_event_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/unread-count", response_model=NotificationUnreadCount)
-async def unread_count(
+def unread_count(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    count = (
-        db.query(Notification)
-        .filter(Notification.user_id == current_user.id, Notification.is_read.is_(False))
-        .count()
-    )
+    count = get_unread_counts(db, [current_user.id])[current_user.id]
     return NotificationUnreadCount(unread_count=count)
 
 
 @router.patch("/{notification_id}/read", response_model=NotificationResponse)
-async def mark_notification_read(
+def mark_notification_read(
     notification_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -59,6 +93,7 @@ async def mark_notification_read(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
 
     if not notification.is_read:
+        stage_unread_count(db, current_user.id, decrement_unread(db, current_user.id))
         notification.is_read = True
         notification.read_at = datetime.now(timezone.utc)
         db.commit()
@@ -67,18 +102,18 @@ async def mark_notification_read(
 
 
 @router.patch("/read-all")
-async def mark_all_read(
+def mark_all_read(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    unread = (
-        db.query(Notification)
-        .filter(Notification.user_id == current_user.id, Notification.is_read.is_(False))
-        .all()
-    )
-    now = datetime.now(timezone.utc)
-    for row in unread:
-        row.is_read = True
-        row.read_at = now
+    marked = db.execute(
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read.is_(False))
+        .values(is_read=True, read_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    reset_unread(db, current_user.id)
+    if marked:
+        stage_unread_count(db, current_user.id, 0)
     db.commit()
-    return {"message": f"Marked {len(unread)} notifications as read"}
+    return {"message": f"Marked {marked} notifications as read"}
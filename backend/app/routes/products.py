@@ -19,7 +19,7 @@ router = APIRouter(prefix="/api/products", tags=["products"])
 
 
 @router.post("/", response_model=ProductResponse)
-async def create_product(
+def create_product(
     product_data: ProductCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -73,7 +73,7 @@ async def create_product(
 
 
 @router.get("/", response_model=List[ProductListResponse])
-async def list_products(
+def list_products(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     skip: int = 0,
@@ -103,7 +103,7 @@ async def list_products(
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(
+def get_product(
     product_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -129,7 +129,7 @@ async def get_product(
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
-async def update_product(
+def update_product(
     product_id: int,
     product_data: ProductUpdate,
     current_user: User = Depends(get_current_user),
@@ -193,7 +193,7 @@ async def update_product(
 
 
 @router.delete("/{product_id}")
-async def delete_product(
+def delete_product(
     product_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -229,7 +229,7 @@ async def delete_product(
 
 
 @router.get("/{product_id}/thresholds", response_model=List[StockThresholdResponse])
-async def list_product_thresholds(
+def list_product_thresholds(
     product_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -259,7 +259,7 @@ async def list_product_thresholds(
 
 
 @router.put("/{product_id}/thresholds", response_model=StockThresholdResponse)
-async def upsert_product_threshold(
+def upsert_product_threshold(
     product_id: int,
     payload: StockThresholdUpsert,
     current_user: User = Depends(get_current_user),
@@ -4,11 +4,13 @@ Purchase order management routes.
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, contains_eager
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.product import Product
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from app.models.supplier import Supplier
@@ -19,7 +21,8 @@ from app.schemas.purchase_order import (
     PurchaseOrderResponse,
     PurchaseOrderStatusUpdate,
 )
-from app.services.stock_service import increase_stock
+from app.services.dashboard_cache_service import invalidate_dashboards
+from app.services.stock_service import increase_stock_batch
 
 router = APIRouter(prefix="/api/purchase-orders", tags=["purchase-orders"])
 
@@ -29,7 +32,7 @@ def utc_now():
 
 
 @router.post("/", response_model=PurchaseOrderResponse)
-async def create_purchase_order(
+def create_purchase_order(
     payload: PurchaseOrderCreate,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -65,40 +68,55 @@ async def create_purchase_order(
         notes=payload.notes,
     )
 
-    total_cost = 0.0
+    # One IN query for every line's product instead of one lookup per line.
+    product_ids = {item.product_id for item in payload.items}
+    products = {product.id: product for product in db.query(Product).filter(Product.id.in_(product_ids))}
+    missing = sorted(product_ids - products.keys())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": "Product not found", "product_ids": missing},
+        )
+
+    lines = []
     for item in payload.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        product = products[item.product_id]
         unit_price = item.unit_price if item.unit_price is not None else product.selling_price
-        line_total = float(item.quantity) * float(item.unit_cost)
-        total_cost += line_total
-        purchase_order.items.append(
-            PurchaseOrderItem(
-                product_id=item.product_id,
-                quantity=item.quantity,
-                unit_cost=item.unit_cost,
-                unit_price=unit_price,
-                line_total=line_total,
-            )
+        lines.append(
+            {
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_cost": item.unit_cost,
+                "unit_price": unit_price,
+                "line_total": float(item.quantity) * float(item.unit_cost),
+            }
         )
 
-    purchase_order.total_cost = total_cost
+    purchase_order.total_cost = sum(line["line_total"] for line in lines)
     db.add(purchase_order)
+    db.flush()
+    # One executemany INSERT; appending items to the relationship would flush them row by row.
+    db.execute(insert(PurchaseOrderItem), [{"purchase_order_id": purchase_order.id, **line} for line in lines])
     db.commit()
     db.refresh(purchase_order)
     return PurchaseOrderResponse.model_validate(purchase_order)
 
 
 @router.get("/", response_model=List[PurchaseOrderListItem])
-async def list_purchase_orders(
+def list_purchase_orders(
+    response: Response,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
     store_id: Optional[int] = None,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
 ):
-    query = db.query(PurchaseOrder).join(Supplier, Supplier.id == PurchaseOrder.supplier_id).join(
-        Store, Store.id == PurchaseOrder.store_id
+    query = (
+        db.query(PurchaseOrder)
+        .join(Supplier, Supplier.id == PurchaseOrder.supplier_id)
+        .join(Store, Store.id == PurchaseOrder.store_id)
+        .options(contains_eager(PurchaseOrder.supplier), contains_eager(PurchaseOrder.store))
     )
     if current_user.role == "admin":
         store_id = current_user.store_id
@@ -113,7 +131,7 @@ async def list_purchase_orders(
     if status_filter:
         query = query.filter(PurchaseOrder.status == status_filter.lower())
 
-    orders = query.order_by(PurchaseOrder.created_at.desc()).all()
+    orders = paginate(query, PurchaseOrder, response, cursor, limit)
     results = []
     for order in orders:
         results.append(
@@ -134,7 +152,7 @@ async def list_purchase_orders(
 
 
 @router.get("/{purchase_order_id}", response_model=PurchaseOrderResponse)
-async def get_purchase_order(
+def get_purchase_order(
     purchase_order_id: int,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -152,7 +170,7 @@ async def get_purchase_order(
 
 
 @router.post("/{purchase_order_id}/status", response_model=PurchaseOrderResponse)
-async def update_purchase_order_status(
+def update_purchase_order_status(
     purchase_order_id: int,
     payload: PurchaseOrderStatusUpdate,
     current_user=Depends(check_permission("admin")),
@@ -178,19 +196,23 @@ async def update_purchase_order_status(
     elif new_status == "received":
         if order.status == "received":
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order already received")
-        for item in order.items:
-            increase_stock(
-                db=db,
-                store_id=order.store_id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                buying_price=item.unit_cost,
-                selling_price=item.unit_price or item.unit_cost,
-                actor_id=current_user.id,
-                event_type="purchase_order_received",
-                details=f"PO #{order.id} received",
-                payment_status="unpaid",
-            )
+        increase_stock_batch(
+            db=db,
+            store_id=order.store_id,
+            lines=[
+                {
+                    "product_id": item.product_id,
+                    "quantity": item.quantity,
+                    "buying_price": item.unit_cost,
+                    "selling_price": item.unit_price or item.unit_cost,
+                }
+                for item in order.items
+            ],
+            actor_id=current_user.id,
+            event_type="purchase_order_received",
+            details=f"PO #{order.id} received",
+            payment_status="unpaid",
+        )
         order.status = "received"
         order.received_at = order.received_at or utc_now()
     elif new_status == "cancelled":
@@ -203,4 +225,6 @@ async def update_purchase_order_status(
 
     db.commit()
     db.refresh(order)
+    if new_status == "received":
+        invalidate_dashboards(db, store_ids=[order.store_id], user_ids=[current_user.id])
     return PurchaseOrderResponse.model_validate(order)
@@ -1,20 +1,22 @@
 """Store management routes."""
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.store import Store
 from app.models.user import User
 from app.schemas.inventory import StoreCreate, StoreListResponse, StoreResponse, StoreUpdate
+from app.services.notification_service import invalidate_notification_recipients
 
 router = APIRouter(prefix="/api/stores", tags=["stores"])
 
 
 @router.post("/", response_model=StoreResponse)
-async def create_store(
+def create_store(
     store_data: StoreCreate,
     current_user: User = Depends(check_permission("superuser")),
     db: Session = Depends(get_db),
@@ -35,11 +37,12 @@ async def create_store(
 
 
 @router.get("/", response_model=List[StoreListResponse])
-async def list_stores(
+def list_stores(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 20,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     active_only: bool = True,
 ):
     """List stores; admins are store-scoped."""
@@ -51,12 +54,12 @@ async def list_stores(
     elif current_user.role == "superuser":
         query = query.filter(Store.merchant_id == current_user.id)
 
-    stores = query.order_by(Store.created_at.desc()).offset(skip).limit(limit).all()
+    stores = paginate(query, Store, response, cursor, limit)
     return [StoreListResponse.model_validate(store) for store in stores]
 
 
 @router.get("/{store_id}", response_model=StoreResponse)
-async def get_store(
+def get_store(
     store_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -72,7 +75,7 @@ async def get_store(
 
 
 @router.put("/{store_id}", response_model=StoreResponse)
-async def update_store(
+def update_store(
     store_id: int,
     store_data: StoreUpdate,
     current_user: User = Depends(check_permission("superuser")),
@@ -105,7 +108,7 @@ async def update_store(
 
 
 @router.delete("/{store_id}")
-async def delete_store(
+def delete_store(
     store_id: int,
     current_user: User = Depends(check_permission("superuser")),
     db: Session = Depends(get_db),
@@ -120,4 +123,5 @@ async def delete_store(
 
     db.delete(store)
     db.commit()
+    invalidate_notification_recipients(store_id)
     return {"message": "Store deleted successfully"}
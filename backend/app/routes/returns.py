@@ -4,15 +4,17 @@ Returns management routes.
 from typing import List, Optional
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.product import Product
 from app.models.return_request import ReturnRequest
 from app.models.store import Store
 from app.schemas.returns import ReturnCreate, ReturnResponse, ReturnStatusUpdate
+from app.services.dashboard_cache_service import invalidate_dashboards
 from app.services.stock_service import decrease_stock, increase_stock
 
 router = APIRouter(prefix="/api/returns", tags=["returns"])
@@ -23,7 +25,7 @@ def utc_now():
 
 
 @router.post("/", response_model=ReturnResponse)
-async def create_return(
+def create_return(
     payload: ReturnCreate,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -58,11 +60,14 @@ async def create_return(
 
 
 @router.get("/", response_model=List[ReturnResponse])
-async def list_returns(
+def list_returns(
+    response: Response,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
     store_id: Optional[int] = None,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
 ):
     query = db.query(ReturnRequest)
     if current_user.role == "admin":
@@ -79,12 +84,12 @@ async def list_returns(
         )
     if status_filter:
         query = query.filter(ReturnRequest.status == status_filter.lower())
-    records = query.order_by(ReturnRequest.created_at.desc()).all()
+    records = paginate(query, ReturnRequest, response, cursor, limit)
     return [ReturnResponse.model_validate(item) for item in records]
 
 
 @router.post("/{return_id}/status", response_model=ReturnResponse)
-async def update_return_status(
+def update_return_status(
     return_id: int,
     payload: ReturnStatusUpdate,
     current_user=Depends(check_permission("admin")),
@@ -104,6 +109,7 @@ async def update_return_status(
     if new_status not in {"pending", "approved", "completed", "rejected"}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
 
+    touched = []
     if new_status == "approved":
         record.status = "approved"
     elif new_status == "completed":
@@ -126,7 +132,7 @@ async def update_return_status(
                 payment_status="paid",
             )
         else:
-            decrease_stock(
+            touched = decrease_stock(
                 db=db,
                 store_id=record.store_id,
                 product_id=record.product_id,
@@ -149,4 +155,10 @@ async def update_return_status(
 
     db.commit()
     db.refresh(record)
+    if new_status == "completed":
+        invalidate_dashboards(
+            db,
+            store_ids=[record.store_id],
+            user_ids=[item.created_by for item in touched] + [current_user.id],
+        )
     return ReturnResponse.model_validate(record)
@@ -3,22 +3,26 @@ Sales routes.
 """
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, run_with_retries
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.product import Product
 from app.models.sale import Sale
 from app.models.store import Store
-from app.schemas.sales import SaleCreate, SaleResponse
-from app.services.stock_service import decrease_stock
+from app.schemas.sales import SaleBatchCreate, SaleBatchResponse, SaleCreate, SaleResponse
+from app.services.dashboard_cache_service import invalidate_dashboards
+from app.services.rollup_service import record_sale_in_rollup, record_sales_in_rollup
+from app.services.stock_service import decrease_stock, decrease_stock_batch
 
 router = APIRouter(prefix="/api/sales", tags=["sales"])
 
 
 @router.post("/", response_model=SaleResponse)
-async def create_sale(
+def create_sale(
     payload: SaleCreate,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -43,38 +47,142 @@ async def create_sale(
     total_price = float(unit_price) * float(payload.quantity)
     total_cost = float(unit_cost) * float(payload.quantity)
 
-    decrease_stock(
-        db=db,
-        store_id=payload.store_id,
-        product_id=payload.product_id,
-        quantity=payload.quantity,
-        actor_id=current_user.id,
-        event_type="sale_recorded",
-        details="Sale recorded",
-    )
-
-    sale = Sale(
-        store_id=payload.store_id,
-        product_id=payload.product_id,
-        created_by=current_user.id,
-        quantity=payload.quantity,
-        unit_price=unit_price,
-        unit_cost=unit_cost,
-        total_price=total_price,
-        total_cost=total_cost,
-        notes=payload.notes,
-    )
-    db.add(sale)
-    db.commit()
+    def record_sale():
+        touched = decrease_stock(
+            db=db,
+            store_id=payload.store_id,
+            product_id=payload.product_id,
+            quantity=payload.quantity,
+            actor_id=current_user.id,
+            event_type="sale_recorded",
+            details="Sale recorded",
+        )
+        sale = Sale(
+            store_id=payload.store_id,
+            product_id=payload.product_id,
+            created_by=current_user.id,
+            quantity=payload.quantity,
+            unit_price=unit_price,
+            unit_cost=unit_cost,
+            total_price=total_price,
+            total_cost=total_cost,
+            notes=payload.notes,
+        )
+        db.add(sale)
+        db.flush()
+        record_sale_in_rollup(db, sale)
+        db.commit()
+        return sale, touched
+
+    sale, touched = run_with_retries(db, record_sale)
     db.refresh(sale)
+    invalidate_dashboards(db, store_ids=[sale.store_id], user_ids=[record.created_by for record in touched])
     return SaleResponse.model_validate(sale)
 
 
+def _sale_line_key(product_id: int, quantity: int, unit_price, notes: Optional[str]) -> tuple:
+    # Lines with equal keys are interchangeable, so any pairing between them is correct.
+    return product_id, quantity, float(unit_price), notes
+
+
+@router.post("/batch", response_model=SaleBatchResponse)
+def create_sale_batch(
+    payload: SaleBatchCreate,
+    current_user=Depends(check_permission("admin")),
+    db: Session = Depends(get_db),
+):
+    """
+    Record a whole basket in one transaction.
+
+    Products, balances and inventory rows are read with one query each and
+    the sales and inventory events are bulk-inserted. If any line fails,
+    nothing is recorded; the error lists the offending product ids.
+    """
+    if current_user.role == "admin":
+        enforce_store_scope(current_user, payload.store_id)
+    store = db.query(Store).filter(Store.id == payload.store_id).first()
+    if not store:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+    if current_user.role == "superuser" and store.merchant_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Store not in your account")
+
+    product_ids = {line.product_id for line in payload.lines}
+    products = {product.id: product for product in db.query(Product).filter(Product.id.in_(product_ids))}
+    missing = sorted(product_ids - products.keys())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": "Product not found", "product_ids": missing},
+        )
+
+    quantities: dict[int, int] = {}
+    for line in payload.lines:
+        quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+
+    def record_basket():
+        touched = decrease_stock_batch(
+            db=db,
+            store_id=payload.store_id,
+            quantities=quantities,
+            actor_id=current_user.id,
+            event_type="sale_recorded",
+            details="Sale recorded",
+        )
+
+        rows = []
+        for line in payload.lines:
+            product = products[line.product_id]
+            unit_price = line.unit_price if line.unit_price is not None else product.selling_price
+            unit_cost = product.buying_price
+            rows.append(
+                {
+                    "store_id": payload.store_id,
+                    "product_id": line.product_id,
+                    "created_by": current_user.id,
+                    "quantity": line.quantity,
+                    "unit_price": unit_price,
+                    "unit_cost": unit_cost,
+                    "total_price": float(unit_price) * float(line.quantity),
+                    "total_cost": float(unit_cost) * float(line.quantity),
+                    "notes": line.notes,
+                }
+            )
+        # RETURNING rows come back in no guaranteed order (and ordered RETURNING goes
+        # row by row on SQLite), so match them to basket lines by their values.
+        returned: dict[tuple, list[Sale]] = {}
+        for sale in db.scalars(insert(Sale).returning(Sale), rows):
+            key = _sale_line_key(sale.product_id, sale.quantity, sale.unit_price, sale.notes)
+            returned.setdefault(key, []).append(sale)
+        sales = [
+            returned[_sale_line_key(row["product_id"], row["quantity"], row["unit_price"], row["notes"])].pop()
+            for row in rows
+        ]
+        record_sales_in_rollup(db, sales)
+        # Read everything the response needs before commit expires it.
+        result = SaleBatchResponse(
+            store_id=payload.store_id,
+            total_price=sum(sale.total_price for sale in sales),
+            total_cost=sum(sale.total_cost for sale in sales),
+            sales=[SaleResponse.model_validate(sale) for sale in sales],
+        )
+        stock_owner_ids = {record.created_by for record in touched}
+        db.commit()
+        return result, stock_owner_ids
+
+    result, stock_owner_ids = run_with_retries(db, record_basket)
+
+    invalidate_dashboards(db, store_ids=[payload.store_id], user_ids=stock_owner_ids)
+    return result
+
+
 @router.get("/", response_model=List[SaleResponse])
-async def list_sales(
+def list_sales(
+    response: Response,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
     store_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
 ):
     query = db.query(Sale)
     if current_user.role == "admin":
@@ -87,5 +195,5 @@ async def list_sales(
         query = query.filter(Sale.store_id == store_id)
     elif current_user.role == "superuser":
         query = query.join(Store, Store.id == Sale.store_id).filter(Store.merchant_id == current_user.id)
-    sales = query.order_by(Sale.created_at.desc()).all()
+    sales = paginate(query, Sale, response, cursor, limit)
     return [SaleResponse.model_validate(item) for item in sales]
@@ -4,15 +4,17 @@ Stock transfer routes.
 from typing import List, Optional
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.product import Product
 from app.models.stock_transfer import StockTransfer
 from app.models.store import Store
 from app.schemas.stock_transfer import StockTransferCreate, StockTransferResponse, StockTransferStatusUpdate
+from app.services.dashboard_cache_service import invalidate_dashboards
 from app.services.stock_service import decrease_stock, increase_stock
 
 router = APIRouter(prefix="/api/stock-transfers", tags=["stock-transfers"])
@@ -23,7 +25,7 @@ def utc_now():
 
 
 @router.post("/", response_model=StockTransferResponse)
-async def create_transfer(
+def create_transfer(
     payload: StockTransferCreate,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -66,11 +68,14 @@ async def create_transfer(
 
 
 @router.get("/", response_model=List[StockTransferResponse])
-async def list_transfers(
+def list_transfers(
+    response: Response,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
     store_id: Optional[int] = None,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
 ):
     query = db.query(StockTransfer)
     if current_user.role == "admin":
@@ -89,12 +94,12 @@ async def list_transfers(
         )
     if status_filter:
         query = query.filter(StockTransfer.status == status_filter.lower())
-    transfers = query.order_by(StockTransfer.created_at.desc()).all()
+    transfers = paginate(query, StockTransfer, response, cursor, limit)
     return [StockTransferResponse.model_validate(item) for item in transfers]
 
 
 @router.post("/{transfer_id}/status", response_model=StockTransferResponse)
-async def update_transfer_status(
+def update_transfer_status(
     transfer_id: int,
     payload: StockTransferStatusUpdate,
     current_user=Depends(check_permission("admin")),
@@ -114,6 +119,7 @@ async def update_transfer_status(
     if new_status not in {"pending", "approved", "completed", "cancelled"}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
 
+    touched = []
     if new_status == "approved":
         transfer.status = "approved"
         transfer.approved_by = current_user.id
@@ -125,7 +131,7 @@ async def update_transfer_status(
         product = db.query(Product).filter(Product.id == transfer.product_id).first()
         if not product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-        decrease_stock(
+        touched = decrease_stock(
             db=db,
             store_id=transfer.from_store_id,
             product_id=transfer.product_id,
@@ -157,4 +163,10 @@ async def update_transfer_status(
         transfer.notes = payload.notes
     db.commit()
     db.refresh(transfer)
+    if new_status == "completed":
+        invalidate_dashboards(
+            db,
+            store_ids=[transfer.from_store_id, transfer.to_store_id],
+            user_ids=[record.created_by for record in touched] + [current_user.id],
+        )
     return StockTransferResponse.model_validate(transfer)
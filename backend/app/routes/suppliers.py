@@ -16,7 +16,7 @@ router = APIRouter(prefix="/api/suppliers", tags=["suppliers"])
 
 
 @router.post("/", response_model=SupplierResponse)
-async def create_supplier(
+def create_supplier(
     payload: SupplierCreate,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -46,7 +46,7 @@ async def create_supplier(
 
 
 @router.get("/", response_model=List[SupplierResponse])
-async def list_suppliers(
+def list_suppliers(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
     store_id: Optional[int] = None,
@@ -69,7 +69,7 @@ async def list_suppliers(
 
 
 @router.put("/{supplier_id}", response_model=SupplierResponse)
-async def update_supplier(
+def update_supplier(
     supplier_id: int,
     payload: SupplierUpdate,
     current_user=Depends(check_permission("admin")),
@@ -93,7 +93,7 @@ async def update_supplier(
 
 
 @router.delete("/{supplier_id}")
-async def delete_supplier(
+def delete_supplier(
     supplier_id: int,
     current_user=Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -3,11 +3,12 @@ import logging
 from datetime import datetime, timezone
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.models.product import Product
 from app.models.store import Store
 from app.models.supply_request import SupplyRequest, SupplyRequestStatus
@@ -18,6 +19,7 @@ from app.schemas.reports import (
     SupplyRequestDecline,
     SupplyRequestResponse,
 )
+from app.services.dashboard_cache_service import invalidate_dashboards
 from app.services.notification_service import (
     notify_supply_request_pending,
     notify_supply_request_status,
@@ -28,7 +30,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/", response_model=SupplyRequestResponse, status_code=status.HTTP_201_CREATED)
-async def create_supply_request(
+def create_supply_request(
     request_data: SupplyRequestCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -67,16 +69,18 @@ async def create_supply_request(
     )
     db.commit()
     db.refresh(new_request)
+    invalidate_dashboards(db, store_ids=[new_request.store_id], user_ids=[new_request.requested_by])
     logger.info("Supply request created user_id=%s request_id=%s", current_user.id, new_request.id)
     return SupplyRequestResponse.model_validate(new_request)
 
 
 @router.get("/", response_model=List[SupplyRequestResponse])
-async def list_supply_requests(
+def list_supply_requests(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 20,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     status: str | None = None,
     store_id: int | None = None,
 ):
@@ -99,12 +103,12 @@ async def list_supply_requests(
     if status is not None:
         query = query.filter(SupplyRequest.status == status)
 
-    requests = query.order_by(SupplyRequest.created_at.desc()).offset(skip).limit(limit).all()
+    requests = paginate(query, SupplyRequest, response, cursor, limit)
     return [SupplyRequestResponse.model_validate(req) for req in requests]
 
 
 @router.get("/{request_id}", response_model=SupplyRequestResponse)
-async def get_supply_request(
+def get_supply_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -123,7 +127,7 @@ async def get_supply_request(
 
 
 @router.post("/{request_id}/approve")
-async def approve_supply_request(
+def approve_supply_request(
     request_id: int,
     approval_data: SupplyRequestApprove,
     current_user: User = Depends(check_permission("admin")),
@@ -151,13 +155,14 @@ async def approve_supply_request(
     )
     db.commit()
     db.refresh(supply_request)
+    invalidate_dashboards(db, store_ids=[supply_request.store_id], user_ids=[supply_request.requested_by])
 
     logger.info("Supply request approved actor_id=%s request_id=%s", current_user.id, supply_request.id)
     return {"message": "Supply request approved successfully", "request": SupplyRequestResponse.model_validate(supply_request)}
 
 
 @router.post("/{request_id}/decline")
-async def decline_supply_request(
+def decline_supply_request(
     request_id: int,
     decline_data: SupplyRequestDecline,
     current_user: User = Depends(check_permission("admin")),
@@ -185,13 +190,14 @@ async def decline_supply_request(
     )
     db.commit()
     db.refresh(supply_request)
+    invalidate_dashboards(db, store_ids=[supply_request.store_id], user_ids=[supply_request.requested_by])
 
     logger.info("Supply request declined actor_id=%s request_id=%s", current_user.id, supply_request.id)
     return {"message": "Supply request declined successfully", "request": SupplyRequestResponse.model_validate(supply_request)}
 
 
 @router.get("/pending/all", response_model=List[SupplyRequestResponse])
-async def get_pending_requests(
+def get_pending_requests(
     current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
 ):
@@ -2,12 +2,13 @@
 import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import check_permission, enforce_store_scope, get_current_user
+from app.core.pagination import MAX_PAGE_SIZE, paginate
 from app.core.security import create_invite_token, hash_password, verify_password
 from app.models.store import Store
 from app.models.user import User, UserRole
@@ -21,14 +22,17 @@ from app.schemas.user import (
     UserResponse,
     UserUpdate,
 )
-from app.services.email_service import build_admin_invite_link, send_admin_invite_email
+from app.services.dashboard_cache_service import invalidate_dashboards
+from app.services.email_service import build_admin_invite_link, queue_admin_invite_email
+from app.services.notification_service import invalidate_notification_recipients
+from app.services.principal_cache_service import invalidate_principal
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/create", response_model=UserResponse)
-async def create_user_by_admin(
+def create_user_by_admin(
     user_data: UserCreateByAdmin,
     current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -65,13 +69,16 @@ async def create_user_by_admin(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    invalidate_dashboards(db, store_ids=[new_user.store_id])
+    if new_user.role != UserRole.CLERK:
+        invalidate_notification_recipients(new_user.store_id)
 
     logger.info("User created actor_id=%s created_user_id=%s role=%s", current_user.id, new_user.id, new_user.role)
     return UserResponse.model_validate(new_user)
 
 
 @router.post("/admin-invites", response_model=AdminInviteResponse)
-async def create_admin_invite(
+def create_admin_invite(
     payload: AdminInviteCreateRequest,
     current_user: User = Depends(check_permission("superuser")),
     db: Session = Depends(get_db),
@@ -96,7 +103,8 @@ async def create_admin_invite(
         }
     )
     invite_link = build_admin_invite_link(token, settings.invite_token_expire_hours)
-    send_admin_invite_email(payload.email, invite_link, settings.invite_token_expire_hours)
+    queue_admin_invite_email(db, payload.email, invite_link, settings.invite_token_expire_hours)
+    db.commit()
 
     logger.info("Admin invite created actor_id=%s email=%s", current_user.id, payload.email)
     return AdminInviteResponse(
@@ -107,11 +115,12 @@ async def create_admin_invite(
 
 
 @router.get("/", response_model=List[UserListResponse])
-async def list_users(
+def list_users(
+    response: Response,
     current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 20,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     role: str | None = None,
 ):
     """List users with role/store filtering."""
@@ -131,12 +140,12 @@ async def list_users(
         else:
             query = query.filter(User.id == current_user.id)
 
-    users = query.order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+    users = paginate(query, User, response, cursor, limit)
     return [UserListResponse.model_validate(user) for user in users]
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -150,7 +159,7 @@ async def get_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
@@ -175,12 +184,14 @@ async def update_user(
 
     db.commit()
     db.refresh(user)
+    invalidate_dashboards(db, store_ids=[user.store_id])
+    invalidate_principal(user.id)
     logger.info("User updated actor_id=%s target_user_id=%s", current_user.id, user.id)
     return UserResponse.model_validate(user)
 
 
 @router.post("/{user_id}/change-password")
-async def change_password(
+def change_password(
     user_id: int,
     password_data: UserChangePassword,
     current_user: User = Depends(get_current_user),
@@ -198,11 +209,12 @@ async def change_password(
 
     user.hashed_password = hash_password(password_data.new_password)
     db.commit()
+    invalidate_principal(user.id)
     return {"message": "Password changed successfully"}
 
 
 @router.patch("/{user_id}/deactivate")
-async def deactivate_user(
+def deactivate_user(
     user_id: int,
     deactivate_data: UserDeactivate,
     current_user: User = Depends(check_permission("admin")),
@@ -216,6 +228,9 @@ async def deactivate_user(
     user.is_active = deactivate_data.is_active
     db.commit()
     db.refresh(user)
+    invalidate_dashboards(db, store_ids=[user.store_id])
+    invalidate_principal(user.id)
+    invalidate_notification_recipients(user.store_id)
 
     logger.info("User status changed actor_id=%s target_user_id=%s active=%s", current_user.id, user.id, user.is_active)
     status_text = "activated" if deactivate_data.is_active else "deactivated"
@@ -223,7 +238,7 @@ async def deactivate_user(
 
 
 @router.delete("/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     current_user: User = Depends(check_permission("admin")),
     db: Session = Depends(get_db),
@@ -233,8 +248,12 @@ async def delete_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     enforce_store_scope(current_user, user.store_id)
+    store_id = user.store_id
     db.delete(user)
     db.commit()
+    invalidate_dashboards(db, store_ids=[store_id])
+    invalidate_principal(user_id)
+    invalidate_notification_recipients(store_id)
 
     logger.info("User deleted actor_id=%s target_user_id=%s", current_user.id, user_id)
     return {"message": "User deleted successfully"}
@@ -1,5 +1,5 @@
 """Pydantic schemas for Inventory/Supply validation and dashboard reporting."""
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional
 
@@ -64,6 +64,17 @@ class InventoryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StockAtResponse(BaseModel):
+    store_id: int
+    product_id: int
+    at: datetime
+    quantity_in_stock: int
+    checkpoint_day: Optional[date]
+    events_replayed: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class SupplyRequestCreate(BaseModel):
     product_id: int
     store_id: int
@@ -2,7 +2,7 @@
 Pydantic schemas for sales.
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -29,3 +29,22 @@ class SaleResponse(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SaleBatchLine(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+    unit_price: Optional[float] = None
+    notes: Optional[str] = None
+
+
+class SaleBatchCreate(BaseModel):
+    store_id: int
+    lines: List[SaleBatchLine] = Field(..., min_length=1, max_length=200)
+
+
+class SaleBatchResponse(BaseModel):
+    store_id: int
+    total_price: float
+    total_cost: float
+    sales: List[SaleResponse]
@@ -0,0 +1,79 @@
+"""
+Response cache for the admin, clerk and merchant dashboards.
+
+Entries are keyed `dashboard:<scope>:<view>` where the scope is the data a
+dashboard reads: a clerk's own records (`user:<id>`), one store
+(`store:<id>`), a merchant's stores (`merchant:<id>`) or, for admins without
+a store, everything (`all`). Writes call `invalidate_dashboards` after commit
+with the stores and users they touched.
+"""
+from typing import Callable, Iterable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, build_cache
+from app.core.config import settings
+from app.models.store import Store
+from app.models.user import User
+
+DASHBOARD_VIEWS = ("admin", "clerk", "clerk_overview", "clerk_overview_lite", "merchant")
+
+_cache: Optional[CacheBackend] = None
+
+
+def get_dashboard_cache() -> CacheBackend:
+    global _cache
+    if _cache is None:
+        _cache = build_cache(
+            "dashboard",
+            max_entries=settings.dashboard_cache_max_entries,
+            default_ttl=settings.dashboard_cache_ttl_seconds,
+        )
+    return _cache
+
+
+def dashboard_scope(user: User) -> str:
+    """Return the cache scope for the data `user`'s dashboards are built from."""
+    if user.role == "clerk":
+        return f"user:{user.id}"
+    # Superuser dashboards span every store of the merchant, even when the row has a store_id.
+    if user.role == "superuser":
+        return f"merchant:{user.id}"
+    if user.store_id:
+        return f"store:{user.store_id}"
+    return "all"
+
+
+def cached_dashboard(view: str, scope: str, build: Callable[[], BaseModel]) -> dict:
+    """Return the cached payload for `view`/`scope`, building and storing it on a miss."""
+    cache = get_dashboard_cache()
+    key = f"dashboard:{scope}:{view}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build().model_dump(mode="json")
+        cache.set(key, payload)
+    return payload
+
+
+def invalidate_dashboards(
+    db: Session,
+    store_ids: Iterable[Optional[int]] = (),
+    user_ids: Iterable[Optional[int]] = (),
+) -> None:
+    """Drop every cached dashboard that can include data from these stores or users."""
+    store_ids = {store_id for store_id in store_ids if store_id is not None}
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+
+    scopes = {"all"}
+    scopes.update(f"store:{store_id}" for store_id in store_ids)
+    scopes.update(f"user:{user_id}" for user_id in user_ids)
+    if store_ids:
+        merchant_ids = db.query(Store.merchant_id).filter(Store.id.in_(store_ids)).all()
+        scopes.update(f"merchant:{row.merchant_id}" for row in merchant_ids)
+
+    get_dashboard_cache().delete(*(f"dashboard:{scope}:{view}" for scope in scopes for view in DASHBOARD_VIEWS))
+
+
+def clear_dashboard_cache() -> None:
+    get_dashboard_cache().clear()
@@ -1,19 +1,110 @@
-"""Email service helpers."""
+"""
+Email service helpers.
+
+Emails are queued on the outbox in the caller's transaction and sent by the
+outbox worker through the configured transport:
+
+- `sendgrid` sends through SendGrid (SENDGRID_API_KEY)
+- `local` is an offline stand-in that logs each email and keeps the most
+  recent ones in memory (`get_email_transport().sent`)
+- `auto` (default) picks `sendgrid` when an API key is set, else `local`
+
+A transport raises when sending fails so the outbox retries the message.
+"""
 import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Optional
+
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.services.outbox_service import enqueue, outbox_handler
 
 logger = logging.getLogger(__name__)
 
 
+class EmailTransport(ABC):
+    """Delivers one email: a dict with `to`, `subject`, `text` and `html`."""
+
+    @abstractmethod
+    def send(self, message: dict) -> None:
+        ...
+
+
+class SendGridTransport(EmailTransport):
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    def send(self, message: dict) -> None:
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+
+        mail = Mail(
+            from_email=settings.email_from,
+            to_emails=message["to"],
+            subject=message["subject"],
+            plain_text_content=message["text"],
+            html_content=message["html"],
+        )
+        response = SendGridAPIClient(self.api_key).send(mail)
+        logger.info(
+            "Email %r sent to %s via SendGrid status=%s",
+            message["subject"],
+            message["to"],
+            getattr(response, "status_code", "unknown"),
+        )
+
+
+class LocalEmailTransport(EmailTransport):
+    """Offline stand-in: logs each email and keeps the last `max_kept` in `sent`."""
+
+    def __init__(self, max_kept: int = 100):
+        self.sent: deque[dict] = deque(maxlen=max_kept)
+
+    def send(self, message: dict) -> None:
+        self.sent.append(message)
+        logger.info("Email %r for %s (local transport):\n%s", message["subject"], message["to"], message["text"])
+
+
+_transport: Optional[EmailTransport] = None
+
+
+def get_email_transport() -> EmailTransport:
+    global _transport
+    if _transport is None:
+        backend = settings.email_transport
+        if backend == "auto":
+            backend = "sendgrid" if settings.sendgrid_api_key else "local"
+        if backend == "sendgrid":
+            if not settings.sendgrid_api_key:
+                raise RuntimeError("EMAIL_TRANSPORT=sendgrid requires SENDGRID_API_KEY")
+            _transport = SendGridTransport(settings.sendgrid_api_key)
+        elif backend == "local":
+            _transport = LocalEmailTransport()
+        else:
+            raise ValueError(f"Unknown EMAIL_TRANSPORT {settings.email_transport!r}")
+    return _transport
+
+
+def queue_email(db: Session, *, to: str, subject: str, text: str, html: str) -> None:
+    """Queue an email on the outbox; it is sent after the caller commits."""
+    enqueue(db, "email", {"to": to, "subject": subject, "text": text, "html": html})
+
+
+@outbox_handler("email")
+def deliver_email(db: Session, payload: dict) -> None:
+    get_email_transport().send(payload)
+
+
 def build_admin_invite_link(token: str, expires_in_hours: int) -> str:
     """Build frontend invite URL from a token and expiry window."""
     base_url = settings.frontend_base_url.rstrip("/")
     return f"{base_url}/login?invite_token={token}&expires_in_hours={expires_in_hours}"
 
 
-def send_admin_invite_email(email: str, invite_link: str, expires_in_hours: int) -> None:
-    """Send an admin invite email using SendGrid (fallback to log)."""
+def queue_admin_invite_email(db: Session, email: str, invite_link: str, expires_in_hours: int) -> None:
+    """Queue the admin invite email."""
     subject = "You're invited to join MyDuka as an Admin"
     plain_text = (
         "You have been invited to join MyDuka as an admin.\n\n"
@@ -26,35 +117,7 @@ def send_admin_invite_email(email: str, invite_link: str, expires_in_hours: int)
         f"<p>This invite expires in <strong>{expires_in_hours} hours</strong>.</p>"
         f"<p><a href=\"{invite_link}\">Complete your registration</a></p>"
     )
-
-    if settings.sendgrid_api_key:
-        try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail
-
-            message = Mail(
-                from_email=settings.email_from,
-                to_emails=email,
-                subject=subject,
-                plain_text_content=plain_text,
-                html_content=html_content,
-            )
-            response = SendGridAPIClient(settings.sendgrid_api_key).send(message)
-            logger.info(
-                "Admin invite sent to %s via SendGrid status=%s",
-                email,
-                getattr(response, "status_code", "unknown"),
-            )
-            return
-        except Exception:
-            logger.exception("Failed to send SendGrid invite to %s", email)
-
-    logger.info(
-        "Admin invite prepared for %s (expires in %s hours): %s",
-        email,
-        expires_in_hours,
-        invite_link,
-    )
+    queue_email(db, to=email, subject=subject, text=plain_text, html=html_content)
 
 
 def build_password_reset_link(token: str, expires_in_hours: int) -> str:
@@ -63,8 +126,8 @@ def build_password_reset_link(token: str, expires_in_hours: int) -> str:
     return f"{base_url}/reset-password?token={token}&expires_in_hours={expires_in_hours}"
 
 
-def send_password_reset_email(email: str, reset_link: str, expires_in_hours: int) -> None:
-    """Send a password reset email using SendGrid (fallback to log)."""
+def queue_password_reset_email(db: Session, email: str, reset_link: str, expires_in_hours: int) -> None:
+    """Queue the password reset email."""
     subject = "Reset your MyDuka password"
     plain_text = (
         "We received a request to reset your MyDuka password.\n\n"
@@ -79,32 +142,4 @@ def send_password_reset_email(email: str, reset_link: str, expires_in_hours: int
         f"<p><a href=\"{reset_link}\">Reset your password</a></p>"
         "<p>If you did not request this, you can ignore this email.</p>"
     )
-
-    if settings.sendgrid_api_key:
-        try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail
-
-            message = Mail(
-                from_email=settings.email_from,
-                to_emails=email,
-                subject=subject,
-                plain_text_content=plain_text,
-                html_content=html_content,
-            )
-            response = SendGridAPIClient(settings.sendgrid_api_key).send(message)
-            logger.info(
-                "Password reset email sent to %s via SendGrid status=%s",
-                email,
-                getattr(response, "status_code", "unknown"),
-            )
-            return
-        except Exception:
-            logger.exception("Failed to send password reset email to %s", email)
-
-    logger.info(
-        "Password reset prepared for %s (expires in %s hours): %s",
-        email,
-        expires_in_hours,
-        reset_link,
-    )
+    queue_email(db, to=email, subject=subject, text=plain_text, html=html_content)
@@ -0,0 +1,76 @@
+"""
+Streaming CSV exports.
+
+Exports are generators of CSV text chunks for `StreamingResponse`. Large
+exports read from a server-side cursor in fixed-size partitions through a
+session owned by the generator (the request session is closed before the
+response body is sent), so memory stays flat in the number of rows.
+"""
+import csv
+from io import StringIO
+from typing import Callable, Iterable, Iterator, Sequence
+
+from sqlalchemy import Select
+
+from app.core.database import SessionLocal
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class _CsvChunkWriter:
+    """csv.writer over a reusable buffer that is drained after every chunk."""
+
+    def __init__(self):
+        self._buffer = StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def writerow(self, row: Sequence) -> None:
+        self._writer.writerow(row)
+
+    def drain(self) -> str:
+        chunk = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+        return chunk
+
+
+def iter_csv(headers: Sequence[str], rows: Iterable[Sequence], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield CSV text for `rows` in chunks of `chunk_size` rows."""
+    writer = _CsvChunkWriter()
+    writer.writerow(headers)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_size:
+            yield writer.drain()
+            pending = 0
+    yield writer.drain()
+
+
+def stream_query_csv(
+    statement: Select,
+    headers: Sequence[str],
+    format_row: Callable[[Sequence], Sequence],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Execute `statement` with a server-side cursor and yield CSV chunks.
+
+    Select plain columns rather than ORM entities so rows are not tracked by
+    the session's identity map.
+    """
+    db = SessionLocal()
+    try:
+        writer = _CsvChunkWriter()
+        writer.writerow(headers)
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=chunk_size))
+        for partition in result.partitions():
+            for row in partition:
+                writer.writerow(format_row(row))
+            yield writer.drain()
+        chunk = writer.drain()
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
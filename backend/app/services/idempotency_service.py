@@ -0,0 +1,134 @@
+"""
+Stored responses for write requests retried with the same Idempotency-Key.
+
+The first request with a key inserts a claim row (no status yet), runs the
+handler and stores its response on the claim. A retry finds the row with one
+read on the (user_id, key) unique index and gets the stored response back
+instead of running the handler again. Rows expire after
+IDEMPOTENCY_KEY_TTL_HOURS and are deleted by a periodic sweep.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.background import purge_in_batches, run_in_own_session, utc_now_naive
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+# A claim still unfinished after this long belongs to a request that died
+# mid-flight (worker crash, timeout); a retry may take it over.
+ABANDONED_CLAIM_AFTER = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class StoredRequest:
+    """What an earlier request with the same key left behind."""
+
+    request_hash: str
+    status_code: Optional[int]
+    content_type: Optional[str]
+    body: Optional[bytes]
+
+    @property
+    def in_progress(self) -> bool:
+        return self.status_code is None
+
+
+def _stored(row: IdempotencyKey) -> StoredRequest:
+    return StoredRequest(row.request_hash, row.status_code, row.content_type, row.response_body)
+
+
+def claim_key(db: Session, user_id: int, key: str, request_hash: str) -> Optional[StoredRequest]:
+    """
+    Claim `key` for a new request, or return what an earlier request stored.
+
+    Returns None when the caller now owns the key and must run the handler,
+    then call `store_response` or `release_key`.
+    """
+    now = utc_now_naive()
+    row = db.scalars(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    ).first()
+    if row is not None:
+        abandoned = row.status_code is None and row.created_at < now - ABANDONED_CLAIM_AFTER
+        if row.expires_at > now and not abandoned:
+            stored = _stored(row)
+            db.rollback()
+            return stored
+        db.delete(row)
+        db.flush()
+
+    db.add(
+        IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            created_at=now,
+            expires_at=now + timedelta(hours=settings.idempotency_key_ttl_hours),
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key claimed it first.
+        db.rollback()
+        row = db.scalars(
+            select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).one()
+        stored = _stored(row)
+        db.rollback()
+        return stored
+    return None
+
+
+def store_response(
+    db: Session, user_id: int, key: str, status_code: int, content_type: Optional[str], body: bytes
+) -> None:
+    """Record the response on the caller's claim so retries can replay it."""
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status_code=status_code, content_type=content_type, response_body=body)
+    )
+    db.commit()
+
+
+def release_key(db: Session, user_id: int, key: str) -> None:
+    """Drop the caller's claim so the request can be retried from scratch."""
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        )
+    )
+    db.commit()
+
+
+def purge_idempotency_keys(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """Delete expired keys in batches; return the count."""
+    now = now or utc_now_naive()
+    batch_size = batch_size or settings.idempotency_key_sweep_batch_size
+    return purge_in_batches(db, IdempotencyKey, IdempotencyKey.expires_at < now, batch_size)
+
+
+def claim_key_in_session(user_id: int, key: str, request_hash: str) -> Optional[StoredRequest]:
+    return run_in_own_session(claim_key, user_id, key, request_hash)
+
+
+def store_response_in_session(
+    user_id: int, key: str, status_code: int, content_type: Optional[str], body: bytes
+) -> None:
+    run_in_own_session(store_response, user_id, key, status_code, content_type, body)
+
+
+def release_key_in_session(user_id: int, key: str) -> None:
+    run_in_own_session(release_key, user_id, key)
+
+
+def sweep_idempotency_keys() -> int:
+    return run_in_own_session(purge_idempotency_keys)
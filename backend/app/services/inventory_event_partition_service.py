@@ -0,0 +1,184 @@
+"""
+Monthly partitions and archival for the append-only `inventory_events` log.
+
+On PostgreSQL the table is range-partitioned by `created_at`: one partition
+per month (`inventory_events_p2026_02`) plus `inventory_events_default` for
+rows no month partition covers. `ensure_inventory_event_partitions` creates
+partitions for the coming months ahead of time; main.py runs it daily.
+SQLite has no partitioning and keeps a single table.
+
+`archive_inventory_events` (`python manage.py archive-inventory-events`)
+writes every month older than the cutoff to a gzip-compressed JSON Lines
+file, then removes it from the database: by detaching and dropping the
+month's partition on PostgreSQL, by batched deletes otherwise. Stock
+checkpoints are brought up to the cutoff first, so `stock_at` still knows
+the stock the archived events added up to.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.background import purge_in_batches, run_in_own_session
+from app.core.config import settings
+from app.models.inventory_event import InventoryEvent
+from app.services.stock_replay_service import build_stock_checkpoints
+
+TABLE = InventoryEvent.__tablename__
+ARCHIVE_CHUNK_SIZE = 1000
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_before(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def is_partitioned(db: Session) -> bool:
+    """True when `inventory_events` is a PostgreSQL partitioned table."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    row = db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": TABLE},
+    ).first()
+    return row is not None
+
+
+def _partition_names(db: Session) -> set[str]:
+    return set(
+        db.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(:table)"
+            ),
+            {"table": TABLE},
+        )
+    )
+
+
+def ensure_inventory_event_partitions(
+    db: Session, today: Optional[date] = None, months_ahead: Optional[int] = None
+) -> list[str]:
+    """Create missing partitions from this month through `months_ahead` months ahead; return their names."""
+    if not is_partitioned(db):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.inventory_event_partition_months_ahead
+    # Every worker runs this job; serialize them so CREATE TABLE never races.
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": TABLE})
+    existing = _partition_names(db)
+    created = []
+    month = month_start(today or date.today())
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = next_month(month)
+    db.commit()
+    return created
+
+
+def maintain_inventory_event_partitions() -> int:
+    return len(run_in_own_session(ensure_inventory_event_partitions))
+
+
+def _in_month(month: date):
+    start = datetime(month.year, month.month, 1)
+    end = datetime(next_month(month).year, next_month(month).month, 1)
+    return (InventoryEvent.created_at >= start) & (InventoryEvent.created_at < end)
+
+
+def _archive_path(directory: Path, month: date) -> Path:
+    # Never overwrite: rows that arrive for an archived month go to a new file.
+    path = directory / f"{TABLE}-{month:%Y-%m}.jsonl.gz"
+    suffix = 1
+    while path.exists():
+        suffix += 1
+        path = directory / f"{TABLE}-{month:%Y-%m}.{suffix}.jsonl.gz"
+    return path
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _write_month(db: Session, month: date, path: Path) -> tuple[int, Optional[int]]:
+    """Write the month's events to `path` (via a temporary file); return the row count and last id."""
+    statement = select(*InventoryEvent.__table__.columns).where(_in_month(month)).order_by(InventoryEvent.id)
+    partial = path.with_name(path.name + ".partial")
+    written, last_id = 0, None
+    with gzip.open(partial, "wt", encoding="utf-8") as archive:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=ARCHIVE_CHUNK_SIZE))
+        for partition in result.partitions():
+            for row in partition:
+                archive.write(json.dumps({key: _json_value(value) for key, value in row._mapping.items()}) + "\n")
+                written += 1
+                last_id = row.id
+    if written:
+        os.replace(partial, path)
+    else:
+        partial.unlink()
+    return written, last_id
+
+
+def archive_inventory_events(
+    db: Session, before: date, directory: Path, batch_size: Optional[int] = None
+) -> list[dict]:
+    """
+    Move events from months before `before`'s month into compressed files.
+
+    Returns one entry per archived month with its row count and file.
+    Every store is checkpointed up to the cutoff before anything is
+    removed, and a month's file is complete before its rows are removed,
+    so an interrupted run can simply be repeated.
+    """
+    before = month_start(before)
+    batch_size = batch_size or settings.inventory_event_archive_batch_size
+    # Replay needs the stock at the cutoff once the events before it are gone.
+    build_stock_checkpoints(db, until=before)
+    directory.mkdir(parents=True, exist_ok=True)
+    partitioned = is_partitioned(db)
+    partitions = _partition_names(db) if partitioned else set()
+
+    oldest = db.scalar(select(func.min(InventoryEvent.created_at)))
+    month = month_start(oldest) if oldest is not None else before
+    archived = []
+    while month < before:
+        path = _archive_path(directory, month)
+        rows, last_id = _write_month(db, month, path)
+        if partition_name(month) in partitions:
+            db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition_name(month)}"))
+            db.execute(text(f"DROP TABLE {partition_name(month)}"))
+            db.commit()
+        elif rows:
+            # Only rows that made it into the file; later inserts wait for the next run.
+            purge_in_batches(db, InventoryEvent, _in_month(month) & (InventoryEvent.id <= last_id), batch_size)
+        if rows:
+            archived.append({"month": f"{month:%Y-%m}", "rows": rows, "path": str(path)})
+        month = next_month(month)
+    db.commit()
+    return archived
@@ -0,0 +1,60 @@
+"""
+Failed-login throttling keyed by account email and by client IP.
+
+Each failure counts against both keys. An email is locked after
+LOGIN_MAX_FAILURES_PER_EMAIL failures in the window, and an IP address after
+LOGIN_MAX_FAILURES_PER_IP failures across every account it tried. A
+successful login clears the email's counter but not the IP's.
+"""
+from typing import Optional
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, build_rate_limiter
+
+_email_limiter: Optional[RateLimiter] = None
+_ip_limiter: Optional[RateLimiter] = None
+
+
+def _limiters() -> tuple[RateLimiter, RateLimiter]:
+    global _email_limiter, _ip_limiter
+    if _email_limiter is None or _ip_limiter is None:
+        _email_limiter = build_rate_limiter(
+            "login:email",
+            limit=settings.login_max_failures_per_email,
+            window_seconds=settings.login_failure_window_seconds,
+            lockout_seconds=settings.login_lockout_seconds,
+        )
+        _ip_limiter = build_rate_limiter(
+            "login:ip",
+            limit=settings.login_max_failures_per_ip,
+            window_seconds=settings.login_failure_window_seconds,
+            lockout_seconds=settings.login_lockout_seconds,
+        )
+    return _email_limiter, _ip_limiter
+
+
+def _email_key(email: str) -> str:
+    return email.strip().lower()
+
+
+def login_retry_after(email: str, client_ip: str) -> int:
+    """Return how many seconds this email or IP stays locked (0 when neither is)."""
+    email_limiter, ip_limiter = _limiters()
+    return max(email_limiter.locked_for(_email_key(email)), ip_limiter.locked_for(client_ip))
+
+
+def record_login_failure(email: str, client_ip: str) -> None:
+    email_limiter, ip_limiter = _limiters()
+    email_limiter.hit(_email_key(email))
+    ip_limiter.hit(client_ip)
+
+
+def reset_login_failures(email: str) -> None:
+    email_limiter, _ = _limiters()
+    email_limiter.reset(_email_key(email))
+
+
+def clear_login_throttles() -> None:
+    email_limiter, ip_limiter = _limiters()
+    email_limiter.clear()
+    ip_limiter.clear()
@@ -0,0 +1,166 @@
+"""
+Denormalized unread-notification counts.
+
+Every change to a user's unread notifications adjusts their
+`NotificationCounter` row in the same transaction:
+
+- `increment_unread` when notifications are inserted
+- `decrement_unread` when one is marked read
+- `reset_unread` when all are marked read
+
+Counters are seeded lazily from the notifications table on a user's first
+change (or were backfilled by the migration). Until then reads fall back to
+a COUNT. `python manage.py repair-notification-counters` recomputes every
+counter from the table and reports drift.
+"""
+from typing import Iterable
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter, utc_now
+
+
+def count_unread(db: Session, user_ids: Iterable[int]) -> dict[int, int]:
+    """Unread counts for `user_ids` computed from the notifications table in one grouped query."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    rows = db.execute(
+        select(Notification.user_id, func.count())
+        .where(Notification.user_id.in_(user_ids), Notification.is_read.is_(False))
+        .group_by(Notification.user_id)
+    )
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update({user_id: count for user_id, count in rows})
+    return counts
+
+
+def get_unread_counts(db: Session, user_ids: Iterable[int]) -> dict[int, int]:
+    """Unread counts for `user_ids`, from their counters where they exist."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    counts = dict(
+        db.execute(
+            select(NotificationCounter.user_id, NotificationCounter.unread_count).where(
+                NotificationCounter.user_id.in_(user_ids)
+            )
+        ).all()
+    )
+    missing = user_ids - counts.keys()
+    if missing:
+        counts.update(count_unread(db, missing))
+    return counts
+
+
+def _ensure_counters(db: Session, user_ids: set[int]) -> None:
+    """
+    Create missing counters, seeded from the notifications already stored.
+
+    Must run before the caller's notification change is flushed so a seeded
+    counter does not count that change twice.
+    """
+    existing = set(db.scalars(select(NotificationCounter.user_id).where(NotificationCounter.user_id.in_(user_ids))))
+    missing = user_ids - existing
+    if not missing:
+        return
+    rows = [{"user_id": user_id, "unread_count": count} for user_id, count in count_unread(db, missing).items()]
+    try:
+        with db.begin_nested():
+            db.execute(insert(NotificationCounter).values(rows))
+    except IntegrityError:
+        # A concurrent transaction seeded some of these users first; keep its rows.
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(NotificationCounter).values(row))
+            except IntegrityError:
+                pass
+
+
+def increment_unread(db: Session, added: dict[int, int]) -> None:
+    """Add `added` (user id -> new notifications) to the users' counters in one UPDATE."""
+    added = {user_id: count for user_id, count in added.items() if count}
+    if not added:
+        return
+    _ensure_counters(db, set(added))
+    db.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id.in_(added))
+        .values(
+            unread_count=NotificationCounter.unread_count + case(added, value=NotificationCounter.user_id, else_=0),
+            updated_at=utc_now(),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def decrement_unread(db: Session, user_id: int) -> int:
+    """Count one of `user_id`'s notifications as read; return the new unread count."""
+    _ensure_counters(db, {user_id})
+    return db.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id)
+        .values(
+            unread_count=case((NotificationCounter.unread_count > 0, NotificationCounter.unread_count - 1), else_=0),
+            updated_at=utc_now(),
+        )
+        .returning(NotificationCounter.unread_count),
+        execution_options={"synchronize_session": False},
+    ).scalar_one()
+
+
+def reset_unread(db: Session, user_id: int) -> None:
+    """Set `user_id`'s counter to zero after all their notifications were marked read."""
+    reset = (
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id)
+        .values(unread_count=0, updated_at=utc_now())
+    )
+    if db.execute(reset, execution_options={"synchronize_session": False}).rowcount:
+        return
+    # No counter yet; zero needs no seeding.
+    try:
+        with db.begin_nested():
+            db.execute(insert(NotificationCounter).values(user_id=user_id, unread_count=0))
+    except IntegrityError:
+        db.execute(reset, execution_options={"synchronize_session": False})
+
+
+def repair_notification_counters(db: Session, apply: bool = True) -> list[dict]:
+    """
+    Recompute unread counters from `Notification` and report any drift.
+
+    Returns one entry per user whose recorded count differed from the table.
+    With `apply=False` nothing is written.
+    """
+    expected = dict(
+        db.execute(
+            select(Notification.user_id, func.count())
+            .where(Notification.is_read.is_(False))
+            .group_by(Notification.user_id)
+        ).all()
+    )
+    counters = {row.user_id: row for row in db.scalars(select(NotificationCounter))}
+
+    drift = []
+    for user_id in sorted(expected.keys() | counters.keys()):
+        count = expected.get(user_id, 0)
+        counter = counters.get(user_id)
+        recorded = counter.unread_count if counter is not None else None
+        if recorded == count or (recorded is None and count == 0):
+            continue
+        drift.append({"user_id": user_id, "recorded": recorded, "expected": count})
+        if not apply:
+            continue
+        if counter is None:
+            db.add(NotificationCounter(user_id=user_id, unread_count=count))
+        else:
+            counter.unread_count = count
+
+    if apply:
+        db.commit()
+    return drift
@@ -0,0 +1,41 @@
+"""
+Retention for read notifications.
+
+Notifications are never deleted by users, so the table grows with every
+alert. This sweeper deletes read notifications older than
+NOTIFICATION_RETENTION_DAYS in batches, committing after each one so no
+transaction holds many row locks. Unread notifications are always kept.
+main.py runs it periodically and `python manage.py purge-notifications`
+runs it on demand.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.background import purge_in_batches, run_in_own_session, utc_now_naive
+from app.core.config import settings
+from app.models.notification import Notification
+
+
+def purge_read_notifications(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    max_age: Optional[timedelta] = None,
+) -> int:
+    """Delete read notifications created before `now - max_age`; return the count."""
+    now = now or utc_now_naive()
+    batch_size = batch_size or settings.notification_retention_batch_size
+    if max_age is None:
+        max_age = timedelta(days=settings.notification_retention_days)
+    return purge_in_batches(
+        db,
+        Notification,
+        Notification.is_read.is_(True) & (Notification.created_at < now - max_age),
+        batch_size,
+    )
+
+
+def sweep_read_notifications() -> int:
+    return run_in_own_session(purge_read_notifications)
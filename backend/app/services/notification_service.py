@@ -1,10 +1,22 @@
 """
 Notification and inventory timeline helper functions.
+
+Notifications are not written on the request path: the `notify_*` helpers
+add a "notification" message to the outbox in the caller's transaction and
+an outbox worker inserts the rows (see outbox_service).
+
+Store alerts go to the store's active admins and its merchant. Those
+recipient ids are cached per store (`recipients:<store_id>`) for
+NOTIFICATION_RECIPIENT_CACHE_TTL_SECONDS; routes that add, remove or
+(de)activate admins or merchants call `invalidate_notification_recipients`
+after commit. Each fan-out is one multi-row INSERT.
 """
 from typing import Iterable, Optional
 
+from sqlalchemy import and_, insert, or_, select
 from sqlalchemy.orm import Session
 
+from app.core.cache import CacheBackend, build_cache
 from app.core.config import settings
 from app.models.inventory import Inventory
 from app.models.inventory_event import InventoryEvent
@@ -12,6 +24,9 @@ from app.models.notification import Notification
 from app.models.store import Store
 from app.models.stock_threshold import StockThreshold
 from app.models.user import User
+from app.services.notification_counter_service import increment_unread
+from app.services.notification_stream_service import stage_notifications
+from app.services.outbox_service import enqueue, outbox_handler
 
 
 def create_inventory_event(
@@ -54,6 +69,7 @@ def create_notification(
     store_id: Optional[int] = None,
     product_id: Optional[int] = None,
 ) -> Notification:
+    """Add one notification to the caller's transaction (direct messages, not alerts)."""
     notification = Notification(
         user_id=user_id,
         store_id=store_id,
@@ -62,44 +78,129 @@ def create_notification(
         title=title,
         message=message,
     )
+    increment_unread(db, {user_id: 1})
     db.add(notification)
+    db.flush()
+    stage_notifications(db, [notification])
     return notification
 
 
-def _get_store_admins_and_superusers(db: Session, store_id: int) -> list[User]:
-    store = db.query(Store).filter(Store.id == store_id).first()
-    merchant_id = store.merchant_id if store else None
-    return (
-        db.query(User)
-        .filter(
-            User.is_active.is_(True),
-            ((User.role == "admin") & (User.store_id == store_id))
-            | ((User.role == "superuser") & (User.id == merchant_id)),
+_recipient_cache: Optional[CacheBackend] = None
+
+
+def get_recipient_cache() -> CacheBackend:
+    global _recipient_cache
+    if _recipient_cache is None:
+        _recipient_cache = build_cache(
+            "notification_recipients",
+            max_entries=settings.notification_recipient_cache_max_entries,
+            default_ttl=settings.notification_recipient_cache_ttl_seconds,
+        )
+    return _recipient_cache
+
+
+def _get_store_admins_and_superusers(db: Session, store_id: int) -> list[int]:
+    """Return the ids of the store's active admins and its merchant."""
+    cache = get_recipient_cache()
+    key = f"recipients:{store_id}"
+    user_ids = cache.get(key)
+    if user_ids is None:
+        user_ids = list(
+            db.scalars(
+                select(User.id)
+                .join(
+                    Store,
+                    or_(
+                        and_(User.role == "admin", User.store_id == Store.id),
+                        and_(User.role == "superuser", User.id == Store.merchant_id),
+                    ),
+                )
+                .where(Store.id == store_id, User.is_active.is_(True))
+                .order_by(User.id)
+            )
         )
-        .all()
+        cache.set(key, user_ids)
+    return user_ids
+
+
+def invalidate_notification_recipients(*store_ids: Optional[int]) -> None:
+    """
+    Forget cached recipients for these stores.
+
+    With no store ids (e.g. for a merchant, who has no `store_id`), every
+    store's entry is dropped.
+    """
+    keys = [f"recipients:{store_id}" for store_id in store_ids if store_id is not None]
+    if keys:
+        get_recipient_cache().delete(*keys)
+    else:
+        get_recipient_cache().delete_prefix("recipients:")
+
+
+def clear_recipient_cache() -> None:
+    get_recipient_cache().clear()
+
+
+def _insert_notifications(db: Session, user_ids: Iterable[int], alerts: list[dict]) -> None:
+    rows = [{"user_id": user_id, **alert} for user_id in user_ids for alert in alerts]
+    if rows:
+        increment_unread(db, {user_id: len(alerts) for user_id in user_ids})
+        notifications = db.scalars(insert(Notification).values(rows).returning(Notification)).all()
+        stage_notifications(db, notifications)
+
+
+def _queue_notifications(
+    db: Session,
+    alerts: list[dict],
+    *,
+    store_id: Optional[int] = None,
+    user_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """Queue `alerts` for `user_ids`, or for the store's admins and merchant when no ids are given."""
+    enqueue(
+        db,
+        "notification",
+        {
+            "store_id": store_id,
+            "user_ids": list(user_ids) if user_ids is not None else None,
+            "alerts": alerts,
+        },
     )
 
 
+@outbox_handler("notification")
+def deliver_notifications(db: Session, payload: dict) -> None:
+    user_ids = payload["user_ids"]
+    if user_ids is None:
+        user_ids = _get_store_admins_and_superusers(db, payload["store_id"])
+    _insert_notifications(db, user_ids, payload["alerts"])
+
+
 def notify_users(
     db: Session,
     *,
-    users: Iterable[User],
+    user_ids: Optional[Iterable[int]],
     category: str,
     title: str,
     message: str,
     store_id: Optional[int] = None,
     product_id: Optional[int] = None,
 ) -> None:
-    for user in users:
-        create_notification(
-            db,
-            user_id=user.id,
-            category=category,
-            title=title,
-            message=message,
-            store_id=store_id,
-            product_id=product_id,
-        )
+    """Queue one notification for `user_ids` (None: the store's admins and merchant)."""
+    _queue_notifications(
+        db,
+        [
+            {
+                "store_id": store_id,
+                "product_id": product_id,
+                "category": category,
+                "title": title,
+                "message": message,
+            }
+        ],
+        store_id=store_id,
+        user_ids=user_ids,
+    )
 
 
 def notify_supply_request_pending(
@@ -110,10 +211,9 @@ def notify_supply_request_pending(
     quantity_requested: int,
     requested_by_name: str,
 ) -> None:
-    users = _get_store_admins_and_superusers(db, store_id)
     notify_users(
         db,
-        users=users,
+        user_ids=None,
         category="pending_supply_request",
         title="Supply request pending approval",
         message=f"{requested_by_name} requested {quantity_requested} units.",
@@ -134,9 +234,9 @@ def notify_supply_request_status(
     message = f"Your supply request was {status}."
     if admin_notes:
         message = f"{message} Notes: {admin_notes}"
-    create_notification(
+    notify_users(
         db,
-        user_id=requester_id,
+        user_ids=[requester_id],
         category="supply_request_status",
         title=f"Supply request {status}",
         message=message,
@@ -145,6 +245,16 @@ def notify_supply_request_status(
     )
 
 
+def _unpaid_alert(*, store_id: int, product_id: int, quantity_in_stock: int) -> dict:
+    return {
+        "store_id": store_id,
+        "product_id": product_id,
+        "category": "unpaid_inventory",
+        "title": "Inventory marked unpaid",
+        "message": f"An inventory record with {quantity_in_stock} units is unpaid.",
+    }
+
+
 def notify_unpaid_inventory(
     db: Session,
     *,
@@ -152,15 +262,10 @@ def notify_unpaid_inventory(
     product_id: int,
     quantity_in_stock: int,
 ) -> None:
-    users = _get_store_admins_and_superusers(db, store_id)
-    notify_users(
+    _queue_notifications(
         db,
-        users=users,
-        category="unpaid_inventory",
-        title="Inventory marked unpaid",
-        message=f"An inventory record with {quantity_in_stock} units is unpaid.",
+        [_unpaid_alert(store_id=store_id, product_id=product_id, quantity_in_stock=quantity_in_stock)],
         store_id=store_id,
-        product_id=product_id,
     )
 
 
@@ -184,22 +289,47 @@ def _get_threshold(db: Session, product_id: int, store_id: int) -> int:
     return settings.low_stock_default_threshold
 
 
+def _low_stock_alert(db: Session, inventory: Inventory) -> Optional[dict]:
+    threshold = _get_threshold(db, inventory.product_id, inventory.store_id)
+    if inventory.quantity_in_stock > threshold:
+        return None
+    return {
+        "store_id": inventory.store_id,
+        "product_id": inventory.product_id,
+        "category": "low_stock",
+        "title": "Low stock alert",
+        "message": f"Product #{inventory.product_id} is at {inventory.quantity_in_stock} units (threshold {threshold}).",
+    }
+
+
 def notify_low_stock_if_needed(
     db: Session,
     *,
     inventory: Inventory,
 ) -> None:
-    threshold = _get_threshold(db, inventory.product_id, inventory.store_id)
-    if inventory.quantity_in_stock > threshold:
-        return
+    alert = _low_stock_alert(db, inventory)
+    if alert is not None:
+        _queue_notifications(db, [alert], store_id=inventory.store_id)
 
-    users = _get_store_admins_and_superusers(db, inventory.store_id)
-    notify_users(
-        db,
-        users=users,
-        category="low_stock",
-        title="Low stock alert",
-        message=f"Product #{inventory.product_id} is at {inventory.quantity_in_stock} units (threshold {threshold}).",
-        store_id=inventory.store_id,
-        product_id=inventory.product_id,
-    )
+
+def notify_inventory_alerts(
+    db: Session,
+    *,
+    inventory: Inventory,
+    unpaid: bool,
+) -> None:
+    """Queue the unpaid (when `unpaid`) and low-stock alerts for `inventory` as one message."""
+    alerts = []
+    if unpaid:
+        alerts.append(
+            _unpaid_alert(
+                store_id=inventory.store_id,
+                product_id=inventory.product_id,
+                quantity_in_stock=inventory.quantity_in_stock,
+            )
+        )
+    low_stock = _low_stock_alert(db, inventory)
+    if low_stock is not None:
+        alerts.append(low_stock)
+    if alerts:
+        _queue_notifications(db, alerts, store_id=inventory.store_id)
@@ -0,0 +1,148 @@
+"""
+Live notification feed behind `GET /api/notifications/stream` (Server-Sent Events).
+
+Code that creates notifications or changes read state calls
+`stage_notifications` / `stage_unread_count` before committing; the events
+are published on the notification hub only after the session commits (and
+dropped on rollback). Each connected user gets:
+
+- `notification` events whose SSE `id` is the notification id, so a client
+  reconnecting with `Last-Event-ID` is replayed what it missed from the
+  database (up to NOTIFICATION_STREAM_REPLAY_LIMIT rows)
+- `unread_count` events on connect and whenever the count changes
+- a comment line every NOTIFICATION_STREAM_HEARTBEAT_SECONDS so proxies keep
+  idle connections open
+"""
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pubsub import LocalHub, build_hub
+from app.models.notification import Notification
+from app.schemas.notifications import NotificationResponse
+from app.services.notification_counter_service import get_unread_counts
+
+_STAGED_KEY = "notification_stream_events"
+
+_hub: Optional[LocalHub] = None
+
+
+def get_notification_hub() -> LocalHub:
+    global _hub
+    if _hub is None:
+        _hub = build_hub("notifications", max_queued=settings.notification_stream_queue_size)
+    return _hub
+
+
+def close_notification_hub() -> None:
+    global _hub
+    if _hub is not None:
+        _hub.close()
+        _hub = None
+
+
+def _notification_event(notification) -> dict:
+    payload = NotificationResponse.model_validate(notification).model_dump(mode="json")
+    return {"id": notification.id, "event": "notification", "data": payload}
+
+
+def _unread_count_event(count: int) -> dict:
+    return {"id": None, "event": "unread_count", "data": {"unread_count": count}}
+
+
+def _stage(db: Session, user_id: int, stream_event: dict) -> None:
+    db.info.setdefault(_STAGED_KEY, []).append((user_id, stream_event))
+
+
+def stage_notifications(db: Session, notifications: list) -> None:
+    """Publish these flushed notifications, and their users' new unread counts, after commit."""
+    for notification in notifications:
+        _stage(db, notification.user_id, _notification_event(notification))
+    for user_id, count in get_unread_counts(db, (n.user_id for n in notifications)).items():
+        _stage(db, user_id, _unread_count_event(count))
+
+
+def stage_unread_count(db: Session, user_id: int, count: int) -> None:
+    """Publish `user_id`'s unread count after commit."""
+    _stage(db, user_id, _unread_count_event(count))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session: Session) -> None:
+    staged = session.info.pop(_STAGED_KEY, None)
+    if staged:
+        hub = get_notification_hub()
+        for user_id, stream_event in staged:
+            hub.publish(str(user_id), stream_event)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged(session: Session) -> None:
+    session.info.pop(_STAGED_KEY, None)
+
+
+def format_sse(stream_event: dict) -> str:
+    lines = []
+    if stream_event.get("id") is not None:
+        lines.append(f"id: {stream_event['id']}")
+    lines.append(f"event: {stream_event['event']}")
+    lines.append(f"data: {json.dumps(stream_event['data'])}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _load_backlog(user_id: int, last_event_id: Optional[int]) -> tuple[list[dict], int]:
+    """Notifications after `last_event_id` (oldest first) and the current unread count."""
+    db = SessionLocal()
+    try:
+        missed = []
+        if last_event_id is not None:
+            rows = db.scalars(
+                select(Notification)
+                .where(Notification.user_id == user_id, Notification.id > last_event_id)
+                .order_by(Notification.id)
+                .limit(settings.notification_stream_replay_limit)
+            )
+            missed = [_notification_event(row) for row in rows]
+        return missed, get_unread_counts(db, [user_id])[user_id]
+    finally:
+        db.close()
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+async def notification_events(user_id: int, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """Yield the SSE stream for `user_id` until the client disconnects or falls too far behind."""
+    hub = get_notification_hub()
+    # Subscribe before reading the backlog so nothing published in between is lost.
+    subscription = hub.subscribe(str(user_id))
+    try:
+        yield f"retry: {settings.notification_stream_retry_ms}\n\n"
+        missed, count = await run_in_threadpool(_load_backlog, user_id, last_event_id)
+        newest_sent = last_event_id or 0
+        for stream_event in missed:
+            newest_sent = stream_event["id"]
+            yield format_sse(stream_event)
+        yield format_sse(_unread_count_event(count))
+
+        while not subscription.overflowed:
+            stream_event = await subscription.get(timeout=settings.notification_stream_heartbeat_seconds)
+            if stream_event is None:
+                yield ": keep-alive\n\n"
+                continue
+            if stream_event["id"] is not None:
+                if stream_event["id"] <= newest_sent:
+                    continue  # already replayed from the database
+                newest_sent = stream_event["id"]
+            yield format_sse(stream_event)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,132 @@
+"""
+Transactional outbox for side effects of writes (notifications, emails).
+
+Handlers call `enqueue` inside their own transaction, so a message exists
+exactly when the write it describes was committed. Background workers
+(`drain_outbox_until_idle` in main.py) deliver due messages in batches:
+
+- each message runs in a savepoint; a failure rolls back only that message
+  and reschedules it with exponential backoff
+- after OUTBOX_MAX_ATTEMPTS failures a message is dead-lettered (status
+  `dead`) and kept for inspection; `python manage.py requeue-outbox` retries
+  dead messages
+- delivered messages are deleted
+
+Database effects (notifications) commit together with the message's
+deletion, so they happen once. Emails are sent before that commit and are
+delivered at least once.
+
+Delivery code registers per message kind with `@outbox_handler("<kind>")`.
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.background import run_in_own_session, utc_now_naive
+from app.core.config import settings
+from app.models.outbox_message import OutboxMessage, OutboxStatus
+
+logger = logging.getLogger("myduka.outbox")
+
+OutboxHandler = Callable[[Session, dict], None]
+_handlers: dict[str, OutboxHandler] = {}
+
+
+def outbox_handler(kind: str) -> Callable[[OutboxHandler], OutboxHandler]:
+    """Register the delivery function for messages of `kind`."""
+
+    def register(func: OutboxHandler) -> OutboxHandler:
+        _handlers[kind] = func
+        return func
+
+    return register
+
+
+def enqueue(db: Session, kind: str, payload: dict) -> OutboxMessage:
+    """Add a message to the caller's transaction; it is delivered after commit."""
+    message = OutboxMessage(kind=kind, payload=json.dumps(payload), available_at=utc_now_naive())
+    db.add(message)
+    return message
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next try after `attempts` failures."""
+    seconds = settings.outbox_backoff_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.outbox_backoff_max_seconds))
+
+
+def _deliver(db: Session, message: OutboxMessage) -> None:
+    handler = _handlers.get(message.kind)
+    if handler is None:
+        raise LookupError(f"No outbox handler for {message.kind!r}")
+    handler(db, json.loads(message.payload))
+
+
+def drain_outbox(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """Deliver one batch of due messages; return how many were processed (delivered or failed)."""
+    now = now or utc_now_naive()
+    batch_size = batch_size or settings.outbox_batch_size
+    messages = db.scalars(
+        select(OutboxMessage)
+        .where(OutboxMessage.status == OutboxStatus.PENDING.value, OutboxMessage.available_at <= now)
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        # Concurrent workers on PostgreSQL take disjoint batches; SQLite ignores this.
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    delivered = []
+    for message in messages:
+        try:
+            with db.begin_nested():
+                _deliver(db, message)
+        except Exception as exc:
+            message.attempts += 1
+            message.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+            if message.attempts >= settings.outbox_max_attempts:
+                message.status = OutboxStatus.DEAD.value
+                logger.error("Outbox message %s (%s) dead-lettered: %s", message.id, message.kind, exc)
+            else:
+                message.available_at = now + retry_delay(message.attempts)
+                logger.warning(
+                    "Outbox message %s (%s) failed attempt=%s: %s",
+                    message.id,
+                    message.kind,
+                    message.attempts,
+                    exc,
+                )
+        else:
+            delivered.append(message.id)
+    if delivered:
+        db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(delivered)))
+    db.commit()
+    return len(messages)
+
+
+def _drain_until_idle(db: Session) -> int:
+    total = 0
+    while True:
+        processed = drain_outbox(db)
+        total += processed
+        if processed < settings.outbox_batch_size:
+            return total
+
+
+def drain_outbox_until_idle() -> int:
+    """Drain batches until nothing is due (for background tasks)."""
+    return run_in_own_session(_drain_until_idle)
+
+
+def requeue_dead_messages(db: Session) -> int:
+    """Give dead-lettered messages a fresh set of attempts; return the count."""
+    result = db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.status == OutboxStatus.DEAD.value)
+        .values(status=OutboxStatus.PENDING.value, attempts=0, available_at=utc_now_naive())
+    )
+    db.commit()
+    return result.rowcount
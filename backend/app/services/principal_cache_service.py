@@ -0,0 +1,120 @@
+"""
+Short-lived cache of authenticated user principals.
+
+`get_current_user` resolves a bearer token to a `UserPrincipal` snapshot
+(the user's profile, role, store and merchant scope) and keeps it under
+`principal:<user_id>:<token digest>` for PRINCIPAL_CACHE_TTL_SECONDS, so
+authenticated requests skip the users query. Routes that change a user's
+role, status, profile or password call `invalidate_principal` after commit.
+"""
+import hashlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, build_cache
+from app.core.config import settings
+from app.models.store import Store
+from app.models.user import User
+
+_cache: Optional[CacheBackend] = None
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Read-only snapshot of the authenticated user, exposing the `User` columns routes read."""
+
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    phone: Optional[str]
+    role: str
+    is_active: bool
+    store_id: Optional[int]
+    merchant_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User, merchant_id: Optional[int]) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            phone=user.phone,
+            role=user.role,
+            is_active=user.is_active,
+            store_id=user.store_id,
+            merchant_id=merchant_id,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def to_payload(self) -> dict:
+        payload = asdict(self)
+        payload["created_at"] = self.created_at.isoformat()
+        payload["updated_at"] = self.updated_at.isoformat()
+        return payload
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "UserPrincipal":
+        return cls(
+            **{
+                **payload,
+                "created_at": datetime.fromisoformat(payload["created_at"]),
+                "updated_at": datetime.fromisoformat(payload["updated_at"]),
+            }
+        )
+
+
+def get_principal_cache() -> CacheBackend:
+    global _cache
+    if _cache is None:
+        _cache = build_cache(
+            "principal",
+            max_entries=settings.principal_cache_max_entries,
+            default_ttl=settings.principal_cache_ttl_seconds,
+        )
+    return _cache
+
+
+def _principal_key(user_id, token: str) -> str:
+    digest = hashlib.sha256(token.encode()).hexdigest()[:32]
+    return f"principal:{user_id}:{digest}"
+
+
+def load_principal(db: Session, user_id) -> Optional[UserPrincipal]:
+    """Load the user and their merchant scope in one query."""
+    row = (
+        db.query(User, Store.merchant_id)
+        .outerjoin(Store, Store.id == User.store_id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    user, store_merchant_id = row
+    merchant_id = user.id if user.role == "superuser" else store_merchant_id
+    return UserPrincipal.from_user(user, merchant_id)
+
+
+def get_cached_principal(user_id, token: str) -> Optional[UserPrincipal]:
+    payload = get_principal_cache().get(_principal_key(user_id, token))
+    return None if payload is None else UserPrincipal.from_payload(payload)
+
+
+def cache_principal(token: str, principal: UserPrincipal) -> None:
+    get_principal_cache().set(_principal_key(principal.id, token), principal.to_payload())
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop every cached principal for `user_id`, whichever token it was cached under."""
+    get_principal_cache().delete_prefix(f"principal:{user_id}:")
+
+
+def clear_principal_cache() -> None:
+    get_principal_cache().clear()
@@ -0,0 +1,191 @@
+"""
+Helpers for maintaining the daily sales rollup used by analytics.
+"""
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.sale import Sale
+from app.models.sales_daily_rollup import SalesDailyRollup
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+def _load_rollup_row(db: Session, store_id: int, product_id: int, day: date) -> SalesDailyRollup:
+    row = (
+        db.query(SalesDailyRollup)
+        .filter(
+            SalesDailyRollup.store_id == store_id,
+            SalesDailyRollup.product_id == product_id,
+            SalesDailyRollup.day == day,
+        )
+        .first()
+    )
+    if row is not None:
+        return row
+
+    row = SalesDailyRollup(
+        store_id=store_id,
+        product_id=product_id,
+        day=day,
+        quantity=0,
+        total_sales=0.0,
+        total_cost=0.0,
+        orders=0,
+    )
+    try:
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        # A concurrent sale created the bucket first; add to that one instead.
+        row = (
+            db.query(SalesDailyRollup)
+            .filter(
+                SalesDailyRollup.store_id == store_id,
+                SalesDailyRollup.product_id == product_id,
+                SalesDailyRollup.day == day,
+            )
+            .one()
+        )
+    return row
+
+
+def _add_to_buckets(db: Session, increments: dict[SalesDailyRollup, tuple]) -> None:
+    """
+    Add (quantity, total_sales, total_cost, orders) to each bucket in one UPDATE.
+
+    The sums are computed in SQL, so concurrent sales into the same bucket
+    never overwrite each other.
+    """
+    ids = {row.id: totals for row, totals in increments.items()}
+
+    def added(index: int):
+        return case({row_id: totals[index] for row_id, totals in ids.items()}, value=SalesDailyRollup.id, else_=0)
+
+    db.execute(
+        update(SalesDailyRollup)
+        .where(SalesDailyRollup.id.in_(ids))
+        .values(
+            quantity=SalesDailyRollup.quantity + added(0),
+            total_sales=SalesDailyRollup.total_sales + added(1),
+            total_cost=SalesDailyRollup.total_cost + added(2),
+            orders=SalesDailyRollup.orders + added(3),
+            updated_at=utc_now(),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    for row in increments:
+        db.expire(row, ["quantity", "total_sales", "total_cost", "orders", "updated_at"])
+
+
+def record_sale_in_rollup(db: Session, sale: Sale) -> SalesDailyRollup:
+    """Add a sale to its store/product/day bucket in the caller's transaction."""
+    sold_at = sale.created_at or utc_now()
+    row = _load_rollup_row(db, sale.store_id, sale.product_id, sold_at.date())
+    _add_to_buckets(db, {row: (sale.quantity, sale.total_price, sale.total_cost, 1)})
+    return row
+
+
+def record_sales_in_rollup(db: Session, sales: list[Sale]) -> None:
+    """Add many sales to their buckets, loading and creating buckets in bulk."""
+    totals: dict[tuple[int, int, date], list] = {}
+    for sale in sales:
+        key = (sale.store_id, sale.product_id, (sale.created_at or utc_now()).date())
+        bucket = totals.setdefault(key, [0, 0.0, 0.0, 0])
+        bucket[0] += sale.quantity
+        bucket[1] += sale.total_price
+        bucket[2] += sale.total_cost
+        bucket[3] += 1
+    if not totals:
+        return
+
+    store_ids, product_ids, days = (set(values) for values in zip(*totals))
+    rows = {
+        (row.store_id, row.product_id, row.day): row
+        for row in db.query(SalesDailyRollup).filter(
+            SalesDailyRollup.store_id.in_(store_ids),
+            SalesDailyRollup.product_id.in_(product_ids),
+            SalesDailyRollup.day.in_(days),
+        )
+    }
+    missing = totals.keys() - rows.keys()
+    if missing:
+        try:
+            # One executemany INSERT, then one SELECT; ORM flushes would insert row by row.
+            with db.begin_nested():
+                db.execute(
+                    insert(SalesDailyRollup),
+                    [
+                        {
+                            "store_id": store_id,
+                            "product_id": product_id,
+                            "day": day,
+                            "quantity": 0,
+                            "total_sales": 0.0,
+                            "total_cost": 0.0,
+                            "orders": 0,
+                        }
+                        for store_id, product_id, day in missing
+                    ],
+                )
+            missing_store_ids, missing_product_ids, missing_days = (set(values) for values in zip(*missing))
+            for row in db.query(SalesDailyRollup).filter(
+                SalesDailyRollup.store_id.in_(missing_store_ids),
+                SalesDailyRollup.product_id.in_(missing_product_ids),
+                SalesDailyRollup.day.in_(missing_days),
+            ):
+                rows.setdefault((row.store_id, row.product_id, row.day), row)
+        except IntegrityError:
+            # A concurrent sale created some of these buckets; load them one at a time.
+            for key in missing:
+                rows[key] = _load_rollup_row(db, *key)
+
+    _add_to_buckets(db, {rows[key]: tuple(bucket) for key, bucket in totals.items()})
+
+
+def rebuild_sales_rollup(db: Session, since: Optional[date] = None) -> int:
+    """
+    Recompute rollup rows from `sales`, optionally only from `since` onwards.
+
+    Used both to backfill an empty table and to repair drift. Returns the
+    number of rollup rows written.
+    """
+    day_col = func.date(Sale.created_at)
+    delete_query = db.query(SalesDailyRollup)
+    source = select(
+        Sale.store_id,
+        Sale.product_id,
+        day_col,
+        func.sum(Sale.quantity),
+        func.sum(Sale.total_price),
+        func.sum(Sale.total_cost),
+        func.count(Sale.id),
+        func.current_timestamp(),
+    ).group_by(Sale.store_id, Sale.product_id, day_col)
+    if since is not None:
+        delete_query = delete_query.filter(SalesDailyRollup.day >= since)
+        source = source.where(Sale.created_at >= datetime.combine(since, datetime.min.time()))
+
+    delete_query.delete(synchronize_session=False)
+    result = db.execute(
+        insert(SalesDailyRollup).from_select(
+            [
+                SalesDailyRollup.store_id,
+                SalesDailyRollup.product_id,
+                SalesDailyRollup.day,
+                SalesDailyRollup.quantity,
+                SalesDailyRollup.total_sales,
+                SalesDailyRollup.total_cost,
+                SalesDailyRollup.orders,
+                SalesDailyRollup.updated_at,
+            ],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,166 @@
+"""
+Point-in-time stock replayed from the inventory_events log.
+
+Every event records an inventory row's quantity before and after a change,
+so its delta is `new - old` (a missing side counts as 0: the row was
+created or deleted). Folding deltas in time order gives the stock of a
+product in a store at any moment.
+
+`build_stock_checkpoints` folds new events into `StockCheckpoint` rows, one
+per store, product and (UTC) day on which the stock changed; main.py runs it
+periodically. `stock_at` starts from the newest checkpoint before the
+requested time and replays only the events after it.
+`archive_inventory_events` builds checkpoints up to its cutoff before it
+removes any events, so stock stays answerable after archival.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.background import run_in_own_session
+from app.models.inventory_event import InventoryEvent
+from app.models.stock_checkpoint import StockCheckpoint
+from app.models.store import Store
+
+REPLAY_CHUNK_SIZE = 1000
+
+_delta = func.coalesce(InventoryEvent.new_quantity_in_stock, 0) - func.coalesce(
+    InventoryEvent.old_quantity_in_stock, 0
+)
+
+
+@dataclass(frozen=True)
+class StockSnapshot:
+    """Replayed stock of one product in one store."""
+
+    store_id: int
+    product_id: int
+    at: datetime
+    quantity_in_stock: int
+    checkpoint_day: Optional[date]
+    events_replayed: int
+
+
+def _utc_naive(value: datetime) -> datetime:
+    # Event timestamps are stored as naive UTC.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def stock_at(db: Session, store_id: int, product_id: int, at: datetime) -> StockSnapshot:
+    """Stock of `product_id` in `store_id` after every event up to and including `at`."""
+    at = _utc_naive(at)
+    # A checkpoint for day D covers events before midnight after D, so only days before `at`'s qualify.
+    checkpoint = db.execute(
+        select(StockCheckpoint.day, StockCheckpoint.quantity)
+        .where(
+            StockCheckpoint.store_id == store_id,
+            StockCheckpoint.product_id == product_id,
+            StockCheckpoint.day < at.date(),
+        )
+        .order_by(StockCheckpoint.day.desc())
+        .limit(1)
+    ).first()
+
+    replay = select(func.coalesce(func.sum(_delta), 0), func.count(InventoryEvent.id)).where(
+        InventoryEvent.store_id == store_id,
+        InventoryEvent.product_id == product_id,
+        InventoryEvent.created_at <= at,
+    )
+    checkpoint_day, quantity = None, 0
+    if checkpoint is not None:
+        checkpoint_day, quantity = checkpoint
+        replay = replay.where(InventoryEvent.created_at >= _day_start(checkpoint_day + timedelta(days=1)))
+    delta, replayed = db.execute(replay).one()
+    return StockSnapshot(store_id, product_id, at, quantity + int(delta), checkpoint_day, replayed)
+
+
+def _closing_stock(db: Session, store_id: int) -> dict[int, int]:
+    """Each product's quantity in its newest checkpoint for `store_id`."""
+    latest = (
+        select(StockCheckpoint.product_id, func.max(StockCheckpoint.day).label("day"))
+        .where(StockCheckpoint.store_id == store_id)
+        .group_by(StockCheckpoint.product_id)
+        .subquery()
+    )
+    return dict(
+        db.execute(
+            select(StockCheckpoint.product_id, StockCheckpoint.quantity).join(
+                latest,
+                and_(
+                    StockCheckpoint.store_id == store_id,
+                    StockCheckpoint.product_id == latest.c.product_id,
+                    StockCheckpoint.day == latest.c.day,
+                ),
+            )
+        ).all()
+    )
+
+
+def _checkpoint_store(db: Session, store_id: int, until: date) -> int:
+    watermark = db.scalar(select(func.max(StockCheckpoint.day)).where(StockCheckpoint.store_id == store_id))
+    stock = _closing_stock(db, store_id)
+    events = (
+        select(InventoryEvent.product_id, InventoryEvent.created_at, _delta)
+        .where(InventoryEvent.store_id == store_id, InventoryEvent.created_at < _day_start(until))
+        .order_by(InventoryEvent.created_at, InventoryEvent.id)
+    )
+    if watermark is not None:
+        events = events.where(InventoryEvent.created_at >= _day_start(watermark + timedelta(days=1)))
+
+    rows = []
+    changed: set[int] = set()
+    current_day = None
+
+    def close_day():
+        rows.extend(
+            {"store_id": store_id, "product_id": product_id, "day": current_day, "quantity": stock[product_id]}
+            for product_id in sorted(changed)
+        )
+        changed.clear()
+
+    result = db.execute(events.execution_options(stream_results=True, yield_per=REPLAY_CHUNK_SIZE))
+    for partition in result.partitions():
+        for product_id, created_at, delta in partition:
+            if created_at.date() != current_day:
+                close_day()
+                current_day = created_at.date()
+            stock[product_id] = stock.get(product_id, 0) + delta
+            changed.add(product_id)
+    close_day()
+
+    if not rows:
+        return 0
+    try:
+        db.execute(insert(StockCheckpoint), rows)
+        db.commit()
+    except IntegrityError:
+        # Another worker checkpointed this store at the same time; keep its rows.
+        db.rollback()
+        return 0
+    return len(rows)
+
+
+def build_stock_checkpoints(db: Session, until: Optional[date] = None) -> int:
+    """
+    Checkpoint every store's complete days before `until` (default: today, UTC).
+
+    Each store resumes after its newest checkpoint, so only new events are
+    replayed. Returns the number of checkpoints written.
+    """
+    until = until or datetime.now(timezone.utc).date()
+    store_ids = db.scalars(select(Store.id).order_by(Store.id)).all()
+    return sum(_checkpoint_store(db, store_id, until) for store_id in store_ids)
+
+
+def checkpoint_stock() -> int:
+    return run_in_own_session(build_stock_checkpoints)
@@ -1,19 +1,164 @@
 """
 Helpers for adjusting inventory with timeline events.
+
+The `stock_balances` row for a store/product pair is the concurrency gate:
+balances change only through single UPDATE statements (decrements carry a
+`quantity >= :take` guard), which take the row lock on PostgreSQL and the
+database write lock on SQLite. Inventory rows are then read `FOR UPDATE`
+(ignored by SQLite, which already holds its write lock), so two concurrent
+sales of the same product can never both draw the same stock.
 """
 from datetime import datetime, timezone
 
 from fastapi import HTTPException, status
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.inventory import Inventory
 from app.models.inventory_event import InventoryEvent
+from app.models.stock_balance import StockBalance
+
+# Lines per multi-row INSERT; keeps bound parameters well under SQLite's limit.
+BULK_INSERT_CHUNK_SIZE = 500
 
 
 def utc_now():
     return datetime.now(timezone.utc)
 
 
+def _load_balance(db: Session, store_id: int, product_id: int) -> StockBalance:
+    balance = (
+        db.query(StockBalance)
+        .filter(StockBalance.store_id == store_id, StockBalance.product_id == product_id)
+        .first()
+    )
+    if balance is None:
+        # First movement for this pair (or data that predates the table): seed
+        # the balance from the inventory rows already in the database.
+        on_hand = (
+            db.query(func.coalesce(func.sum(Inventory.quantity_in_stock), 0))
+            .filter(Inventory.store_id == store_id, Inventory.product_id == product_id)
+            .scalar()
+        )
+        balance = StockBalance(store_id=store_id, product_id=product_id, quantity=int(on_hand))
+        try:
+            with db.begin_nested():
+                db.add(balance)
+        except IntegrityError:
+            # A concurrent request seeded the same pair first; use its row.
+            balance = (
+                db.query(StockBalance)
+                .filter(StockBalance.store_id == store_id, StockBalance.product_id == product_id)
+                .one()
+            )
+    return balance
+
+
+def load_stock_balances(db: Session, store_id: int, product_ids) -> dict[int, StockBalance]:
+    """Return balances for several products in one store, seeding missing ones together."""
+    product_ids = set(product_ids)
+    balances = {
+        balance.product_id: balance
+        for balance in db.query(StockBalance)
+        .filter(StockBalance.store_id == store_id, StockBalance.product_id.in_(product_ids))
+        .all()
+    }
+    missing = product_ids - balances.keys()
+    if not missing:
+        return balances
+
+    on_hand = dict(
+        db.query(Inventory.product_id, func.sum(Inventory.quantity_in_stock))
+        .filter(Inventory.store_id == store_id, Inventory.product_id.in_(missing))
+        .group_by(Inventory.product_id)
+        .all()
+    )
+    try:
+        # One executemany INSERT, then one SELECT; ORM flushes would insert row by row.
+        with db.begin_nested():
+            db.execute(
+                insert(StockBalance),
+                [
+                    {"store_id": store_id, "product_id": product_id, "quantity": int(on_hand.get(product_id) or 0)}
+                    for product_id in missing
+                ],
+            )
+        balances.update(
+            (balance.product_id, balance)
+            for balance in db.query(StockBalance).filter(
+                StockBalance.store_id == store_id, StockBalance.product_id.in_(missing)
+            )
+        )
+    except IntegrityError:
+        # A concurrent request seeded some of these pairs; fall back to one at a time.
+        for product_id in missing:
+            balances[product_id] = _load_balance(db, store_id, product_id)
+    return balances
+
+
+def get_stock_balance(db: Session, store_id: int, product_id: int) -> int:
+    """Return the on-hand quantity for a store/product pair."""
+    return _load_balance(db, store_id, product_id).quantity
+
+
+def adjust_stock_balance(db: Session, store_id: int, product_id: int, delta: int) -> StockBalance:
+    """
+    Apply a stock delta to the store/product balance.
+
+    Must be called before the matching `Inventory` change is flushed so a
+    lazily-seeded balance does not count the change twice.
+    """
+    balance = _load_balance(db, store_id, product_id)
+    if delta:
+        # Relative update in SQL so concurrent adjustments never overwrite each other.
+        db.execute(
+            update(StockBalance)
+            .where(StockBalance.id == balance.id)
+            .values(quantity=StockBalance.quantity + delta, updated_at=utc_now()),
+            execution_options={"synchronize_session": False},
+        )
+        db.expire(balance, ["quantity", "updated_at"])
+    return balance
+
+
+def _take_balances(db: Session, store_id: int, quantities: dict[int, int]) -> bool:
+    """
+    Decrement balances for `quantities` (product id -> quantity) in one guarded UPDATE.
+
+    Returns False, leaving the caller to roll back, unless every product had
+    enough stock at the moment its row was locked.
+    """
+    taken = case(quantities, value=StockBalance.product_id, else_=0)
+    result = db.execute(
+        update(StockBalance)
+        .where(
+            StockBalance.store_id == store_id,
+            StockBalance.product_id.in_(quantities),
+            StockBalance.quantity >= taken,
+        )
+        .values(quantity=StockBalance.quantity - taken, updated_at=utc_now()),
+        execution_options={"synchronize_session": False},
+    )
+    for balance in db.identity_map.values():
+        if isinstance(balance, StockBalance) and balance.store_id == store_id and balance.product_id in quantities:
+            db.expire(balance, ["quantity", "updated_at"])
+    return result.rowcount == len(quantities)
+
+
+def _locked_inventory_rows(db: Session, store_id: int, product_ids):
+    return (
+        db.query(Inventory)
+        .filter(
+            Inventory.store_id == store_id,
+            Inventory.product_id.in_(product_ids),
+            Inventory.quantity_in_stock > 0,
+        )
+        .order_by(Inventory.product_id, Inventory.updated_at.desc())
+        .with_for_update()
+    )
+
+
 def increase_stock(
     db: Session,
     store_id: int,
@@ -26,6 +171,7 @@ def increase_stock(
     details: str | None = None,
     payment_status: str = "unpaid",
 ) -> Inventory:
+    adjust_stock_balance(db, store_id, product_id, quantity)
     inventory = Inventory(
         product_id=product_id,
         store_id=store_id,
@@ -58,6 +204,89 @@ def increase_stock(
     return inventory
 
 
+def increase_stock_batch(
+    db: Session,
+    store_id: int,
+    lines: list[dict],
+    actor_id: int,
+    event_type: str,
+    details: str | None = None,
+    payment_status: str = "unpaid",
+) -> list[int]:
+    """
+    Receive several lines into one store with a fixed number of statements.
+
+    Each line is a dict with `product_id`, `quantity`, `buying_price` and
+    `selling_price` and becomes its own `Inventory` row, as with
+    `increase_stock`. Rows and their events go in as two executemany
+    INSERTs (per BULK_INSERT_CHUNK_SIZE lines) and balances move in one
+    UPDATE. Returns the new inventory ids.
+    """
+    if not lines:
+        return []
+    quantities: dict[int, int] = {}
+    for line in lines:
+        quantities[line["product_id"]] = quantities.get(line["product_id"], 0) + line["quantity"]
+    # Seed missing balances before the new rows exist so they are not counted twice.
+    load_stock_balances(db, store_id, quantities)
+    added = case(quantities, value=StockBalance.product_id, else_=0)
+    db.execute(
+        update(StockBalance)
+        .where(StockBalance.store_id == store_id, StockBalance.product_id.in_(quantities))
+        .values(quantity=StockBalance.quantity + added, updated_at=utc_now()),
+        execution_options={"synchronize_session": False},
+    )
+    for balance in db.identity_map.values():
+        if isinstance(balance, StockBalance) and balance.store_id == store_id and balance.product_id in quantities:
+            db.expire(balance, ["quantity", "updated_at"])
+
+    rows = [
+        {
+            "product_id": line["product_id"],
+            "store_id": store_id,
+            "created_by": actor_id,
+            "quantity_received": line["quantity"],
+            "quantity_in_stock": line["quantity"],
+            "quantity_spoilt": 0,
+            "payment_status": payment_status,
+            "buying_price": line["buying_price"],
+            "selling_price": line["selling_price"],
+            "remarks": details,
+        }
+        for line in lines
+    ]
+    created = []
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        # Multi-row VALUES with RETURNING: one statement per chunk. The event
+        # rows are built from what comes back, so no row order is assumed.
+        created.extend(
+            db.execute(
+                insert(Inventory)
+                .values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+                .returning(Inventory.id, Inventory.product_id, Inventory.quantity_in_stock)
+            ).all()
+        )
+    db.execute(
+        insert(InventoryEvent),
+        [
+            {
+                "inventory_id": inventory_id,
+                "product_id": product_id,
+                "store_id": store_id,
+                "actor_id": actor_id,
+                "event_type": event_type,
+                "old_quantity_in_stock": 0,
+                "new_quantity_in_stock": quantity,
+                "old_payment_status": None,
+                "new_payment_status": payment_status,
+                "details": details,
+            }
+            for inventory_id, product_id, quantity in created
+        ],
+    )
+    return [inventory_id for inventory_id, _, _ in created]
+
+
 def decrease_stock(
     db: Session,
     store_id: int,
@@ -66,44 +295,146 @@ def decrease_stock(
     actor_id: int,
     event_type: str,
     details: str | None = None,
-):
-    records = (
-        db.query(Inventory)
-        .filter(
-            Inventory.store_id == store_id,
-            Inventory.product_id == product_id,
-            Inventory.quantity_in_stock > 0,
-        )
-        .order_by(Inventory.updated_at.desc())
-        .all()
-    )
-    total_available = sum(record.quantity_in_stock for record in records)
-    if total_available < quantity:
+) -> list[Inventory]:
+    """Take `quantity` from the newest inventory rows; return the rows drawn from."""
+    _load_balance(db, store_id, product_id)
+    if not _take_balances(db, store_id, {product_id: quantity}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient stock for this operation",
         )
 
+    records = _locked_inventory_rows(db, store_id, [product_id]).all()
+    touched, events = _draw_stock(records, quantity, actor_id, event_type, details)
+    db.add_all(InventoryEvent(**event) for event in events)
+    return touched
+
+
+def _draw_stock(
+    records: list[Inventory],
+    quantity: int,
+    actor_id: int,
+    event_type: str,
+    details: str | None,
+) -> tuple[list[Inventory], list[dict]]:
+    """Take `quantity` from `records` in order; return the rows drawn from and their event rows."""
     remaining = quantity
+    touched = []
+    events = []
     for record in records:
         if remaining <= 0:
             break
+        touched.append(record)
         take = min(record.quantity_in_stock, remaining)
         old_qty = record.quantity_in_stock
         record.quantity_in_stock = old_qty - take
         record.updated_at = utc_now()
-        db.add(
-            InventoryEvent(
-                inventory_id=record.id,
-                product_id=record.product_id,
-                store_id=record.store_id,
-                actor_id=actor_id,
-                event_type=event_type,
-                old_quantity_in_stock=old_qty,
-                new_quantity_in_stock=record.quantity_in_stock,
-                old_payment_status=record.payment_status,
-                new_payment_status=record.payment_status,
-                details=details,
-            )
+        events.append(
+            {
+                "inventory_id": record.id,
+                "product_id": record.product_id,
+                "store_id": record.store_id,
+                "actor_id": actor_id,
+                "event_type": event_type,
+                "old_quantity_in_stock": old_qty,
+                "new_quantity_in_stock": record.quantity_in_stock,
+                "old_payment_status": record.payment_status,
+                "new_payment_status": record.payment_status,
+                "details": details,
+            }
         )
         remaining -= take
+
+    if remaining > 0:
+        # The balance has drifted from the inventory rows; refuse rather than oversell.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient stock for this operation",
+        )
+    return touched, events
+
+
+def decrease_stock_batch(
+    db: Session,
+    store_id: int,
+    quantities: dict[int, int],
+    actor_id: int,
+    event_type: str,
+    details: str | None = None,
+) -> list[Inventory]:
+    """
+    Take stock for several products in one store with a fixed number of queries.
+
+    `quantities` maps product id to the total quantity to take. Nothing is
+    changed unless every product has enough stock; otherwise a 400 lists the
+    short product ids. Returns the inventory rows drawn from.
+    """
+    balances = load_stock_balances(db, store_id, quantities)
+    short = sorted(product_id for product_id, quantity in quantities.items() if balances[product_id].quantity < quantity)
+    if short or not _take_balances(db, store_id, quantities):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            # A concurrent sale can win the race after the pre-check; report the whole basket then.
+            detail={"message": "Insufficient stock for this operation", "product_ids": short or sorted(quantities)},
+        )
+
+    records_by_product: dict[int, list[Inventory]] = {product_id: [] for product_id in quantities}
+    for record in _locked_inventory_rows(db, store_id, quantities):
+        records_by_product[record.product_id].append(record)
+
+    touched = []
+    events = []
+    for product_id, quantity in quantities.items():
+        drawn, product_events = _draw_stock(records_by_product[product_id], quantity, actor_id, event_type, details)
+        touched.extend(drawn)
+        events.extend(product_events)
+    if events:
+        db.execute(insert(InventoryEvent), events)
+    return touched
+
+
+def reconcile_stock_balances(db: Session, apply: bool = True) -> list[dict]:
+    """
+    Rebuild stock balances from `Inventory` and report any drift.
+
+    Returns one entry per store/product pair whose recorded balance differed
+    from the inventory total. With `apply=False` nothing is written.
+    """
+    expected = {
+        (row.store_id, row.product_id): int(row.quantity or 0)
+        for row in db.query(
+            Inventory.store_id,
+            Inventory.product_id,
+            func.sum(Inventory.quantity_in_stock).label("quantity"),
+        )
+        .group_by(Inventory.store_id, Inventory.product_id)
+        .all()
+    }
+    balances = {(row.store_id, row.product_id): row for row in db.query(StockBalance).all()}
+
+    drift = []
+    for store_id, product_id in sorted(expected.keys() | balances.keys()):
+        quantity = expected.get((store_id, product_id), 0)
+        balance = balances.get((store_id, product_id))
+        recorded = balance.quantity if balance is not None else None
+        if recorded == quantity or (recorded is None and quantity == 0):
+            continue
+        drift.append(
+            {
+                "store_id": store_id,
+                "product_id": product_id,
+                "recorded": recorded,
+                "expected": quantity,
+            }
+        )
+        if not apply:
+            continue
+        if balance is None:
+            db.add(StockBalance(store_id=store_id, product_id=product_id, quantity=quantity))
+        else:
+            balance.quantity = quantity
+            balance.updated_at = utc_now()
+
+    if apply:
+        db.commit()
+    return drift
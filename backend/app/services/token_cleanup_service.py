@@ -0,0 +1,42 @@
+"""
+Garbage collection for persisted refresh tokens.
+
+Login and refresh only insert rows; this sweeper deletes tokens that have
+expired and tokens revoked longer ago than the grace period, in batches so
+each transaction stays short. main.py runs it periodically and
+`python manage.py purge-refresh-tokens` runs it on demand.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.background import purge_in_batches, run_in_own_session, utc_now_naive
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+
+
+def purge_refresh_tokens(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    revoked_grace: Optional[timedelta] = None,
+) -> int:
+    """Delete expired tokens and tokens revoked before the grace period; return the count."""
+    now = now or utc_now_naive()
+    batch_size = batch_size or settings.refresh_token_sweep_batch_size
+    if revoked_grace is None:
+        revoked_grace = timedelta(hours=settings.revoked_refresh_token_grace_hours)
+
+    deleted = purge_in_batches(db, RefreshToken, RefreshToken.expires_at < now, batch_size)
+    deleted += purge_in_batches(
+        db,
+        RefreshToken,
+        RefreshToken.revoked.is_(True) & (RefreshToken.updated_at < now - revoked_grace),
+        batch_size,
+    )
+    return deleted
+
+
+def sweep_refresh_tokens() -> int:
+    return run_in_own_session(purge_refresh_tokens)
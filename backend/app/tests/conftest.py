@@ -4,17 +4,30 @@ from pathlib import Path
 
 import httpx
 import pytest
+from sqlalchemy import event
 
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from app.core.config import settings
 from app.core.database import Base, SessionLocal, engine
 from app.core.security import create_access_token, hash_password
 from app.models.user import User
+from app.services.dashboard_cache_service import clear_dashboard_cache
+from app.services.login_throttle_service import clear_login_throttles
+from app.services.notification_service import clear_recipient_cache
+from app.services.outbox_service import drain_outbox_until_idle
+from app.services.principal_cache_service import clear_principal_cache
 from main import app
 
 engine.echo = False
+# Fail any request that runs an unreasonable number of statements; tests can
+# tighten this per endpoint with the `statement_budget` fixture.
+settings.sql_statement_budget = 40
+settings.sql_statement_budget_raise = True
+# The minimum bcrypt cost keeps user fixtures and logins fast.
+settings.bcrypt_rounds = 4
 
 
 @pytest.fixture
@@ -27,6 +40,10 @@ def reset_db():
     """Give each test a clean sqlite database."""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    clear_dashboard_cache()
+    clear_principal_cache()
+    clear_login_throttles()
+    clear_recipient_cache()
     yield
 
 
@@ -73,3 +90,34 @@ def auth_headers():
         return {"Authorization": f"Bearer {token}"}
 
     return _headers
+
+
+@pytest.fixture
+def sql_statements():
+    """Collect every SQL statement executed on the engine while the test runs."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def drain_outbox():
+    """Deliver queued notifications and emails, as the background outbox workers would."""
+    return drain_outbox_until_idle
+
+
+@pytest.fixture
+def statement_budget(monkeypatch):
+    """Set the per-request SQL statement budget for the rest of the test."""
+
+    def _set(limit: int) -> None:
+        monkeypatch.setattr(settings, "sql_statement_budget", limit)
+
+    return _set
@@ -1,5 +1,22 @@
+import asyncio
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import text
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import get_async_engine
+from app.core.query_stats import StatementBudgetExceeded
+from app.core.rate_limit import InMemoryRateLimiter, RedisRateLimiter
+from app.core.redis import FakeRedis
+from app.models.refresh_token import RefreshToken
 from app.models.store import Store
+from app.services import login_throttle_service
+from app.services.token_cleanup_service import purge_refresh_tokens
 
 pytestmark = pytest.mark.anyio
 
@@ -11,6 +28,41 @@ async def test_health_check_returns_healthy(client):
     assert response.json()["status"] == "healthy"
 
 
+async def test_readiness_check_with_async_engine(client, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    monkeypatch.setattr(settings, "database_async", True)
+    try:
+        response = await client.get("/health/ready")
+    finally:
+        await get_async_engine().dispose()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+async def test_metrics_expose_per_route_counters_histograms_and_pool_gauges(client, user_factory, auth_headers):
+    clerk = user_factory(role="clerk")
+    headers = auth_headers(clerk)
+    await client.get("/api/inventory/", headers=headers)
+    await client.get("/api/inventory/999999", headers=headers)
+    await client.get("/does-not-exist")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'myduka_http_requests_total{method="GET",route="/api/inventory/",status="200"}' in body
+    assert 'myduka_http_requests_total{method="GET",route="/api/inventory/{inventory_id}",status="404"}' in body
+    assert 'route="<unmatched>",status="404"' in body
+    assert 'myduka_http_request_duration_seconds_bucket{le="0.005",method="GET",route="/api/inventory/"}' in body
+    assert "myduka_http_requests_in_flight" in body
+    assert "myduka_db_pool_checked_out" in body
+    assert "myduka_db_pool_overflow" in body
+    assert "myduka_db_pool_wait_seconds_count" in body
+
+
 async def test_register_then_login_and_get_me(client):
     email = "merchant@myduka.com"
 
@@ -130,3 +182,190 @@ async def test_superuser_can_invite_admin_and_register_with_token(client, db, us
     assert register.status_code == 200, register.text
     assert register.json()["user"]["role"] == "admin"
     assert register.json()["user"]["store_id"] == store.id
+
+
+async def test_request_log_and_server_timing_report_sql_stats(client, user_factory, auth_headers, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    clerk = user_factory(role="clerk")
+    headers = auth_headers(clerk)
+
+    with caplog.at_level(logging.INFO, logger="myduka.api"):
+        response = await client.get("/api/inventory/", headers=headers)
+
+    assert response.status_code == 200
+    assert re.match(r'db;dur=[\d.]+;desc="2 queries", total;dur=[\d.]+', response.headers["server-timing"])
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["path"] == "/api/inventory/"
+    assert entry["db_queries"] == 2
+    assert entry["db_time_ms"] >= 0
+
+
+async def test_statement_budget_fails_requests_that_exceed_it(client, user_factory, auth_headers, statement_budget):
+    clerk = user_factory(role="clerk")
+    headers = auth_headers(clerk)
+    statement_budget(1)
+
+    with pytest.raises(StatementBudgetExceeded, match="ran 2 SQL statements"):
+        await client.get("/api/inventory/", headers=headers)
+
+
+async def test_slow_queries_are_logged(db, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0.000001)
+
+    with caplog.at_level(logging.WARNING, logger="myduka.sql"):
+        db.execute(text("SELECT 1"))
+
+    slow = [json.loads(record.getMessage()) for record in caplog.records if "slow_query" in record.getMessage()]
+    assert slow and slow[-1]["statement"] == "SELECT 1"
+
+
+async def test_cached_principal_skips_user_lookup_until_the_user_changes(
+    client, user_factory, auth_headers, sql_statements
+):
+    admin = user_factory(role="admin")
+    clerk = user_factory(role="clerk", password="clerk-pass-1")
+    clerk_id = clerk.id
+    admin_headers, clerk_headers = auth_headers(admin), auth_headers(clerk)
+
+    first = await client.get("/api/auth/me", headers=clerk_headers)
+    assert first.status_code == 200
+    sql_statements.clear()
+    second = await client.get("/api/auth/me", headers=clerk_headers)
+    assert second.json() == first.json()
+    assert sql_statements == []
+
+    changed = await client.post(
+        f"/api/users/{clerk_id}/change-password",
+        headers=clerk_headers,
+        json={"old_password": "clerk-pass-1", "new_password": "clerk-pass-2"},
+    )
+    assert changed.status_code == 200, changed.text
+    sql_statements.clear()
+    assert (await client.get("/api/auth/me", headers=clerk_headers)).status_code == 200
+    assert any("FROM users" in statement for statement in sql_statements)
+
+    deactivated = await client.patch(
+        f"/api/users/{clerk_id}/deactivate", headers=admin_headers, json={"is_active": False}
+    )
+    assert deactivated.status_code == 200, deactivated.text
+    blocked = await client.get("/api/auth/me", headers=clerk_headers)
+    assert blocked.status_code == 403
+
+
+async def test_login_rehashes_passwords_made_with_an_old_bcrypt_cost(client, db, user_factory, monkeypatch):
+    user = user_factory(email="rehash@myduka.com", password="password123")
+    assert user.hashed_password.startswith("$2b$04$")
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+
+    response = await client.post("/api/auth/login", json={"email": "rehash@myduka.com", "password": "password123"})
+
+    assert response.status_code == 200, response.text
+    db.refresh(user)
+    assert user.hashed_password.startswith("$2b$05$")
+    again = await client.post("/api/auth/login", json={"email": "rehash@myduka.com", "password": "password123"})
+    assert again.status_code == 200
+
+
+async def test_login_is_refused_when_the_password_hashing_queue_is_full(client, user_factory, monkeypatch):
+    user_factory(email="busy@myduka.com", password="password123")
+    monkeypatch.setattr(settings, "password_hash_max_pending", 0)
+
+    response = await client.post("/api/auth/login", json={"email": "busy@myduka.com", "password": "password123"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+async def test_rate_limiter_locks_a_key_after_the_limit_until_reset(backend):
+    limiter = (
+        InMemoryRateLimiter(limit=3, window_seconds=60, lockout_seconds=30, max_keys=100)
+        if backend == "memory"
+        else RedisRateLimiter(FakeRedis(), "test:ratelimit", limit=3, window_seconds=60, lockout_seconds=30)
+    )
+
+    assert [limiter.hit("a@myduka.com") for _ in range(3)] == [False, False, True]
+    assert 0 < limiter.locked_for("a@myduka.com") <= 30
+    assert limiter.locked_for("b@myduka.com") == 0
+    limiter.reset("a@myduka.com")
+    assert limiter.locked_for("a@myduka.com") == 0
+
+
+async def test_in_memory_rate_limiter_is_bounded():
+    limiter = InMemoryRateLimiter(limit=5, window_seconds=60, lockout_seconds=30, max_keys=10)
+
+    for index in range(1000):
+        limiter.hit(f"user{index}@myduka.com")
+
+    assert len(limiter) <= 20
+
+
+async def test_failed_logins_lock_the_email_and_then_the_client_ip(client, user_factory, monkeypatch):
+    monkeypatch.setattr(settings, "login_max_failures_per_email", 2)
+    monkeypatch.setattr(settings, "login_max_failures_per_ip", 3)
+    monkeypatch.setattr(login_throttle_service, "_email_limiter", None)
+    monkeypatch.setattr(login_throttle_service, "_ip_limiter", None)
+    user_factory(email="victim@myduka.com", password="password123")
+
+    for _ in range(2):
+        failed = await client.post("/api/auth/login", json={"email": "victim@myduka.com", "password": "wrong"})
+        assert failed.status_code == 401
+    locked = await client.post("/api/auth/login", json={"email": "victim@myduka.com", "password": "password123"})
+    assert locked.status_code == 429
+    assert int(locked.headers["retry-after"]) > 0
+
+    # One more failure on another account reaches the per-IP limit for this client.
+    other = await client.post("/api/auth/login", json={"email": "other@myduka.com", "password": "wrong"})
+    assert other.status_code == 401
+    blocked = await client.post("/api/auth/login", json={"email": "third@myduka.com", "password": "wrong"})
+    assert blocked.status_code == 429
+
+
+async def test_login_inserts_its_refresh_token_without_deleting_old_ones(client, user_factory, sql_statements):
+    user_factory(email="single-write@myduka.com", password="password123")
+    sql_statements.clear()
+
+    response = await client.post(
+        "/api/auth/login", json={"email": "single-write@myduka.com", "password": "password123"}
+    )
+
+    assert response.status_code == 200
+    writes = [statement.split()[0] for statement in sql_statements if not statement.lstrip().startswith("SELECT")]
+    assert writes == ["INSERT"]
+
+
+async def test_refresh_token_sweep_deletes_expired_and_long_revoked_tokens(db, user_factory):
+    user = user_factory()
+    now = datetime(2026, 3, 1, 12, 0)
+    tokens = {
+        "expired": RefreshToken(expires_at=now - timedelta(minutes=1), revoked=False, updated_at=now),
+        "revoked-old": RefreshToken(expires_at=now + timedelta(days=3), revoked=True, updated_at=now - timedelta(days=2)),
+        "revoked-recent": RefreshToken(expires_at=now + timedelta(days=3), revoked=True, updated_at=now - timedelta(hours=1)),
+        "active": RefreshToken(expires_at=now + timedelta(days=3), revoked=False, updated_at=now),
+    }
+    for index in range(3):
+        tokens[f"expired-{index}"] = RefreshToken(expires_at=now - timedelta(days=index + 1), revoked=False)
+    for jti, token in tokens.items():
+        token.user_id, token.token_jti = user.id, jti
+    db.add_all(tokens.values())
+    db.commit()
+
+    deleted = purge_refresh_tokens(db, now=now, batch_size=2, revoked_grace=timedelta(hours=24))
+
+    assert deleted == 5
+    remaining = {row.token_jti for row in db.query(RefreshToken).all()}
+    assert remaining == {"revoked-recent", "active"}
+
+
+async def test_periodic_task_runs_until_stopped():
+    calls = []
+    task = PeriodicTask("test-task", 0.01, lambda: calls.append(1))
+
+    task.start()
+    while len(calls) < 2:
+        await asyncio.sleep(0.01)
+    await task.stop()
+    count = len(calls)
+    await asyncio.sleep(0.05)
+
+    assert len(calls) == count
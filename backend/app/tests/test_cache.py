@@ -0,0 +1,51 @@
+from app.core.cache import InMemoryCache, RedisCache
+from app.core.redis import FakeRedis
+from app.models.user import User
+from app.services.dashboard_cache_service import dashboard_scope
+
+
+def test_in_memory_cache_evicts_least_recently_used_entry():
+    cache = InMemoryCache(max_entries=2, default_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_in_memory_cache_expires_entries():
+    cache = InMemoryCache(max_entries=10, default_ttl=60)
+    cache.set("stale", {"value": 1}, ttl=0)
+    cache.set("fresh", {"value": 2})
+
+    assert cache.get("stale") is None
+    assert cache.get("fresh") == {"value": 2}
+
+
+def test_redis_cache_round_trips_json_and_clears_only_its_namespace():
+    client = FakeRedis()
+    cache = RedisCache(client, namespace="myduka:dashboard", default_ttl=30)
+    client.set("other:key", "kept")
+
+    cache.set("dashboard:store:1:admin", {"stats": {"store_value": 12.5}})
+    assert cache.get("dashboard:store:1:admin") == {"stats": {"store_value": 12.5}}
+    assert 0 < client.ttl("myduka:dashboard:dashboard:store:1:admin") <= 30
+
+    cache.delete("dashboard:store:1:admin")
+    assert cache.get("dashboard:store:1:admin") is None
+
+    cache.set("dashboard:user:2:clerk", [1, 2])
+    cache.clear()
+    assert cache.get("dashboard:user:2:clerk") is None
+    assert client.get("other:key") == "kept"
+
+
+def test_dashboard_scope_keys_superusers_by_merchant_even_with_a_store():
+    assert dashboard_scope(User(id=1, role="superuser", store_id=5)) == "merchant:1"
+    assert dashboard_scope(User(id=2, role="admin", store_id=5)) == "store:5"
+    assert dashboard_scope(User(id=3, role="clerk", store_id=5)) == "user:3"
+    assert dashboard_scope(User(id=4, role="admin")) == "all"
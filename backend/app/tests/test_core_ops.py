@@ -1,7 +1,10 @@
 import pytest
 
 from app.models.inventory import Inventory
+from app.models.inventory_event import InventoryEvent
 from app.models.product import Product
+from app.models.purchase_order import PurchaseOrder
+from app.models.stock_balance import StockBalance
 from app.models.store import Store
 from app.models.supplier import Supplier
 
@@ -71,3 +74,90 @@ async def test_receive_purchase_order_creates_inventory(client, db, user_factory
 
     inventory = db.query(Inventory).filter(Inventory.product_id == product.id).all()
     assert sum(item.quantity_in_stock for item in inventory) == 5
+
+
+@pytest.mark.anyio
+async def test_list_purchase_orders_loads_supplier_and_store_without_n_plus_one(
+    client, db, user_factory, auth_headers, statement_budget
+):
+    store = Store(name="Eager Store", location="Nakuru")
+    db.add(store)
+    db.commit()
+    suppliers = [Supplier(name=f"Eager Supplier {index}", store_id=store.id) for index in range(5)]
+    db.add_all(suppliers)
+    db.commit()
+    admin = user_factory(role="admin", store_id=store.id)
+    db.add_all(
+        PurchaseOrder(supplier_id=supplier.id, store_id=store.id, created_by=admin.id, total_cost=10)
+        for supplier in suppliers
+    )
+    db.commit()
+    headers = auth_headers(admin)
+
+    # Authentication lookup plus one joined page query, however many orders.
+    statement_budget(2)
+    response = await client.get("/api/purchase-orders/", headers=headers)
+
+    assert response.status_code == 200
+    names = {item["supplier_name"] for item in response.json()}
+    assert names == {f"Eager Supplier {index}" for index in range(5)}
+    assert {item["store_name"] for item in response.json()} == {"Eager Store"}
+
+
+@pytest.mark.anyio
+async def test_large_purchase_order_uses_bulk_lookups_and_inserts(
+    client, db, user_factory, auth_headers, sql_statements
+):
+    store = Store(name="Bulk Store", location="Eldoret")
+    db.add(store)
+    supplier = Supplier(name="Bulk Supplier")
+    db.add(supplier)
+    products = [
+        Product(name=f"Bulk {index}", sku=f"BULK-{index}", buying_price=10, selling_price=15) for index in range(60)
+    ]
+    db.add_all(products)
+    db.commit()
+    admin = user_factory(role="admin", store_id=store.id)
+    store_id, product_ids = store.id, [product.id for product in products]
+    headers = auth_headers(admin)
+    # The first product appears twice so two rows feed one balance.
+    lines = [{"product_id": product_id, "quantity": 2, "unit_cost": 9} for product_id in product_ids + product_ids[:1]]
+
+    sql_statements.clear()
+    created = await client.post(
+        "/api/purchase-orders/",
+        json={"supplier_id": supplier.id, "store_id": store_id, "items": lines},
+        headers=headers,
+    )
+    assert created.status_code == 200
+    assert len(created.json()["items"]) == 61
+    assert len([s for s in sql_statements if s.startswith("SELECT products.")]) == 1
+
+    sql_statements.clear()
+    received = await client.post(
+        f"/api/purchase-orders/{created.json()['id']}/status", json={"status": "received"}, headers=headers
+    )
+    assert received.status_code == 200
+    assert len([s for s in sql_statements if s.startswith("INSERT INTO inventory ")]) == 1
+    assert len([s for s in sql_statements if s.startswith("INSERT INTO inventory_events")]) == 1
+    assert len([s for s in sql_statements if s.startswith("UPDATE stock_balances")]) == 1
+
+    received_rows = db.query(Inventory).filter_by(store_id=store_id).all()
+    assert len(received_rows) == 61
+    assert all(row.created_at is not None and row.quantity_in_stock == 2 for row in received_rows)
+    assert db.query(InventoryEvent).filter_by(store_id=store_id, event_type="purchase_order_received").count() == 61
+    balances = {b.product_id: b.quantity for b in db.query(StockBalance).filter_by(store_id=store_id)}
+    assert balances[product_ids[0]] == 4
+    assert balances[product_ids[1]] == 2
+
+    missing = await client.post(
+        "/api/purchase-orders/",
+        json={
+            "supplier_id": supplier.id,
+            "store_id": store_id,
+            "items": [{"product_id": 999999, "quantity": 1, "unit_cost": 1}],
+        },
+        headers=headers,
+    )
+    assert missing.status_code == 404
+    assert missing.json()["detail"]["product_ids"] == [999999]
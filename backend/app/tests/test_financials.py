@@ -1,8 +1,20 @@
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import func
 
+from app.core.database import SessionLocal, run_with_retries
 from app.models.inventory import Inventory
+from app.models.inventory_event import InventoryEvent
 from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.models.stock_balance import StockBalance
 from app.models.store import Store
+from app.services.rollup_service import rebuild_sales_rollup, record_sale_in_rollup, record_sales_in_rollup
 
 
 @pytest.mark.anyio
@@ -58,3 +70,298 @@ async def test_sales_and_financial_summary(client, db, user_factory, auth_header
     summary = summary_resp.json()
     assert summary["total_sales"] > 0
     assert summary["total_expenses"] >= 50
+
+
+@pytest.mark.anyio
+async def test_sales_feed_daily_rollup_used_by_analytics(client, db, user_factory, auth_headers):
+    store = Store(name="Rollup Store", location="Eldoret")
+    product = Product(name="Test Flour", sku="TEST-FLOUR", buying_price=60, selling_price=90)
+    db.add(store)
+    db.add(product)
+    db.commit()
+    db.refresh(store)
+    db.refresh(product)
+
+    admin = user_factory(role="admin", store_id=store.id)
+    db.add(
+        Inventory(
+            product_id=product.id,
+            store_id=store.id,
+            created_by=admin.id,
+            quantity_received=20,
+            quantity_in_stock=20,
+            quantity_spoilt=0,
+            payment_status="paid",
+            buying_price=product.buying_price,
+            selling_price=product.selling_price,
+        )
+    )
+    db.commit()
+
+    for quantity in (3, 4):
+        sale_resp = await client.post(
+            "/api/sales/",
+            json={"store_id": store.id, "product_id": product.id, "quantity": quantity},
+            headers=auth_headers(admin),
+        )
+        assert sale_resp.status_code == 200, sale_resp.text
+
+    rows = db.query(SalesDailyRollup).filter(SalesDailyRollup.store_id == store.id).all()
+    assert len(rows) == 1
+    assert rows[0].quantity == 7
+    assert rows[0].orders == 2
+    assert rows[0].total_sales == 630
+
+    top_resp = await client.get("/api/analytics/top-products", headers=auth_headers(admin))
+    assert top_resp.status_code == 200
+    assert top_resp.json()[0]["quantity_sold"] == 7
+
+    slow_resp = await client.get("/api/analytics/slow-movers", headers=auth_headers(admin))
+    assert slow_resp.status_code == 200, slow_resp.text
+    slow = slow_resp.json()
+    assert [(item["product_id"], item["quantity_sold"]) for item in slow] == [(product.id, 7)]
+    assert (slow[0]["total_sales"], slow[0]["total_profit"]) == (630, 210)
+
+    trend_resp = await client.get("/api/analytics/sales-trend", headers=auth_headers(admin))
+    assert trend_resp.status_code == 200
+    assert trend_resp.json()[0]["total_profit"] == 210
+
+    # A rebuild from the sales table reproduces the incrementally maintained rows.
+    assert rebuild_sales_rollup(db) == 1
+    db.expire_all()
+    rebuilt = db.query(SalesDailyRollup).filter(SalesDailyRollup.store_id == store.id).one()
+    assert (rebuilt.quantity, rebuilt.orders, rebuilt.total_sales) == (7, 2, 630)
+
+
+def test_concurrent_sales_never_lose_rollup_updates(db):
+    store = Store(name="Busy Store", location="Thika")
+    product = Product(name="Busy Bread", sku="BUSY-BREAD", buying_price=40, selling_price=60)
+    db.add_all([store, product])
+    db.commit()
+    store_id, product_id = store.id, product.id
+    sold_at = datetime(2026, 3, 1, 12)
+
+    def sale():
+        return Sale(
+            store_id=store_id, product_id=product_id, quantity=2, total_price=120, total_cost=80, created_at=sold_at
+        )
+
+    def record(index: int) -> None:
+        session = SessionLocal()
+        try:
+            def work():
+                # Alternate single sales and two-line baskets into the same bucket.
+                if index % 2:
+                    record_sales_in_rollup(session, [sale(), sale()])
+                else:
+                    record_sale_in_rollup(session, sale())
+                session.commit()
+
+            run_with_retries(session, work, attempts=50)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(record, range(400)))
+
+    row = db.query(SalesDailyRollup).filter_by(store_id=store_id, product_id=product_id).one()
+    # 200 single sales plus 200 two-sale baskets.
+    assert (row.orders, row.quantity, row.total_sales, row.total_cost) == (600, 1200, 72000, 48000)
+
+
+@pytest.mark.anyio
+async def test_sales_list_pages_with_opaque_cursor(client, db, user_factory, auth_headers):
+    store = Store(name="Cursor Store", location="Thika")
+    product = Product(name="Cursor Rice", sku="CURSOR-RICE", buying_price=5, selling_price=9)
+    db.add_all([store, product])
+    db.commit()
+    admin = user_factory(role="admin", store_id=store.id)
+    # Rows sharing one created_at must still page deterministically by id.
+    created_at = datetime(2026, 2, 1, 12, 0, 0)
+    db.add_all(
+        Sale(
+            store_id=store.id,
+            product_id=product.id,
+            created_by=admin.id,
+            quantity=1,
+            unit_price=9,
+            unit_cost=5,
+            total_price=9,
+            total_cost=5,
+            created_at=created_at if index < 3 else created_at + timedelta(minutes=index),
+        )
+        for index in range(5)
+    )
+    db.commit()
+    headers = auth_headers(admin)
+
+    seen = []
+    cursor = None
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = await client.get("/api/sales/", params=params, headers=headers)
+        assert page.status_code == 200
+        seen.extend(item["id"] for item in page.json())
+        cursor = page.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+    assert seen[3:] == sorted(seen[3:], reverse=True)
+
+    invalid = await client.get("/api/sales/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert invalid.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_merchant_exports_stream_only_their_stores(client, db, user_factory, auth_headers):
+    merchant = user_factory(email="export-merchant@myduka.com", role="superuser")
+    other_merchant = user_factory(email="export-other@myduka.com", role="superuser")
+    own_store = Store(name="Own Store", location="Nairobi", merchant_id=merchant.id)
+    other_store = Store(name="Other Store", location="Kisumu", merchant_id=other_merchant.id)
+    product = Product(name="Export Tea", sku="EXPORT-TEA", buying_price=5, selling_price=8)
+    db.add_all([own_store, other_store, product])
+    db.commit()
+    admin = user_factory(email="export-admin@myduka.com", role="admin", store_id=own_store.id)
+    for store, quantity in ((own_store, 2), (own_store, 3), (other_store, 7)):
+        db.add(
+            Sale(
+                store_id=store.id,
+                product_id=product.id,
+                created_by=admin.id,
+                quantity=quantity,
+                unit_price=8,
+                unit_cost=5,
+                total_price=8 * quantity,
+                total_cost=5 * quantity,
+            )
+        )
+        db.add(
+            Inventory(
+                product_id=product.id,
+                store_id=store.id,
+                created_by=admin.id,
+                quantity_received=quantity,
+                quantity_in_stock=quantity,
+                quantity_spoilt=0,
+                payment_status="paid",
+                buying_price=5,
+                selling_price=8,
+            )
+        )
+    db.commit()
+    headers = auth_headers(merchant)
+
+    sales = await client.get("/api/analytics/sales/export", headers=headers)
+    assert sales.status_code == 200
+    assert sales.headers["content-type"].startswith("text/csv")
+    sales_rows = list(csv.reader(io.StringIO(sales.text)))
+    assert sales_rows[0][:4] == ["Sale ID", "Date", "Store ID", "Store"]
+    assert sorted(int(row[6]) for row in sales_rows[1:]) == [2, 3]
+    assert {row[3] for row in sales_rows[1:]} == {"Own Store"}
+
+    inventory = await client.get("/api/analytics/inventory/export", headers=headers)
+    inventory_rows = list(csv.reader(io.StringIO(inventory.text)))
+    assert len(inventory_rows) == 3
+
+    events = await client.get("/api/analytics/inventory-events/export", headers=headers)
+    assert events.status_code == 200
+    assert list(csv.reader(io.StringIO(events.text)))[0][0] == "Event ID"
+
+
+def _stock_basket_store(db, user_factory, products: int):
+    store = Store(name="Basket Store", location="Thika")
+    db.add(store)
+    db.flush()
+    items = [
+        Product(name=f"Basket {index}", sku=f"BASKET-{index}", buying_price=10, selling_price=15)
+        for index in range(products)
+    ]
+    db.add_all(items)
+    db.commit()
+    admin = user_factory(role="admin", store_id=store.id)
+    for product in items:
+        # Two inventory rows per product so a line can draw from both.
+        for quantity in (3, 5):
+            db.add(
+                Inventory(
+                    product_id=product.id,
+                    store_id=store.id,
+                    created_by=admin.id,
+                    quantity_received=quantity,
+                    quantity_in_stock=quantity,
+                    quantity_spoilt=0,
+                    payment_status="paid",
+                    buying_price=10,
+                    selling_price=15,
+                )
+            )
+    db.commit()
+    return store, items, admin
+
+
+@pytest.mark.anyio
+async def test_sale_batch_records_a_basket_with_a_fixed_number_of_statements(
+    client, db, user_factory, auth_headers, statement_budget
+):
+    store, products, admin = _stock_basket_store(db, user_factory, products=30)
+    store_id, product_ids = store.id, [product.id for product in products]
+    headers = auth_headers(admin)
+    lines = [{"product_id": product_id, "quantity": 6} for product_id in product_ids]
+    lines.append({"product_id": product_ids[0], "quantity": 2, "unit_price": 20})
+    # Independent of basket size: auth, lookups, bulk writes, rollup and cache invalidation.
+    statement_budget(21)
+
+    response = await client.post("/api/sales/batch", headers=headers, json={"store_id": store_id, "lines": lines})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [(sale["product_id"], sale["quantity"]) for sale in body["sales"]] == [
+        (line["product_id"], line["quantity"]) for line in lines
+    ]
+    assert body["sales"][-1]["total_price"] == 40
+    assert body["total_price"] == 30 * 6 * 15 + 40
+    assert db.query(Sale).filter(Sale.store_id == store_id).count() == 31
+    on_hand = dict(
+        db.query(Inventory.product_id, func.sum(Inventory.quantity_in_stock)).group_by(Inventory.product_id).all()
+    )
+    assert on_hand[product_ids[0]] == 0
+    assert all(on_hand[product_id] == 2 for product_id in product_ids[1:])
+    balances = {balance.product_id: balance.quantity for balance in db.query(StockBalance).all()}
+    assert balances == on_hand
+    first = db.query(SalesDailyRollup).filter(SalesDailyRollup.product_id == product_ids[0]).one()
+    assert (first.quantity, first.orders, first.total_sales) == (8, 2, 130)
+
+
+@pytest.mark.anyio
+async def test_sale_batch_rolls_back_the_whole_basket_when_a_line_fails(client, db, user_factory, auth_headers):
+    store, products, admin = _stock_basket_store(db, user_factory, products=3)
+    store_id, product_ids = store.id, [product.id for product in products]
+    lines = [
+        {"product_id": product_ids[0], "quantity": 1},
+        {"product_id": product_ids[1], "quantity": 9},
+        {"product_id": product_ids[2], "quantity": 1},
+    ]
+
+    response = await client.post(
+        "/api/sales/batch", headers=auth_headers(admin), json={"store_id": store_id, "lines": lines}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["product_ids"] == [product_ids[1]]
+    db.expire_all()
+    assert db.query(Sale).count() == 0
+    assert db.query(SalesDailyRollup).count() == 0
+    assert db.query(InventoryEvent).count() == 0
+    assert {row.quantity_in_stock for row in db.query(Inventory).all()} == {3, 5}
+
+    missing = await client.post(
+        "/api/sales/batch",
+        headers=auth_headers(admin),
+        json={"store_id": store_id, "lines": [{"product_id": 999999, "quantity": 1}]},
+    )
+    assert missing.status_code == 404
+    assert missing.json()["detail"]["product_ids"] == [999999]
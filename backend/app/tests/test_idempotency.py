@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.idempotency_key import IdempotencyKey
+from app.models.inventory import Inventory
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.stock_balance import StockBalance
+from app.models.store import Store
+from app.services.idempotency_service import purge_idempotency_keys
+
+pytestmark = pytest.mark.anyio
+
+
+def _stocked_store(db, user_factory, quantity=10):
+    store = Store(name="Retry Store", location="Kisumu")
+    product = Product(name="Retry Flour", sku="RETRY-FLOUR", buying_price=50, selling_price=70)
+    db.add_all([store, product])
+    db.commit()
+    admin = user_factory(role="admin", store_id=store.id)
+    db.add(
+        Inventory(
+            product_id=product.id,
+            store_id=store.id,
+            created_by=admin.id,
+            quantity_received=quantity,
+            quantity_in_stock=quantity,
+            quantity_spoilt=0,
+            payment_status="paid",
+            buying_price=50,
+            selling_price=70,
+        )
+    )
+    db.commit()
+    return store, product, admin
+
+
+async def test_retried_sale_replays_the_stored_response(
+    client, db, user_factory, auth_headers, sql_statements
+):
+    store, product, admin = _stocked_store(db, user_factory)
+    store_id, product_id = store.id, product.id
+    headers = {**auth_headers(admin), "Idempotency-Key": "sale-1"}
+    payload = {"store_id": store_id, "product_id": product_id, "quantity": 3}
+
+    first = await client.post("/api/sales/", json=payload, headers=headers)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    sql_statements.clear()
+    retry = await client.post("/api/sales/", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    # The replay is a single indexed lookup; the handler does not run.
+    assert len([s for s in sql_statements if s.lstrip().upper().startswith("SELECT")]) == 1
+    assert not [s for s in sql_statements if "sales" in s or "stock_balances" in s]
+
+    db.expire_all()
+    assert db.query(Sale).count() == 1
+    assert db.query(StockBalance).filter_by(store_id=store_id, product_id=product_id).one().quantity == 7
+
+    other = await client.post("/api/sales/", json={**payload, "quantity": 1}, headers=headers)
+    assert other.status_code == 422
+
+
+async def test_keys_are_scoped_per_user_and_length_checked(client, db, user_factory, auth_headers):
+    store, product, admin = _stocked_store(db, user_factory, quantity=2)
+    other_admin = user_factory(role="admin", store_id=store.id)
+    payload = {"store_id": store.id, "product_id": product.id, "quantity": 2}
+
+    first = await client.post(
+        "/api/sales/", json=payload, headers={**auth_headers(admin), "Idempotency-Key": "same"}
+    )
+    second = await client.post(
+        "/api/sales/", json=payload, headers={**auth_headers(other_admin), "Idempotency-Key": "same"}
+    )
+    assert first.status_code == 200
+    # Another user's identical key runs the handler: the stock is gone now.
+    assert second.status_code == 400
+    assert "Idempotent-Replayed" not in second.headers
+
+    missing = await client.post(
+        "/api/sales/",
+        json={**payload, "product_id": 999_999},
+        headers={**auth_headers(admin), "Idempotency-Key": "x" * 256},
+    )
+    assert missing.status_code == 400
+
+
+async def test_purge_removes_only_expired_keys(db, user_factory):
+    user = user_factory()
+    now = datetime(2026, 3, 1, 12, 0)
+    db.add_all(
+        [
+            IdempotencyKey(user_id=user.id, key="old", request_hash="a", expires_at=now - timedelta(minutes=1)),
+            IdempotencyKey(user_id=user.id, key="new", request_hash="b", expires_at=now + timedelta(hours=1)),
+        ]
+    )
+    db.commit()
+
+    assert purge_idempotency_keys(db, now=now, batch_size=1) == 1
+    assert [row.key for row in db.query(IdempotencyKey)] == ["new"]
@@ -1,8 +1,22 @@
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import func
 
+from app.core.database import SessionLocal, run_with_retries
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.models.inventory import Inventory
+from app.models.inventory_event import InventoryEvent
 from app.models.product import Product
+from app.models.stock_balance import StockBalance
 from app.models.store import Store
+from app.services.inventory_event_partition_service import archive_inventory_events
+from app.services.stock_replay_service import build_stock_checkpoints, stock_at
+from app.services.stock_service import decrease_stock, increase_stock, reconcile_stock_balances
 
 pytestmark = pytest.mark.anyio
 
@@ -139,3 +153,290 @@ async def test_clerk_can_delete_own_inventory_record(client, db, user_factory, a
 
     assert response.status_code == 200
     assert response.json()["message"] == "Inventory record deleted successfully"
+
+
+async def test_inventory_writes_keep_stock_balance_in_sync(client, db, user_factory, auth_headers):
+    clerk = user_factory(email="balance@myduka.com", role="clerk", password="clerk123")
+    product, store = _seed_product_store(db, "BAL")
+
+    created = await client.post(
+        "/api/inventory/",
+        headers=auth_headers(clerk),
+        json={
+            "product_id": product.id,
+            "store_id": store.id,
+            "quantity_received": 12,
+            "quantity_in_stock": 12,
+            "quantity_spoilt": 0,
+            "payment_status": "paid",
+            "buying_price": 100,
+            "selling_price": 150,
+        },
+    )
+    assert created.status_code == 201, created.text
+    inventory_id = created.json()["id"]
+
+    def balance():
+        db.expire_all()
+        row = (
+            db.query(StockBalance)
+            .filter(StockBalance.store_id == store.id, StockBalance.product_id == product.id)
+            .one()
+        )
+        return row.quantity
+
+    assert balance() == 12
+
+    updated = await client.put(
+        f"/api/inventory/{inventory_id}",
+        headers=auth_headers(clerk),
+        json={"quantity_in_stock": 8, "quantity_spoilt": 1},
+    )
+    assert updated.status_code == 200, updated.text
+    assert balance() == 8
+
+    deleted = await client.delete(f"/api/inventory/{inventory_id}", headers=auth_headers(clerk))
+    assert deleted.status_code == 200
+    assert balance() == 0
+
+
+async def test_reconcile_stock_balances_reports_and_repairs_drift(db, user_factory):
+    clerk = user_factory(email="drift@myduka.com", role="clerk", password="clerk123")
+    product, store = _seed_product_store(db, "DRIFT")
+    db.add(
+        Inventory(
+            product_id=product.id,
+            store_id=store.id,
+            created_by=clerk.id,
+            quantity_received=6,
+            quantity_in_stock=6,
+            quantity_spoilt=0,
+            payment_status="paid",
+            buying_price=100,
+            selling_price=150,
+        )
+    )
+    db.add(StockBalance(store_id=store.id, product_id=product.id, quantity=2))
+    db.commit()
+
+    drift = reconcile_stock_balances(db, apply=False)
+    assert drift == [{"store_id": store.id, "product_id": product.id, "recorded": 2, "expected": 6}]
+
+    reconcile_stock_balances(db)
+    assert reconcile_stock_balances(db, apply=False) == []
+
+
+def test_concurrent_decrements_never_oversell(db, user_factory):
+    clerk = user_factory(email="race@myduka.com", role="clerk", password="clerk123")
+    product, store = _seed_product_store(db, "RACE")
+    # Stock spread over several inventory rows so draws cross row boundaries.
+    for quantity in (100, 150, 250):
+        db.add(
+            Inventory(
+                product_id=product.id,
+                store_id=store.id,
+                created_by=clerk.id,
+                quantity_received=quantity,
+                quantity_in_stock=quantity,
+                quantity_spoilt=0,
+                payment_status="paid",
+                buying_price=100,
+                selling_price=150,
+            )
+        )
+    db.add(StockBalance(store_id=store.id, product_id=product.id, quantity=500))
+    db.commit()
+    store_id, product_id, clerk_id = store.id, product.id, clerk.id
+
+    def sell_one() -> bool:
+        session = SessionLocal()
+        try:
+            def work():
+                decrease_stock(session, store_id, product_id, 1, clerk_id, "sale_recorded", "Sale recorded")
+                session.commit()
+
+            run_with_retries(session, work, attempts=50)
+            return True
+        except HTTPException:
+            session.rollback()
+            return False
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(lambda _: sell_one(), range(2000)))
+
+    db.expire_all()
+    balance = db.query(StockBalance).filter_by(store_id=store_id, product_id=product_id).one()
+    rows = db.query(Inventory).filter_by(store_id=store_id, product_id=product_id).all()
+    assert sum(results) == 500
+    assert balance.quantity == 0
+    assert all(row.quantity_in_stock >= 0 for row in rows)
+    assert db.query(func.sum(Inventory.quantity_in_stock)).scalar() == 0
+
+
+def _add_events(db, product_id, store_id, actor_id, created_at_values):
+    db.add_all(
+        InventoryEvent(
+            product_id=product_id, store_id=store_id, actor_id=actor_id, event_type="updated", created_at=created_at
+        )
+        for created_at in created_at_values
+    )
+    db.commit()
+
+
+async def test_inventory_history_pages_with_a_cursor(client, db, user_factory, auth_headers):
+    product, store = _seed_product_store(db, "HIST")
+    admin = user_factory(role="admin", email="history-admin@myduka.com", store_id=store.id)
+    # Equal timestamps make the id tie-breaker matter.
+    _add_events(db, product.id, store.id, admin.id, [datetime(2026, 3, day // 2 + 1) for day in range(7)])
+    _add_events(db, product.id, store.id + 1, admin.id, [datetime(2026, 3, 9)])
+    url = f"/api/inventory/history/product/{product.id}"
+    headers = auth_headers(admin)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = await client.get(url, headers=headers, params=params)
+        assert page.status_code == 200
+        seen.extend(page.json())
+        cursor = page.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len({event["id"] for event in seen}) == 7
+    keys = [(event["created_at"], event["id"]) for event in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_archive_moves_old_months_to_compressed_files(db, user_factory, tmp_path):
+    product, store = _seed_product_store(db, "ARCH")
+    clerk = user_factory(role="clerk", email="archive-clerk@myduka.com", store_id=store.id)
+    _add_events(
+        db,
+        product.id,
+        store.id,
+        clerk.id,
+        [datetime(2025, 11, 3), datetime(2025, 11, 30, 23, 59), datetime(2026, 1, 15), datetime(2026, 2, 1)],
+    )
+
+    archived = archive_inventory_events(db, before=date(2026, 2, 10), directory=tmp_path, batch_size=1)
+
+    assert [(entry["month"], entry["rows"]) for entry in archived] == [("2025-11", 2), ("2026-01", 1)]
+    with gzip.open(tmp_path / "inventory_events-2025-11.jsonl.gz", "rt") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["created_at"] for row in rows] == ["2025-11-03T00:00:00", "2025-11-30T23:59:00"]
+    assert [event.created_at for event in db.query(InventoryEvent).all()] == [datetime(2026, 2, 1)]
+
+    # Late rows for an archived month go to a second file instead of overwriting the first.
+    _add_events(db, product.id, store.id, clerk.id, [datetime(2025, 11, 5)])
+    archived = archive_inventory_events(db, before=date(2026, 2, 10), directory=tmp_path)
+    assert archived[0]["path"].endswith("inventory_events-2025-11.2.jsonl.gz")
+    assert archive_inventory_events(db, before=date(2026, 2, 10), directory=tmp_path) == []
+
+
+def _add_movements(db, store_id, actor_id, movements):
+    db.add_all(
+        InventoryEvent(
+            product_id=product_id,
+            store_id=store_id,
+            actor_id=actor_id,
+            event_type="updated",
+            old_quantity_in_stock=old,
+            new_quantity_in_stock=new,
+            created_at=created_at,
+        )
+        for product_id, created_at, old, new in movements
+    )
+    db.commit()
+
+
+async def test_stock_at_replays_from_the_nearest_checkpoint(client, db, user_factory, auth_headers):
+    product, store = _seed_product_store(db, "REPLAY")
+    other_store = Store(name="Uptown", location="Nairobi")
+    db.add(other_store)
+    db.commit()
+    admin = user_factory(role="admin", email="replay-admin@myduka.com", store_id=store.id)
+    outsider = user_factory(role="admin", email="replay-outsider@myduka.com", store_id=other_store.id)
+    store_id, product_id, other_store_id = store.id, product.id, other_store.id
+    _add_movements(
+        db,
+        store_id,
+        admin.id,
+        [
+            (product_id, datetime(2026, 3, 1, 10), None, 10),
+            (product_id, datetime(2026, 3, 1, 15), 10, 7),
+            (product_id, datetime(2026, 3, 2, 9), 7, 5),
+            (product_id + 1, datetime(2026, 3, 2, 9), None, 4),
+            (product_id, datetime(2026, 3, 4, 12), 5, 8),
+            (product_id, datetime(2026, 3, 4, 18), 8, None),
+        ],
+    )
+    _add_movements(db, other_store_id, admin.id, [(product_id, datetime(2026, 3, 1, 11), None, 99)])
+
+    assert build_stock_checkpoints(db, until=date(2026, 3, 4)) == 4
+    assert build_stock_checkpoints(db, until=date(2026, 3, 4)) == 0
+
+    snapshot = stock_at(db, store_id, product_id, datetime(2026, 3, 1, 12))
+    assert (snapshot.quantity_in_stock, snapshot.checkpoint_day, snapshot.events_replayed) == (10, None, 1)
+    snapshot = stock_at(db, store_id, product_id, datetime(2026, 3, 3, 23))
+    assert (snapshot.quantity_in_stock, snapshot.checkpoint_day, snapshot.events_replayed) == (5, date(2026, 3, 2), 0)
+    # Days after the last checkpoint are replayed from the log.
+    snapshot = stock_at(db, store_id, product_id, datetime(2026, 3, 4, 13, tzinfo=timezone.utc))
+    assert (snapshot.quantity_in_stock, snapshot.checkpoint_day, snapshot.events_replayed) == (8, date(2026, 3, 2), 1)
+    assert stock_at(db, store_id, product_id, datetime(2026, 3, 5)).quantity_in_stock == 0
+
+    response = await client.get(
+        "/api/inventory/stock-at",
+        headers=auth_headers(admin),
+        params={"store_id": store_id, "product_id": product_id, "at": "2026-03-02T12:00:00"},
+    )
+    assert response.status_code == 200
+    assert response.json()["quantity_in_stock"] == 5
+    assert response.json()["checkpoint_day"] == "2026-03-01"
+    forbidden = await client.get(
+        "/api/inventory/stock-at",
+        headers=auth_headers(outsider),
+        params={"store_id": store_id, "product_id": product_id, "at": "2026-03-02T12:00:00"},
+    )
+    assert forbidden.status_code == 403
+
+
+def test_archiving_checkpoints_stock_before_removing_events(db, user_factory, tmp_path):
+    product, store = _seed_product_store(db, "REPLAY-ARCH")
+    clerk = user_factory(role="clerk", email="replay-arch-clerk@myduka.com", store_id=store.id)
+    store_id, product_id = store.id, product.id
+    _add_movements(
+        db,
+        store_id,
+        clerk.id,
+        [
+            (product_id, datetime(2026, 1, 10), None, 20),
+            (product_id, datetime(2026, 1, 20), 20, 12),
+            (product_id, datetime(2026, 3, 5), 12, 15),
+        ],
+    )
+
+    # No checkpoints exist yet; archival builds them before deleting January.
+    archived = archive_inventory_events(db, before=date(2026, 2, 1), directory=tmp_path)
+    assert [(entry["month"], entry["rows"]) for entry in archived] == [("2026-01", 2)]
+
+    snapshot = stock_at(db, store_id, product_id, datetime(2026, 3, 6))
+    assert (snapshot.quantity_in_stock, snapshot.checkpoint_day, snapshot.events_replayed) == (15, date(2026, 1, 20), 1)
+    assert stock_at(db, store_id, product_id, datetime(2026, 2, 1)).quantity_in_stock == 12
+
+
+def test_replayed_stock_matches_the_stock_balance(db, user_factory):
+    product, store = _seed_product_store(db, "REPLAY2")
+    clerk = user_factory(role="clerk", email="replay-clerk@myduka.com", store_id=store.id)
+    store_id, product_id, clerk_id = store.id, product.id, clerk.id
+    for quantity in (30, 12):
+        increase_stock(db, store_id, product_id, quantity, 100.0, 150.0, clerk_id, "purchase_order_received")
+    db.commit()
+    decrease_stock(db, store_id, product_id, 35, clerk_id, "sale_recorded")
+    db.commit()
+
+    balance = db.query(StockBalance).filter_by(store_id=store_id, product_id=product_id).one()
+    now = datetime.now(timezone.utc)
+    assert stock_at(db, store_id, product_id, now).quantity_in_stock == balance.quantity == 7
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.pubsub import LocalHub, RedisHub
+from app.core.redis import FakeRedis
+from app.models.notification import Notification
+from app.services.notification_service import notify_users
+from app.services.notification_stream_service import get_notification_hub, notification_events
+
+pytestmark = pytest.mark.anyio
+
+
+def _sse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+
+async def test_5000_idle_streams_hold_no_db_connections(db, user_factory, monkeypatch):
+    # Keep keep-alives out of the way while the streams are being opened.
+    monkeypatch.setattr(settings, "notification_stream_heartbeat_seconds", 120)
+    user_id = user_factory(email="crowd@myduka.com", role="admin").id
+    db.close()
+
+    streams = [notification_events(user_id) for _ in range(5000)]
+
+    async def open_stream(stream):
+        assert (await anext(stream)).startswith("retry: ")
+        return _sse(await anext(stream))
+
+    try:
+        opened = await asyncio.gather(*(open_stream(stream) for stream in streams))
+        assert all(frame == (None, "unread_count", {"unread_count": 0}) for frame in opened)
+        hub = get_notification_hub()
+        assert hub.subscriber_count(str(user_id)) == 5000
+        # Idle streams wait on their queues only; the backlog session is already closed.
+        assert engine.pool.checkedout() == 0
+
+        hub.publish(str(user_id), {"id": None, "event": "unread_count", "data": {"unread_count": 1}})
+        delivered = await asyncio.wait_for(asyncio.gather(*(anext(stream) for stream in streams)), 30)
+        assert all(_sse(frame) == (None, "unread_count", {"unread_count": 1}) for frame in delivered)
+    finally:
+        await asyncio.gather(*(stream.aclose() for stream in streams))
+    assert get_notification_hub().subscriber_count() == 0
+
+
+async def test_slow_subscriber_is_marked_overflowed():
+    hub = LocalHub(max_queued=2)
+    subscription = hub.subscribe("user-1")
+    for i in range(3):
+        hub.publish("user-1", {"n": i})
+    await asyncio.sleep(0)
+    assert subscription.overflowed
+
+
+async def test_redis_hub_delivers_through_the_channel():
+    hub = RedisHub(FakeRedis(), channel="myduka:test")
+    try:
+        subscription = hub.subscribe("7")
+        hub.publish("7", {"event": "ping"})
+        assert await subscription.get(timeout=5) == {"event": "ping"}
+    finally:
+        hub.close()
+
+
+async def test_stream_replays_missed_notifications_then_goes_live(
+    client, db, user_factory, auth_headers, drain_outbox, monkeypatch
+):
+    monkeypatch.setattr(settings, "notification_stream_heartbeat_seconds", 0.2)
+    user = user_factory(email="stream-user@myduka.com", role="admin")
+    seen, missed = (Notification(user_id=user.id, category="system", title=t, message=t) for t in ("seen", "missed"))
+    db.add_all([seen, missed])
+    db.commit()
+    user_id, seen_id, missed_id = user.id, seen.id, missed.id
+
+    stream = notification_events(user_id, last_event_id=seen_id)
+    try:
+        assert (await anext(stream)).startswith("retry: ")
+        assert _sse(await anext(stream))[:2] == (str(missed_id), "notification")
+        assert _sse(await anext(stream)) == (None, "unread_count", {"unread_count": 2})
+        assert get_notification_hub().subscriber_count(str(user_id)) == 1
+
+        # Delivered by the outbox worker and published once it commits.
+        session = SessionLocal()
+        try:
+            notify_users(session, user_ids=[user_id], category="system", title="live", message="live")
+            session.commit()
+        finally:
+            session.close()
+        drain_outbox()
+        event_id, kind, data = _sse(await anext(stream))
+        assert kind == "notification" and data["title"] == "live" and int(event_id) > missed_id
+        assert _sse(await anext(stream))[1:] == ("unread_count", {"unread_count": 3})
+
+        marked = await client.patch("/api/notifications/read-all", headers=auth_headers(user))
+        assert marked.status_code == 200
+        assert _sse(await anext(stream))[1:] == ("unread_count", {"unread_count": 0})
+
+        assert await anext(stream) == ": keep-alive\n\n"
+    finally:
+        await stream.aclose()
+    assert get_notification_hub().subscriber_count(str(user_id)) == 0
+
+
+async def test_stream_requires_authentication(client):
+    response = await client.get("/api/notifications/stream")
+    assert response.status_code == 401
+    response = await client.get("/api/notifications/stream", params={"access_token": "not-a-token"})
+    assert response.status_code == 401
@@ -1,8 +1,15 @@
+from datetime import datetime, timedelta
+
 import pytest
 
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
 from app.models.product import Product
 from app.models.store import Store
 from app.models.supply_request import SupplyRequest
+from app.services.notification_counter_service import repair_notification_counters
+from app.services.notification_retention_service import purge_read_notifications
+from app.services.notification_service import notify_users
 
 pytestmark = pytest.mark.anyio
 
@@ -23,7 +30,7 @@ def _seed_store_and_product(db, suffix="N1"):
     return store, product
 
 
-async def test_supply_request_generates_admin_notification(client, db, user_factory, auth_headers):
+async def test_supply_request_generates_admin_notification(client, db, user_factory, auth_headers, drain_outbox):
     admin = user_factory(email="notify-admin@myduka.com", role="admin")
     clerk = user_factory(email="notify-clerk@myduka.com", role="clerk")
     store, product = _seed_store_and_product(db, "N2")
@@ -42,6 +49,7 @@ async def test_supply_request_generates_admin_notification(client, db, user_fact
         },
     )
     assert create_request.status_code == 201
+    drain_outbox()
 
     notifications = await client.get("/api/notifications/?unread_only=true", headers=auth_headers(admin))
     assert notifications.status_code == 200
@@ -49,7 +57,7 @@ async def test_supply_request_generates_admin_notification(client, db, user_fact
     assert "pending_supply_request" in categories
 
 
-async def test_supply_request_approval_notifies_clerk(client, db, user_factory, auth_headers):
+async def test_supply_request_approval_notifies_clerk(client, db, user_factory, auth_headers, drain_outbox):
     admin = user_factory(email="approve-admin@myduka.com", role="admin")
     clerk = user_factory(email="approve-clerk@myduka.com", role="clerk")
     store, product = _seed_store_and_product(db, "N3")
@@ -75,6 +83,7 @@ async def test_supply_request_approval_notifies_clerk(client, db, user_factory,
         json={"admin_notes": "Approved"},
     )
     assert approve.status_code == 200
+    drain_outbox()
 
     notifications = await client.get("/api/notifications/", headers=auth_headers(clerk))
     assert notifications.status_code == 200
@@ -82,7 +91,7 @@ async def test_supply_request_approval_notifies_clerk(client, db, user_factory,
     assert "supply_request_status" in categories
 
 
-async def test_low_stock_unpaid_and_history_events(client, db, user_factory, auth_headers):
+async def test_low_stock_unpaid_and_history_events(client, db, user_factory, auth_headers, drain_outbox):
     admin = user_factory(email="stock-admin@myduka.com", role="admin")
     clerk = user_factory(email="stock-clerk@myduka.com", role="clerk")
     store, product = _seed_store_and_product(db, "N4")
@@ -115,8 +124,162 @@ async def test_low_stock_unpaid_and_history_events(client, db, user_factory, aut
     assert len(history.json()) >= 1
     assert history.json()[0]["event_type"] == "created"
 
+    drain_outbox()
     admin_notifications = await client.get("/api/notifications/", headers=auth_headers(admin))
     assert admin_notifications.status_code == 200
     categories = {item["category"] for item in admin_notifications.json()}
     assert "low_stock" in categories
     assert "unpaid_inventory" in categories
+
+
+async def test_inventory_alerts_fan_out_in_one_insert_with_cached_recipients(
+    client, db, user_factory, auth_headers, sql_statements, drain_outbox
+):
+    merchant = user_factory(email="fanout-merchant@myduka.com", role="superuser")
+    store, product = _seed_store_and_product(db, "N5")
+    store.merchant_id = merchant.id
+    admins = [user_factory(email=f"fanout-admin{i}@myduka.com", role="admin", store_id=store.id) for i in range(3)]
+    clerk = user_factory(email="fanout-clerk@myduka.com", role="clerk", store_id=store.id)
+    db.commit()
+    store_id, product_id = store.id, product.id
+    headers = auth_headers(clerk)
+    payload = {
+        "product_id": product_id,
+        "store_id": store_id,
+        "quantity_received": 3,
+        "quantity_in_stock": 3,
+        "quantity_spoilt": 0,
+        "payment_status": "unpaid",
+        "buying_price": 120,
+        "selling_price": 150,
+    }
+
+    sql_statements.clear()
+    assert (await client.post("/api/inventory/", headers=headers, json=payload)).status_code == 201
+    # The request only queues one outbox message for both alerts...
+    assert not [s for s in sql_statements if s.startswith("INSERT INTO notifications")]
+    assert len([s for s in sql_statements if s.startswith("INSERT INTO outbox_messages")]) == 1
+    sql_statements.clear()
+    drain_outbox()
+    # ...which the worker delivers with a single multi-row INSERT.
+    assert len([s for s in sql_statements if s.startswith("INSERT INTO notifications")]) == 1
+
+    assert (await client.post("/api/inventory/", headers=headers, json=payload)).status_code == 201
+    sql_statements.clear()
+    drain_outbox()
+    # Recipients come from the cache on the second delivery.
+    assert not [s for s in sql_statements if "JOIN stores" in s and "users.role" in s]
+
+    deactivated = await client.patch(
+        f"/api/users/{admins[0].id}/deactivate", headers=auth_headers(merchant), json={"is_active": False}
+    )
+    assert deactivated.status_code == 200
+    assert (await client.post("/api/inventory/", headers=headers, json=payload)).status_code == 201
+    drain_outbox()
+
+    counts = {user.id: db.query(Notification).filter_by(user_id=user.id).count() for user in [merchant, *admins]}
+    assert counts == {merchant.id: 6, admins[0].id: 4, admins[1].id: 6, admins[2].id: 6}
+
+
+async def test_mark_all_read_is_one_update(client, db, user_factory, auth_headers, sql_statements):
+    user = user_factory(email="readall@myduka.com", role="admin")
+    other = user_factory(email="readall-other@myduka.com", role="admin")
+    db.add_all(
+        Notification(user_id=owner.id, category="system", title=f"N{i}", message="m")
+        for owner in (user, other)
+        for i in range(25)
+    )
+    db.commit()
+    user_id, other_id = user.id, other.id
+    headers = auth_headers(user)
+
+    sql_statements.clear()
+    response = await client.patch("/api/notifications/read-all", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Marked 25 notifications as read"
+    assert not [s for s in sql_statements if s.startswith("SELECT notifications.")]
+    assert len([s for s in sql_statements if s.startswith("UPDATE notifications")]) == 1
+
+    assert db.query(Notification).filter_by(user_id=user_id, is_read=False).count() == 0
+    assert db.query(Notification).filter_by(user_id=other_id, is_read=False).count() == 25
+
+
+def test_retention_deletes_only_old_read_notifications_in_batches(db, user_factory):
+    user = user_factory(email="retention@myduka.com", role="admin")
+    now = datetime(2026, 6, 1)
+    old, recent = now - timedelta(days=120), now - timedelta(days=10)
+
+    def notification(title, created_at, is_read=True):
+        return Notification(
+            user_id=user.id, category="system", title=title, message="m", is_read=is_read, created_at=created_at
+        )
+
+    db.add_all([notification(f"old-read-{i}", old) for i in range(5)])
+    db.add_all([notification("old-unread", old, is_read=False), notification("recent-read", recent)])
+    db.commit()
+
+    assert purge_read_notifications(db, now=now, batch_size=2, max_age=timedelta(days=90)) == 5
+    assert sorted(n.title for n in db.query(Notification).all()) == ["old-unread", "recent-read"]
+    assert purge_read_notifications(db, now=now, batch_size=2, max_age=timedelta(days=90)) == 0
+
+
+async def test_unread_count_is_served_from_the_counter(
+    client, db, user_factory, auth_headers, sql_statements, drain_outbox
+):
+    user = user_factory(email="counter@myduka.com", role="admin")
+    db.add(Notification(user_id=user.id, category="system", title="before counters", message="m"))
+    db.commit()
+    user_id = user.id
+    headers = auth_headers(user)
+
+    async def unread_count():
+        response = await client.get("/api/notifications/unread-count", headers=headers)
+        assert response.status_code == 200
+        return response.json()["unread_count"]
+
+    # Without a counter the endpoint falls back to COUNT; the first fan-out seeds it.
+    assert await unread_count() == 1
+    notify_users(db, user_ids=[user_id], category="system", title="queued", message="m")
+    notify_users(db, user_ids=[user_id], category="system", title="queued", message="m")
+    db.commit()
+    drain_outbox()
+    assert db.get(NotificationCounter, user_id).unread_count == 3
+
+    sql_statements.clear()
+    assert await unread_count() == 3
+    assert not [s for s in sql_statements if "count(" in s.lower()]
+
+    newest = await client.get("/api/notifications/", headers=headers)
+    read = await client.patch(f"/api/notifications/{newest.json()[0]['id']}/read", headers=headers)
+    assert read.status_code == 200
+    assert await unread_count() == 2
+    # Marking it again does not decrement twice.
+    await client.patch(f"/api/notifications/{newest.json()[0]['id']}/read", headers=headers)
+    assert await unread_count() == 2
+
+    assert (await client.patch("/api/notifications/read-all", headers=headers)).status_code == 200
+    assert await unread_count() == 0
+
+
+def test_repair_recomputes_drifted_counters(db, user_factory):
+    user = user_factory(email="counter-repair@myduka.com", role="admin")
+    other = user_factory(email="counter-repair-other@myduka.com", role="admin")
+    db.add_all(Notification(user_id=user.id, category="system", title=f"N{i}", message="m") for i in range(4))
+    db.add_all(
+        [NotificationCounter(user_id=user.id, unread_count=9), NotificationCounter(user_id=other.id, unread_count=2)]
+    )
+    db.commit()
+    user_id, other_id = user.id, other.id
+
+    drift = repair_notification_counters(db, apply=False)
+    assert drift == [
+        {"user_id": user_id, "recorded": 9, "expected": 4},
+        {"user_id": other_id, "recorded": 2, "expected": 0},
+    ]
+    assert db.get(NotificationCounter, user_id).unread_count == 9
+
+    assert len(repair_notification_counters(db)) == 2
+    db.expire_all()
+    assert db.get(NotificationCounter, user_id).unread_count == 4
+    assert db.get(NotificationCounter, other_id).unread_count == 0
+    assert repair_notification_counters(db) == []
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.models.notification import Notification
+from app.models.outbox_message import OutboxMessage, OutboxStatus
+from app.services.email_service import get_email_transport
+from app.services.notification_service import notify_users
+from app.services.outbox_service import drain_outbox, enqueue, outbox_handler, requeue_dead_messages
+
+pytestmark = pytest.mark.anyio
+
+
+@outbox_handler("test-broken")
+def _broken_handler(db, payload):
+    # Writes something first so the test can check the savepoint rolled it back.
+    db.add(Notification(user_id=payload["user_id"], category="broken", title="t", message="m"))
+    db.flush()
+    raise RuntimeError("provider unavailable")
+
+
+async def test_password_reset_email_is_sent_by_the_outbox_worker(client, user_factory, db, drain_outbox):
+    user = user_factory(email="reset-me@myduka.com")
+    transport = get_email_transport()
+    transport.sent.clear()
+
+    response = await client.post("/api/auth/forgot-password", json={"email": user.email})
+    assert response.status_code == 200
+    assert list(transport.sent) == []
+    assert db.query(OutboxMessage).count() == 1
+
+    drain_outbox()
+    assert [message["to"] for message in transport.sent] == ["reset-me@myduka.com"]
+    assert "reset-password?token=" in transport.sent[0]["text"]
+    assert db.query(OutboxMessage).count() == 0
+
+
+def test_failed_messages_back_off_then_dead_letter_without_blocking_others(db, user_factory, monkeypatch):
+    monkeypatch.setattr(settings, "outbox_max_attempts", 3)
+    monkeypatch.setattr(settings, "outbox_backoff_seconds", 2.0)
+    user = user_factory()
+    start = datetime.now(timezone.utc).replace(tzinfo=None)
+    broken = enqueue(db, "test-broken", {"user_id": user.id})
+    broken.available_at = start
+    notify_users(db, user_ids=[user.id], category="message", title="Hi", message="Hello")
+    db.commit()
+    broken_id = broken.id
+
+    assert drain_outbox(db, now=start + timedelta(seconds=1)) == 2
+    # The healthy message was delivered; the broken one's writes were rolled back.
+    assert [n.category for n in db.query(Notification)] == ["message"]
+    message = db.get(OutboxMessage, broken_id)
+    assert (message.attempts, message.available_at) == (1, start + timedelta(seconds=3))
+    assert "provider unavailable" in message.last_error
+
+    assert drain_outbox(db, now=start + timedelta(seconds=2)) == 0
+    assert drain_outbox(db, now=start + timedelta(seconds=3)) == 1
+    assert db.get(OutboxMessage, broken_id).available_at == start + timedelta(seconds=7)
+    assert drain_outbox(db, now=start + timedelta(seconds=7)) == 1
+    assert db.get(OutboxMessage, broken_id).status == OutboxStatus.DEAD.value
+    assert drain_outbox(db, now=start + timedelta(days=1)) == 0
+
+    assert requeue_dead_messages(db) == 1
+    message = db.get(OutboxMessage, broken_id)
+    assert (message.status, message.attempts) == (OutboxStatus.PENDING.value, 0)
+    assert json.loads(message.payload) == {"user_id": user.id}
@@ -182,3 +182,172 @@ async def test_merchant_dashboard_requires_superuser(
     assert {"stats", "performance", "payment_summary", "stores", "admins"} <= set(
         payload.keys()
     )
+
+
+async def test_merchant_dashboard_aggregates_in_few_round_trips(
+    client, db, user_factory, auth_headers, sql_statements
+):
+    merchant = user_factory(email="merchant-rt@myduka.com", role="superuser")
+    stores = [
+        Store(name="North", location="Nairobi", merchant_id=merchant.id),
+        Store(name="South", location="Mombasa", merchant_id=merchant.id, is_active=False),
+    ]
+    product = Product(
+        name="Beans", sku="BEANS-RT", buying_price=10, selling_price=15, merchant_id=merchant.id
+    )
+    db.add_all(stores + [product])
+    db.commit()
+    admin = user_factory(email="admin-rt@myduka.com", role="admin", store_id=stores[0].id)
+    for store, status, quantity in ((stores[0], "paid", 10), (stores[0], "unpaid", 4), (stores[1], "unpaid", 6)):
+        db.add(
+            Inventory(
+                product_id=product.id,
+                store_id=store.id,
+                created_by=admin.id,
+                quantity_received=quantity,
+                quantity_in_stock=quantity,
+                quantity_spoilt=0,
+                payment_status=status,
+                buying_price=10,
+                selling_price=15,
+            )
+        )
+    db.commit()
+
+    headers = auth_headers(merchant)
+    sql_statements.clear()
+    response = await client.get("/api/reports/merchant/dashboard", headers=headers)
+
+    assert response.status_code == 200
+    # Auth lookup, summary (stats + payments + per-store), product performance, admins.
+    assert len(sql_statements) <= 4, sql_statements
+    data = response.json()
+    assert data["stats"] == {
+        "active_stores": 1,
+        "active_admins": 1,
+        "total_products": 1,
+        "estimated_revenue": 300.0,
+    }
+    assert data["payment_summary"]["paid_amount"] == 100.0
+    assert data["payment_summary"]["unpaid_amount"] == 100.0
+    totals = {item["name"]: (item["paid_total"], item["unpaid_total"]) for item in data["stores"]}
+    assert totals == {"North": (100.0, 40.0), "South": (0.0, 60.0)}
+    assert [admin["store"] for admin in data["admins"]] == ["North"]
+
+
+async def test_dashboards_are_cached_until_a_write_invalidates_them(
+    client, db, user_factory, auth_headers, sql_statements
+):
+    merchant = user_factory(email="merchant-cache@myduka.com", role="superuser")
+    store = Store(name="Cache Branch", location="Nairobi", merchant_id=merchant.id)
+    product = Product(
+        name="Sugar", sku="SUGAR-CACHE", buying_price=10, selling_price=20, merchant_id=merchant.id
+    )
+    db.add_all([store, product])
+    db.commit()
+    admin = user_factory(email="admin-cache@myduka.com", role="admin", store_id=store.id)
+    clerk = user_factory(email="clerk-cache@myduka.com", role="clerk", store_id=store.id)
+    product_id, store_id = product.id, store.id
+    admin_headers, clerk_headers, merchant_headers = (
+        auth_headers(admin),
+        auth_headers(clerk),
+        auth_headers(merchant),
+    )
+
+    for headers, path in (
+        (admin_headers, "/api/reports/admin/dashboard"),
+        (clerk_headers, "/api/reports/clerk/dashboard"),
+        (merchant_headers, "/api/reports/merchant/dashboard"),
+    ):
+        first = await client.get(path, headers=headers)
+        assert first.status_code == 200
+        sql_statements.clear()
+        second = await client.get(path, headers=headers)
+        assert second.json() == first.json()
+        # With the dashboard and the caller's principal cached, nothing reaches the database.
+        assert sql_statements == []
+
+    created = await client.post(
+        "/api/inventory/",
+        headers=clerk_headers,
+        json={
+            "product_id": product_id,
+            "store_id": store_id,
+            "quantity_received": 5,
+            "quantity_in_stock": 5,
+            "quantity_spoilt": 0,
+            "payment_status": "paid",
+            "buying_price": 10,
+            "selling_price": 20,
+        },
+    )
+    assert created.status_code == 201, created.text
+
+    admin_view = await client.get("/api/reports/admin/dashboard", headers=admin_headers)
+    assert admin_view.json()["stats"]["store_value"] == 100.0
+    clerk_view = await client.get("/api/reports/clerk/dashboard", headers=clerk_headers)
+    assert clerk_view.json()["stats"]["total_stock"] == 5
+    merchant_view = await client.get("/api/reports/merchant/dashboard", headers=merchant_headers)
+    assert merchant_view.json()["stats"]["estimated_revenue"] == 100.0
+
+
+async def test_dashboards_load_related_rows_without_n_plus_one(
+    client, db, user_factory, auth_headers, statement_budget
+):
+    store = Store(name="Eager Store", location="Nairobi")
+    db.add(store)
+    db.commit()
+    admin = user_factory(email="admin-eager@myduka.com", role="admin", store_id=store.id)
+    clerks = [
+        user_factory(email=f"clerk-eager-{index}@myduka.com", role="clerk", store_id=store.id)
+        for index in range(3)
+    ]
+    products = [
+        Product(name=f"Eager Product {index}", sku=f"EAGER-{index}", buying_price=10, selling_price=15)
+        for index in range(6)
+    ]
+    db.add_all(products)
+    db.commit()
+    for index, product in enumerate(products):
+        clerk = clerks[index % len(clerks)]
+        db.add(
+            Inventory(
+                product_id=product.id,
+                store_id=store.id,
+                created_by=clerk.id,
+                quantity_received=5,
+                quantity_in_stock=5,
+                quantity_spoilt=0,
+                payment_status="unpaid",
+                buying_price=10,
+                selling_price=15,
+            )
+        )
+        db.add(
+            SupplyRequest(
+                product_id=product.id,
+                store_id=store.id,
+                requested_by=clerk.id,
+                quantity_requested=3,
+                status="pending",
+            )
+        )
+    db.commit()
+    admin_headers, clerk_headers = auth_headers(admin), auth_headers(clerks[0])
+
+    # Auth, four stat queries, then one query each for requests, payments,
+    # clerks and clerk performance - independent of the number of rows.
+    statement_budget(9)
+    admin_view = await client.get("/api/reports/admin/dashboard", headers=admin_headers)
+    assert admin_view.status_code == 200
+    payload = admin_view.json()
+    assert len(payload["supply_requests"]) == 6
+    assert {item["requested_by"] for item in payload["supply_requests"]} == {
+        f"{clerk.first_name} {clerk.last_name}" for clerk in clerks
+    }
+    assert {item["product"] for item in payload["payment_status"]} == {product.name for product in products}
+
+    statement_budget(2)
+    clerk_view = await client.get("/api/reports/clerk/dashboard", headers=clerk_headers)
+    assert clerk_view.status_code == 200
+    assert {item["product"] for item in clerk_view.json()["products"]} == {"Eager Product 0", "Eager Product 3"}
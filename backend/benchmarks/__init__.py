@@ -0,0 +1 @@
+"""Load tests and benchmarks (run manually, not part of the pytest suite)."""
@@ -0,0 +1,57 @@
+"""
+Shared helpers for benchmarks: an isolated SQLite database and latency stats.
+"""
+import os
+import statistics
+import tempfile
+from pathlib import Path
+
+
+def bootstrap(name: str):
+    """
+    Point the app at a fresh SQLite file and import it.
+
+    Must run before anything imports `app.core.config`.
+    """
+    db_path = Path(tempfile.gettempdir()) / f"myduka-{name}.db"
+    if db_path.exists():
+        db_path.unlink()
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DATABASE_DRIVER"] = "sqlite"
+    os.environ["DEBUG"] = "false"
+    os.environ["SEED_DEMO_USERS"] = "false"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+    import main
+
+    return main.app
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(label: str, samples_ms: list[float]) -> str:
+    return (
+        f"{label:<22} n={len(samples_ms):<6} "
+        f"p50={percentile(samples_ms, 50):8.2f}ms "
+        f"p95={percentile(samples_ms, 95):8.2f}ms "
+        f"p99={percentile(samples_ms, 99):8.2f}ms "
+        f"mean={statistics.fmean(samples_ms) if samples_ms else 0.0:8.2f}ms"
+    )
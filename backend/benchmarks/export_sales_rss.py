@@ -0,0 +1,142 @@
+"""
+Streaming sales export memory benchmark.
+
+Seeds a large sales table, streams `GET /api/analytics/sales/export` through
+the ASGI app while discarding the body, and samples RSS on every chunk. Exits
+non-zero when RSS grows past the ceiling during the export.
+
+Usage:
+    python -m benchmarks.export_sales_rss --rows 1000000 --max-rss-growth-mb 64
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.common import bootstrap, current_rss_mb
+
+
+def _seed(rows: int, batch_size: int = 10_000):
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token, hash_password
+    from app.models.product import Product
+    from app.models.sale import Sale
+    from app.models.store import Store
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        merchant = User(
+            email="merchant@bench.local",
+            first_name="Bench",
+            last_name="Merchant",
+            hashed_password=hash_password("bench12345"),
+            role="superuser",
+        )
+        db.add(merchant)
+        db.flush()
+        store = Store(name="Bench Store", location="Nairobi", merchant_id=merchant.id)
+        product = Product(
+            name="Bench Product", sku="BENCH-EXPORT", buying_price=50, selling_price=80, merchant_id=merchant.id
+        )
+        db.add_all([store, product])
+        db.commit()
+
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            db.execute(
+                insert(Sale),
+                [
+                    {
+                        "store_id": store.id,
+                        "product_id": product.id,
+                        "created_by": merchant.id,
+                        "quantity": 1 + (start + offset) % 5,
+                        "unit_price": 80,
+                        "unit_cost": 50,
+                        "total_price": 80 * (1 + (start + offset) % 5),
+                        "total_cost": 50 * (1 + (start + offset) % 5),
+                    }
+                    for offset in range(count)
+                ],
+            )
+            db.commit()
+        return f"Bearer {create_access_token({'sub': merchant.id})}"
+    finally:
+        db.close()
+
+
+async def _export(app, authorization: str) -> dict:
+    stats = {"status": None, "bytes": 0, "lines": 0, "chunks": 0, "peak_rss_mb": current_rss_mb()}
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/analytics/sales/export",
+        "raw_path": b"/api/analytics/sales/export",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", authorization.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; Starlette cancels this once the body is sent.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            stats["lines"] += body.count(b"\n")
+            stats["chunks"] += 1
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], current_rss_mb())
+
+    await app(scope, receive, send)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64.0)
+    args = parser.parse_args()
+
+    app = bootstrap("export-sales")
+    seed_started = time.perf_counter()
+    authorization = _seed(args.rows)
+    print(f"seeded {args.rows} sales in {time.perf_counter() - seed_started:.1f}s")
+
+    baseline = current_rss_mb()
+    started = time.perf_counter()
+    stats = asyncio.run(_export(app, authorization))
+    elapsed = time.perf_counter() - started
+    growth = stats["peak_rss_mb"] - baseline
+
+    print(
+        f"status={stats['status']} rows={max(0, stats['lines'] - 1)} chunks={stats['chunks']} "
+        f"bytes={stats['bytes'] / (1024 * 1024):.1f}MiB elapsed={elapsed:.1f}s "
+        f"({max(0, stats['lines'] - 1) / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    print(
+        f"rss baseline={baseline:.1f}MiB peak={stats['peak_rss_mb']:.1f}MiB "
+        f"growth={growth:.1f}MiB ceiling={args.max_rss_growth_mb:.1f}MiB"
+    )
+    if stats["status"] != 200 or growth > args.max_rss_growth_mb:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Mixed dashboard + sales load test.
+
+Fires concurrent dashboard reads and sale writes at the app in-process and
+reports per-endpoint p50/p95/p99 latency. With handlers running in the
+threadpool, slow dashboard queries no longer serialise the sales traffic.
+
+Usage:
+    python -m benchmarks.load_mixed_traffic --requests 1000 --concurrency 32
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import bootstrap, summarize
+
+
+def _seed(products: int, stock_rows: int):
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token, hash_password
+    from app.models.inventory import Inventory
+    from app.models.product import Product
+    from app.models.store import Store
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        merchant = User(
+            email="merchant@bench.local",
+            first_name="Bench",
+            last_name="Merchant",
+            hashed_password=hash_password("bench12345"),
+            role="superuser",
+        )
+        db.add(merchant)
+        db.flush()
+        store = Store(name="Bench Store", location="Nairobi", merchant_id=merchant.id)
+        db.add(store)
+        db.flush()
+        admin = User(
+            email="admin@bench.local",
+            first_name="Bench",
+            last_name="Admin",
+            hashed_password=hash_password("bench12345"),
+            role="admin",
+            store_id=store.id,
+        )
+        db.add(admin)
+        db.flush()
+
+        product_ids = []
+        for index in range(products):
+            product = Product(
+                name=f"Product {index}",
+                sku=f"BENCH-{index}",
+                buying_price=50,
+                selling_price=80,
+                merchant_id=merchant.id,
+            )
+            db.add(product)
+            db.flush()
+            product_ids.append(product.id)
+
+        for index in range(stock_rows):
+            db.add(
+                Inventory(
+                    product_id=product_ids[index % len(product_ids)],
+                    store_id=store.id,
+                    created_by=admin.id,
+                    quantity_received=1_000,
+                    quantity_in_stock=1_000,
+                    quantity_spoilt=0,
+                    payment_status="paid" if index % 2 else "unpaid",
+                    buying_price=50,
+                    selling_price=80,
+                )
+            )
+        db.commit()
+        return {
+            "store_id": store.id,
+            "product_ids": product_ids,
+            "merchant": {"Authorization": f"Bearer {create_access_token({'sub': merchant.id})}"},
+            "admin": {"Authorization": f"Bearer {create_access_token({'sub': admin.id})}"},
+        }
+    finally:
+        db.close()
+
+
+async def _run(app, fixture, total: int, concurrency: int, dashboard_ratio: float):
+    import httpx
+
+    latencies = {"merchant_dashboard": [], "admin_dashboard": [], "create_sale": []}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(client, kind):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            if kind == "merchant_dashboard":
+                response = await client.get("/api/reports/merchant/dashboard", headers=fixture["merchant"])
+            elif kind == "admin_dashboard":
+                response = await client.get("/api/reports/admin/dashboard", headers=fixture["admin"])
+            else:
+                response = await client.post(
+                    "/api/sales/",
+                    headers=fixture["admin"],
+                    json={
+                        "store_id": fixture["store_id"],
+                        "product_id": random.choice(fixture["product_ids"]),
+                        "quantity": 1,
+                    },
+                )
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    kinds = []
+    for _ in range(total):
+        if random.random() < dashboard_ratio:
+            kinds.append(random.choice(["merchant_dashboard", "admin_dashboard"]))
+        else:
+            kinds.append("create_sale")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client, kind) for kind in kinds))
+        elapsed = time.perf_counter() - started
+
+    print(f"{total} requests, concurrency={concurrency}, {total / elapsed:.1f} req/s, errors={errors}")
+    for kind, samples in latencies.items():
+        print(summarize(kind, samples))
+    print(summarize("all", [value for samples in latencies.values() for value in samples]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--dashboard-ratio", type=float, default=0.3)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--stock-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = bootstrap("load-mixed")
+    fixture = _seed(args.products, args.stock_rows)
+    asyncio.run(_run(app, fixture, args.requests, args.concurrency, args.dashboard_ratio))
+
+
+if __name__ == "__main__":
+    main()
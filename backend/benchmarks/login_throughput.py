@@ -0,0 +1,105 @@
+"""
+Login throughput versus password hashing pool size.
+
+Seeds users with a BCRYPT_ROUNDS hash, then for each pool size fires a burst
+of concurrent logins while probing `/health`, and reports logins/s, login
+latency, 503 rejections and how responsive the rest of the app stayed.
+
+Usage:
+    python -m benchmarks.login_throughput --logins 200 --concurrency 64 --workers 1,2,4,8
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import bootstrap, summarize
+
+PASSWORD = "bench12345"
+
+
+def _seed(users: int) -> list[str]:
+    from app.core.database import SessionLocal
+    from app.core.security import hash_password
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        # One hash is enough: every login still pays a full bcrypt verify.
+        hashed = hash_password(PASSWORD)
+        emails = [f"clerk{index}@myduka-bench.com" for index in range(users)]
+        db.add_all(
+            User(email=email, first_name="Bench", last_name="Clerk", hashed_password=hashed, role="clerk")
+            for email in emails
+        )
+        db.commit()
+        return emails
+    finally:
+        db.close()
+
+
+async def _burst(app, emails: list[str], total: int, concurrency: int) -> None:
+    import httpx
+
+    login_ms, health_ms = [], []
+    statuses: dict[int, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def login(client, email):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+            login_ms.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def probe(client):
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            health_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        prober = asyncio.create_task(probe(client))
+        started = time.perf_counter()
+        await asyncio.gather(*(login(client, emails[index % len(emails)]) for index in range(total)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    ok = statuses.get(200, 0)
+    print(f"  {ok / elapsed:7.1f} logins/s  statuses={dict(sorted(statuses.items()))}")
+    print("  " + summarize("login", login_ms))
+    print("  " + summarize("health during burst", health_ms))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated pool sizes to try")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (defaults to BCRYPT_ROUNDS)")
+    args = parser.parse_args()
+
+    app = bootstrap("login-throughput")
+    from app.core.config import settings
+    from app.core.security import shutdown_password_executor
+
+    if args.rounds is not None:
+        settings.bcrypt_rounds = args.rounds
+    emails = _seed(args.users)
+    print(
+        f"{args.logins} logins, concurrency={args.concurrency}, bcrypt_rounds={settings.bcrypt_rounds}, "
+        f"max_pending={settings.password_hash_max_pending}"
+    )
+    for workers in [int(value) for value in args.workers.split(",") if value.strip()]:
+        shutdown_password_executor()
+        settings.password_hash_workers = workers
+        print(f"workers={workers}")
+        asyncio.run(_burst(app, emails, args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
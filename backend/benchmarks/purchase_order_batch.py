@@ -0,0 +1,133 @@
+"""
+Large purchase order create + receive benchmark.
+
+Creates and receives purchase orders with many lines through the API and
+reports latency and SQL statement counts (from the Server-Timing header) per
+step. Product lookups, item inserts and stock receipt run as bulk
+statements, so the counts stay flat as the line count grows.
+
+Usage:
+    python -m benchmarks.purchase_order_batch --lines 1000 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import re
+import time
+
+from benchmarks.common import bootstrap, summarize
+
+
+def _seed(products: int):
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token, hash_password
+    from app.models.product import Product
+    from app.models.store import Store
+    from app.models.supplier import Supplier
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        merchant = User(
+            email="merchant@bench.local",
+            first_name="Bench",
+            last_name="Merchant",
+            hashed_password=hash_password("bench12345"),
+            role="superuser",
+        )
+        db.add(merchant)
+        db.flush()
+        store = Store(name="Bench Store", location="Nairobi", merchant_id=merchant.id)
+        db.add(store)
+        db.flush()
+        admin = User(
+            email="admin@bench.local",
+            first_name="Bench",
+            last_name="Admin",
+            hashed_password=hash_password("bench12345"),
+            role="admin",
+            store_id=store.id,
+        )
+        supplier = Supplier(name="Bench Supplier", store_id=store.id)
+        db.add_all([admin, supplier])
+        db.flush()
+
+        catalog = [
+            Product(
+                name=f"Product {index}",
+                sku=f"BENCH-{index}",
+                buying_price=50,
+                selling_price=80,
+                merchant_id=merchant.id,
+            )
+            for index in range(products)
+        ]
+        db.add_all(catalog)
+        db.commit()
+        return {
+            "store_id": store.id,
+            "supplier_id": supplier.id,
+            "product_ids": [product.id for product in catalog],
+            "admin": {"Authorization": f"Bearer {create_access_token({'sub': admin.id})}"},
+        }
+    finally:
+        db.close()
+
+
+def _statement_count(response) -> int:
+    match = re.search(r'desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else -1
+
+
+async def _run(app, fixture, lines: int, runs: int):
+    import httpx
+
+    latencies = {"create": [], "receive": []}
+    statements = {"create": [], "receive": []}
+    payload = {
+        "supplier_id": fixture["supplier_id"],
+        "store_id": fixture["store_id"],
+        "items": [
+            {"product_id": product_id, "quantity": 5, "unit_cost": 50, "unit_price": 80}
+            for product_id in fixture["product_ids"][:lines]
+        ],
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for _ in range(runs):
+            start = time.perf_counter()
+            created = await client.post("/api/purchase-orders/", headers=fixture["admin"], json=payload)
+            latencies["create"].append((time.perf_counter() - start) * 1000)
+            created.raise_for_status()
+            statements["create"].append(_statement_count(created))
+
+            start = time.perf_counter()
+            received = await client.post(
+                f"/api/purchase-orders/{created.json()['id']}/status",
+                headers=fixture["admin"],
+                json={"status": "received"},
+            )
+            latencies["receive"].append((time.perf_counter() - start) * 1000)
+            received.raise_for_status()
+            statements["receive"].append(_statement_count(received))
+
+    print(f"{lines} lines x {runs} runs")
+    for step, samples in latencies.items():
+        print(f"{summarize(step, samples)} statements={max(statements[step])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["SERVER_TIMING_ENABLED"] = "true"
+    app = bootstrap("purchase-order-batch")
+    fixture = _seed(args.lines)
+    asyncio.run(_run(app, fixture, args.lines, args.runs))
+
+
+if __name__ == "__main__":
+    main()
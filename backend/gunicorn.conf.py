@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for running MyDuka with several uvicorn workers.
+
+Usage:
+    gunicorn main:app -c gunicorn.conf.py
+
+Workers write Prometheus samples to PROMETHEUS_MULTIPROC_DIR so `/metrics`
+reports totals across all of them. The directory is emptied on start-up and
+dead workers are marked so their live gauges drop out.
+"""
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Must be set before workers import prometheus_client.
+multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "myduka-prometheus")
+)
+
+
+def on_starting(server):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
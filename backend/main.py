@@ -6,26 +6,52 @@ import json
 import logging
 import time
 import uuid
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi import Request
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
+from app.core.background import PeriodicTask
 from app.core.config import settings
-from app.core.database import Base, SessionLocal, engine
+from app.core.database import Base, SessionLocal, engine, get_async_engine
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    render_metrics,
+    route_label,
+)
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import check_statement_budget, server_timing_header, start_request_stats
+from app.services.idempotency_service import sweep_idempotency_keys
+from app.services.inventory_event_partition_service import maintain_inventory_event_partitions
+from app.services.notification_retention_service import sweep_read_notifications
+from app.services.notification_stream_service import close_notification_hub
+from app.services.outbox_service import drain_outbox_until_idle
 from app.services.seed_service import seed_demo_users
+from app.services.stock_replay_service import checkpoint_stock
+from app.services.token_cleanup_service import sweep_refresh_tokens
 
 # Import all models to register them with SQLAlchemy
 from app.models import (
     inventory,
     inventory_event,
     notification,
+    notification_counter,
     purchase_order,
     product,
     refresh_token,
     return_request,
     sale,
+    sales_daily_rollup,
     expense,
+    idempotency_key,
+    outbox_message,
+    stock_balance,
+    stock_checkpoint,
     stock_transfer,
     supplier,
     stock_threshold,
@@ -40,10 +66,6 @@ from app.routes import analytics, dashboard, messages, notifications as notifica
 from app.routes import expenses, purchase_orders, returns, sales, stock_transfers, suppliers
 
 logger = logging.getLogger("myduka.api")
-METRICS = {
-    "requests_total": 0,
-    "requests_error": 0,
-}
 
 # Create database tables (only if database is available)
 try:
@@ -72,6 +94,42 @@ except Exception as e:
     print(f"Warning: Could not create database tables: {e}")
     print("Make sure PostgreSQL is running and the database credentials are correct.")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Periodic maintenance; an interval of 0 disables a job.
+    tasks = [
+        PeriodicTask("refresh-token-sweep", settings.refresh_token_sweep_interval_seconds, sweep_refresh_tokens),
+        PeriodicTask(
+            "idempotency-key-sweep", settings.idempotency_key_sweep_interval_seconds, sweep_idempotency_keys
+        ),
+        PeriodicTask(
+            "inventory-event-partitions",
+            settings.inventory_event_partition_interval_seconds,
+            maintain_inventory_event_partitions,
+        ),
+        PeriodicTask("stock-checkpoints", settings.stock_checkpoint_interval_seconds, checkpoint_stock),
+        PeriodicTask(
+            "notification-retention-sweep",
+            settings.notification_retention_sweep_interval_seconds,
+            sweep_read_notifications,
+        ),
+        *(
+            PeriodicTask(f"outbox-worker-{index}", settings.outbox_poll_interval_seconds, drain_outbox_until_idle)
+            for index in range(settings.outbox_workers)
+        ),
+    ]
+    tasks = [task for task in tasks if task.interval_seconds > 0]
+    for task in tasks:
+        task.start()
+    try:
+        yield
+    finally:
+        for task in tasks:
+            await task.stop()
+        close_notification_hub()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -79,7 +137,8 @@ app = FastAPI(
     description="An inventory management system for multi-store operations",
     openapi_url="/api/openapi.json",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS (allow frontend to communicate)
@@ -89,24 +148,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REPLAYED_HEADER],
 )
 
+# Registered before the logging middleware so it runs inside it and its
+# lookups count towards the request's SQL statements.
+app.add_middleware(IdempotencyMiddleware)
+
 
 @app.middleware("http")
 async def request_logging_middleware(request: Request, call_next):
     request_id = str(uuid.uuid4())
     start = time.perf_counter()
     status_code = 500
+    query_stats = start_request_stats()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
     try:
         response = await call_next(request)
         status_code = response.status_code
         response.headers["X-Request-ID"] = request_id
+        if settings.server_timing_enabled:
+            response.headers["Server-Timing"] = server_timing_header(
+                query_stats, (time.perf_counter() - start) * 1000
+            )
+        check_statement_budget(query_stats, request.method, request.url.path)
         return response
     finally:
-        duration_ms = round((time.perf_counter() - start) * 1000, 2)
-        METRICS["requests_total"] += 1
-        if status_code >= 400:
-            METRICS["requests_error"] += 1
+        elapsed = time.perf_counter() - start
+        duration_ms = round(elapsed * 1000, 2)
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        route = route_label(request.scope)
+        HTTP_REQUESTS.labels(request.method, route, str(status_code)).inc()
+        HTTP_REQUEST_DURATION.labels(request.method, route).observe(elapsed)
         logger.info(
             json.dumps(
                 {
@@ -115,6 +188,8 @@ async def request_logging_middleware(request: Request, call_next):
                     "path": request.url.path,
                     "status_code": status_code,
                     "duration_ms": duration_ms,
+                    "db_queries": query_stats.count,
+                    "db_time_ms": round(query_stats.duration_ms, 2),
                 }
             )
         )
@@ -158,21 +233,27 @@ async def health_check():
     }
 
 
+def _ping_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
 @app.get("/health/ready")
 async def readiness_check():
     """Readiness probe checking database connectivity."""
-    with engine.connect() as connection:
-        connection.execute(text("SELECT 1"))
+    if settings.database_async:
+        async with get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    else:
+        await run_in_threadpool(_ping_database)
     return {"status": "ready"}
 
 
 @app.get("/metrics")
 async def metrics():
-    """Simple service metrics endpoint."""
-    return {
-        "requests_total": METRICS["requests_total"],
-        "requests_error": METRICS["requests_error"],
-    }
+    """Prometheus metrics in text exposition format."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+"""
+MyDuka - Inventory Management System
+Maintenance commands
+
+Usage:
+    python manage.py reconcile-stock [--dry-run]
+    python manage.py rebuild-sales-rollup [--since YYYY-MM-DD]
+    python manage.py build-stock-checkpoints
+    python manage.py repair-notification-counters [--dry-run]
+    python manage.py purge-refresh-tokens
+    python manage.py purge-notifications
+    python manage.py archive-inventory-events [--before YYYY-MM-DD] [--dir PATH]
+    python manage.py drain-outbox
+    python manage.py requeue-outbox
+"""
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+from app.core.database import SessionLocal
+
+# Import all models to register them with SQLAlchemy
+import main  # noqa: F401
+
+
+def reconcile_stock(args) -> int:
+    """Rebuild stock balances from inventory rows and report drift."""
+    from app.services.stock_service import reconcile_stock_balances
+
+    db = SessionLocal()
+    try:
+        drift = reconcile_stock_balances(db, apply=not args.dry_run)
+    finally:
+        db.close()
+
+    for entry in drift:
+        print(json.dumps(entry))
+    action = "found" if args.dry_run else "repaired"
+    print(f"{len(drift)} stock balance(s) with drift {action}.")
+    return 1 if drift and args.dry_run else 0
+
+
+def rebuild_sales_rollup(args) -> int:
+    """Backfill or rebuild the daily sales rollup from the sales table."""
+    from app.services.rollup_service import rebuild_sales_rollup as rebuild
+
+    db = SessionLocal()
+    try:
+        written = rebuild(db, since=args.since)
+    finally:
+        db.close()
+
+    scope = f"since {args.since.isoformat()}" if args.since else "for all sales"
+    print(f"Rebuilt {written} sales rollup row(s) {scope}.")
+    return 0
+
+
+def build_stock_checkpoints(args) -> int:
+    """Fold inventory events into daily stock checkpoints up to yesterday."""
+    from app.services.stock_replay_service import checkpoint_stock
+
+    written = checkpoint_stock()
+    print(f"Wrote {written} stock checkpoint(s).")
+    return 0
+
+
+def repair_notification_counters(args) -> int:
+    """Recompute unread-notification counters from notifications and report drift."""
+    from app.services.notification_counter_service import repair_notification_counters as repair
+
+    db = SessionLocal()
+    try:
+        drift = repair(db, apply=not args.dry_run)
+    finally:
+        db.close()
+
+    for entry in drift:
+        print(json.dumps(entry))
+    action = "found" if args.dry_run else "repaired"
+    print(f"{len(drift)} notification counter(s) with drift {action}.")
+    return 1 if drift and args.dry_run else 0
+
+
+def purge_refresh_tokens(args) -> int:
+    """Delete expired refresh tokens and ones revoked before the grace period."""
+    from app.services.token_cleanup_service import sweep_refresh_tokens
+
+    deleted = sweep_refresh_tokens()
+    print(f"Deleted {deleted} refresh token(s).")
+    return 0
+
+
+def purge_notifications(args) -> int:
+    """Delete read notifications older than the retention period."""
+    from app.services.notification_retention_service import sweep_read_notifications
+
+    deleted = sweep_read_notifications()
+    print(f"Deleted {deleted} read notification(s).")
+    return 0
+
+
+def archive_inventory_events(args) -> int:
+    """Move inventory events from months before the cutoff into gzip files."""
+    from app.core.config import settings
+    from app.services.inventory_event_partition_service import archive_inventory_events as archive
+    from app.services.inventory_event_partition_service import month_start, months_before
+
+    before = args.before or months_before(month_start(date.today()), settings.inventory_event_retention_months)
+    directory = Path(args.dir or settings.inventory_event_archive_dir)
+    db = SessionLocal()
+    try:
+        archived = archive(db, before, directory)
+    finally:
+        db.close()
+
+    for entry in archived:
+        print(json.dumps(entry))
+    print(f"Archived {sum(entry['rows'] for entry in archived)} inventory event(s) before {before.isoformat()}.")
+    return 0
+
+
+def drain_outbox(args) -> int:
+    """Deliver every due notification and email in the outbox."""
+    from app.services.outbox_service import drain_outbox_until_idle
+
+    processed = drain_outbox_until_idle()
+    print(f"Processed {processed} outbox message(s).")
+    return 0
+
+
+def requeue_outbox(args) -> int:
+    """Give dead-lettered outbox messages a fresh set of attempts."""
+    from app.services.outbox_service import requeue_dead_messages
+
+    db = SessionLocal()
+    try:
+        requeued = requeue_dead_messages(db)
+    finally:
+        db.close()
+    print(f"Requeued {requeued} dead-lettered outbox message(s).")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="MyDuka maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-stock", help="Rebuild stock balances from inventory and report drift"
+    )
+    reconcile.add_argument(
+        "--dry-run", action="store_true", help="Report drift without writing any changes"
+    )
+    reconcile.set_defaults(handler=reconcile_stock)
+
+    rollup = subparsers.add_parser(
+        "rebuild-sales-rollup", help="Backfill or rebuild the daily sales rollup from sales"
+    )
+    rollup.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="Only rebuild days on or after this date (YYYY-MM-DD)",
+    )
+    rollup.set_defaults(handler=rebuild_sales_rollup)
+
+    checkpoints = subparsers.add_parser(
+        "build-stock-checkpoints", help="Fold inventory events into daily stock checkpoints"
+    )
+    checkpoints.set_defaults(handler=build_stock_checkpoints)
+
+    counters = subparsers.add_parser(
+        "repair-notification-counters", help="Recompute unread-notification counters and report drift"
+    )
+    counters.add_argument(
+        "--dry-run", action="store_true", help="Report drift without writing any changes"
+    )
+    counters.set_defaults(handler=repair_notification_counters)
+
+    purge = subparsers.add_parser(
+        "purge-refresh-tokens", help="Delete expired and long-revoked refresh tokens"
+    )
+    purge.set_defaults(handler=purge_refresh_tokens)
+
+    retention = subparsers.add_parser(
+        "purge-notifications", help="Delete read notifications older than the retention period"
+    )
+    retention.set_defaults(handler=purge_notifications)
+
+    archive = subparsers.add_parser(
+        "archive-inventory-events", help="Move old inventory events into compressed archive files"
+    )
+    archive.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        default=None,
+        help="Archive months before this date's month (default: INVENTORY_EVENT_RETENTION_MONTHS ago)",
+    )
+    archive.add_argument(
+        "--dir", default=None, help="Archive directory (default: INVENTORY_EVENT_ARCHIVE_DIR)"
+    )
+    archive.set_defaults(handler=archive_inventory_events)
+
+    drain = subparsers.add_parser("drain-outbox", help="Deliver due notifications and emails now")
+    drain.set_defaults(handler=drain_outbox)
+
+    requeue = subparsers.add_parser("requeue-outbox", help="Retry dead-lettered outbox messages")
+    requeue.set_defaults(handler=requeue_outbox)
+
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    sys.exit(arguments.handler(arguments))
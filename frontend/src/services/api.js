@@ -83,6 +83,24 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Paged list endpoints send the next page's cursor in this header until the last page.
+const NEXT_CURSOR_HEADER = "x-next-cursor";
+const MAX_PAGE_SIZE = 500;
+
+export async function getAllPages(url, params = {}) {
+  const rows = [];
+  let cursor = null;
+  let response;
+  do {
+    response = await api.get(url, {
+      params: { limit: MAX_PAGE_SIZE, ...params, ...(cursor ? { cursor } : {}) },
+    });
+    rows.push(...response.data);
+    cursor = response.headers?.[NEXT_CURSOR_HEADER];
+  } while (cursor);
+  return { ...response, data: rows };
+}
+
 export const authApi = {
   login(email, password) {
     return api.post("/api/auth/login", { email, password });
@@ -246,7 +264,7 @@ export const suppliersApi = {
 
 export const purchaseOrdersApi = {
   list(params = {}) {
-    return api.get("/api/purchase-orders/", { params });
+    return getAllPages("/api/purchase-orders/", params);
   },
   create(payload) {
     return api.post("/api/purchase-orders", payload);
@@ -261,7 +279,7 @@ export const purchaseOrdersApi = {
 
 export const transfersApi = {
   list(params = {}) {
-    return api.get("/api/stock-transfers/", { params });
+    return getAllPages("/api/stock-transfers/", params);
   },
   create(payload) {
     return api.post("/api/stock-transfers", payload);
@@ -273,7 +291,7 @@ export const transfersApi = {
 
 export const returnsApi = {
   list(params = {}) {
-    return api.get("/api/returns/", { params });
+    return getAllPages("/api/returns/", params);
   },
   create(payload) {
     return api.post("/api/returns", payload);
@@ -285,7 +303,7 @@ export const returnsApi = {
 
 export const salesApi = {
   list(params = {}) {
-    return api.get("/api/sales/", { params });
+    return getAllPages("/api/sales/", params);
   },
   create(payload) {
     return api.post("/api/sales", payload);